@@ -14,6 +14,10 @@ def create_app() -> Flask:
     # (선택) 세션 암호키 – 실제 서비스에서는 환경 변수로 관리 권장
     app.secret_key = "replace-with-your-secret"
 
+    # 요청 본문 한도 (챗봇 카메라 이미지 base64 포함) - 넘으면 413
+    from app.services.image_pipeline import max_request_bytes
+    app.config["MAX_CONTENT_LENGTH"] = max_request_bytes()
+
     # ── Blueprint를 지연(Lazy) Import 후 등록 ───────────────────
     #   * 순환 참조를 피하기 위해 함수 내부에서 import
     #   * 각 Blueprint 파일은 'app.routes.<module>' 아래에 존재
@@ -22,11 +26,39 @@ def create_app() -> Flask:
     from app.routes.certificate import certificate_bp
     from app.routes.payment    import payment_bp
     from app.routes.chatbot    import chatbot_bp # Added chatbot blueprint import
+    from app.routes.tts        import tts_bp
 
     app.register_blueprint(home_bp)        # "/"
     app.register_blueprint(reception_bp)   # "/reception"
     app.register_blueprint(certificate_bp) # "/certificate"
     app.register_blueprint(payment_bp)     # "/payment"
     app.register_blueprint(chatbot_bp)     # "/api/chatbot" (as per url_prefix in chatbot.py)
+    app.register_blueprint(tts_bp)         # "/tts"
+
+    # ── 해시 파일명 정적 파일 (asset_url, immutable 캐시, .br/.gz) ──
+    from app.utils.assets import register_assets
+    register_assets(app)
+
+    # ── 관리용 CLI 명령 (flask --app run import-csv 등) ─────────
+    from app.cli import register_cli
+    register_cli(app)
+
+    # ── 요청 시간 측정 + GET /metrics (Prometheus) ─────────────
+    from app.utils.metrics import register_metrics
+    register_metrics(app)
+
+    # ── 진료비 카탈로그 미리 로드 (첫 결제 요청에서 CSV 파싱하지 않도록) ──
+    from app.storage import get_storage
+    try:
+        get_storage().fee_catalog()
+    except Exception:
+        pass  # 데이터 파일이 없으면 첫 요청 때 오류를 그대로 보고
+
+    # ── 증명서 PDF 폰트/페이지 골격 미리 준비 ─────────────────
+    from app.utils.pdf_generator import warm_up, MissingKoreanFontError
+    try:
+        warm_up()
+    except MissingKoreanFontError:
+        pass  # 증명서 요청 시 기존처럼 폰트 오류 안내
 
     return app
@@ -0,0 +1,118 @@
+"""
+ASGI 진입점 (비동기 챗봇)
+
+POST /api/chatbot 은 asyncio 로 처리하고, 나머지 경로는 기존 Flask 앱에 그대로
+넘깁니다. Gemini 응답을 기다리는 동안 스레드를 잡지 않으므로 워커 하나가
+수백 개의 대화를 동시에 받을 수 있습니다. 진행 중인 모델 호출 수는 AsyncLimiter 로
+제한하고, 대기열이 가득 차면 503 + Retry-After 로 응답합니다.
+
+    uvicorn asgi:app --port 5001
+"""
+import asyncio
+import json
+import os
+import time
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app.routes.chatbot import (
+    parse_chatbot_request, conversation_id_from_request, build_chatbot_payload, busy_payload, model_call_slot,
+)
+from app.services.chatbot_service import generate_chatbot_response_async
+from app.services.image_pipeline import max_request_bytes
+from app.utils.limiter import AsyncLimiter, LimiterSaturated
+from app.utils.metrics import observe_request
+
+CHATBOT_PATH = "/api/chatbot"
+CHATBOT_ENDPOINT = "chatbot.handle_chatbot_request"  # Flask 경로와 같은 지표 레이블
+MAX_BODY_BYTES = max_request_bytes()  # 카메라 이미지(base64) 포함, KIOSK_IMAGE_MAX_BYTES 기준
+TOO_LARGE = object()
+
+
+def _default_limiter():
+    return AsyncLimiter(
+        max_in_flight=int(os.getenv("KIOSK_CHATBOT_MAX_IN_FLIGHT", "64")),
+        max_waiting=int(os.getenv("KIOSK_CHATBOT_MAX_WAITING", "512")),
+        max_wait=float(os.getenv("KIOSK_CHATBOT_MAX_WAIT", "10")),
+    )
+
+
+async def _read_body(receive):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return TOO_LARGE
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def _send_json(send, payload, status_code, headers=None):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+    await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_asgi_app(flask_app, limiter=None):
+    """Wraps `flask_app`; only the chatbot endpoint is served natively."""
+    wsgi = WsgiToAsgi(flask_app)
+    limiter = limiter or _default_limiter()
+
+    def _payload_in_request_context(service_response):
+        # url_for (download links) needs a request context
+        with flask_app.test_request_context(CHATBOT_PATH, method="POST"):
+            return build_chatbot_payload(service_response)
+
+    async def chatbot(receive, send):
+        started = time.perf_counter()
+        status_code = await _chatbot(receive, send)
+        observe_request("chatbot", CHATBOT_ENDPOINT, "POST", status_code, time.perf_counter() - started)
+
+    async def _chatbot(receive, send):
+        """Answers one chatbot request; returns the HTTP status sent."""
+        body = await _read_body(receive)
+        if body is TOO_LARGE:
+            await _send_json(send, {"error": "Request too large"}, 413)
+            return 413
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = None
+        user_question, base64_image_data, parse_error = parse_chatbot_request(data)
+        if parse_error:
+            await _send_json(send, *parse_error)
+            return parse_error[1]
+        try:
+            async with model_call_slot(limiter, user_question, base64_image_data):
+                service_response = await generate_chatbot_response_async(
+                    user_question, base64_image_data, conversation_id=conversation_id_from_request(data)
+                )
+        except LimiterSaturated as e:
+            busy = busy_payload(e.retry_after)
+            await _send_json(send, *busy)
+            return busy[1]
+        payload, status_code = await asyncio.to_thread(_payload_in_request_context, service_response)
+        await _send_json(send, payload, status_code)
+        return status_code
+
+    async def app(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == CHATBOT_PATH and scope["method"] == "POST":
+            await chatbot(receive, send)
+        elif scope["type"] == "lifespan":
+            while (await receive())["type"] != "lifespan.shutdown":
+                await send({"type": "lifespan.startup.complete"})
+            await send({"type": "lifespan.shutdown.complete"})
+        else:
+            await wsgi(scope, receive, send)
+
+    app.limiter = limiter
+    return app
@@ -0,0 +1,125 @@
+"""
+Flask CLI 명령 (flask --app run <command>)
+"""
+import os
+from datetime import datetime
+
+import click
+
+from app.storage import RESERVATIONS_CSV, TREATMENT_FEES_CSV, SQLITE_DB
+
+
+def register_cli(app):
+    """
+    앱에 관리용 CLI 명령을 등록
+    """
+
+    @app.cli.command("import-csv")
+    @click.option("--db", "db_path", default=SQLITE_DB, show_default=True,
+                  help="SQLite database file to import into.")
+    @click.option("--reservations", "reservations_csv", default=RESERVATIONS_CSV, show_default=True)
+    @click.option("--fees", "treatment_fees_csv", default=TREATMENT_FEES_CSV, show_default=True)
+    @click.option("--append", is_flag=True, help="Keep existing rows instead of replacing them.")
+    def import_csv_command(db_path, reservations_csv, treatment_fees_csv, append):
+        """Import reservations.csv and treatment_fees.csv into SQLite."""
+        from app.storage.sqlite_storage import SqliteStorage
+
+        storage = SqliteStorage(db_path)
+        counts = storage.import_csv(reservations_csv, treatment_fees_csv, replace=not append)
+        storage.close()
+        click.echo(
+            f"Imported {counts['reservations']} reservations and "
+            f"{counts['treatment_fees']} treatment fees into {db_path}"
+        )
+
+    @app.cli.command("render-certificates")
+    @click.option("--kind", type=click.Choice(["prescription", "confirmation"]), default="prescription",
+                  show_default=True)
+    @click.option("--format", "fmt", type=click.Choice(["zip", "pdf"]), default="zip", show_default=True,
+                  help="zip: one PDF per patient; pdf: one merged multi-page PDF.")
+    @click.option("--rrn", "rrns", multiple=True, help="Patient RRN (repeatable). Default: every reservation.")
+    @click.option("--workers", type=int, default=None, help="Render processes (default: CPU count).")
+    @click.option("--output", "output_path", required=True, type=click.Path(dir_okay=False, writable=True))
+    def render_certificates_command(kind, fmt, rrns, workers, output_path):
+        """Render certificates for many patients into a ZIP or merged PDF."""
+        from app.services.certificate_service import render_batch
+
+        chunks, rendered, skipped = render_batch(list(rrns) or None, kind, fmt=fmt, workers=workers)
+        with open(output_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        for rrn, reason in skipped:
+            click.echo(f"Skipped {rrn}: {reason}", err=True)
+        click.echo(f"Rendered {rendered} {kind} certificate(s) into {output_path}")
+
+    @app.cli.command("generate-data")
+    @click.option("--output-dir", required=True, type=click.Path(file_okay=False),
+                  help="Directory for reservations.csv and treatment_fees.csv.")
+    @click.option("--reservations", "reservation_count", type=click.IntRange(min=0), default=1000, show_default=True)
+    @click.option("--fees", "fee_count", type=click.IntRange(min=0), default=1000, show_default=True)
+    @click.option("--seed", type=int, default=0, show_default=True)
+    @click.option("--departments", default=None,
+                  help='Department weights, e.g. "내과=3,외과=1". Default: every base department equally.')
+    @click.option("--status-mix", default="Pending=0.6,Registered=0.25,Paid=0.15", show_default=True)
+    @click.option("--base-fees", "base_fees_csv", default=TREATMENT_FEES_CSV, show_default=True,
+                  type=click.Path(exists=True, dir_okay=False), help="Prescriptions and fees to build on.")
+    @click.option("--first-day", default="2025-06-01", show_default=True, help="First reservation date.")
+    @click.option("--days", type=click.IntRange(min=1), default=30, show_default=True)
+    def generate_data_command(output_dir, reservation_count, fee_count, seed, departments, status_mix,
+                              base_fees_csv, first_day, days):
+        """Write synthetic reservations and treatment fees of any size (constant memory)."""
+        from app.utils.synthetic_data import SyntheticDataset, load_base_fees, parse_weights
+
+        try:
+            dataset = SyntheticDataset(
+                seed=seed,
+                departments=parse_weights(departments) if departments else None,
+                status_mix=parse_weights(status_mix),
+                base_fees=load_base_fees(base_fees_csv),
+                first_day=datetime.strptime(first_day, "%Y-%m-%d").date(),
+                days=days,
+            )
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+        os.makedirs(output_dir, exist_ok=True)
+        reservations_path = os.path.join(output_dir, "reservations.csv")
+        fees_path = os.path.join(output_dir, "treatment_fees.csv")
+        written = dataset.write_reservations(reservations_path, reservation_count)
+        click.echo(f"Wrote {written} reservations to {reservations_path}")
+        written = dataset.write_fees(fees_path, fee_count)
+        click.echo(f"Wrote {written} treatment fees to {fees_path}")
+
+    @app.cli.command("build-audio-pack")
+    @click.option("--output-dir", default=None, type=click.Path(file_okay=False),
+                  help="Pack directory (default static/audio/pack, served to the kiosks).")
+    @click.option("--voice", "voices", multiple=True, help='Engine voice per language, e.g. "ko=f3" (repeatable).')
+    @click.option("--rate", type=click.IntRange(80, 400), default=None, help="Words per minute (default KIOSK_TTS_RATE).")
+    def build_audio_pack_command(output_dir, voices, rate):
+        """Prerender every fixed UI prompt into a versioned audio pack."""
+        from app.services.audio_pack import AUDIO_PACK_DIR, build_audio_pack
+        from app.services.tts_service import DEFAULT_RATE, TtsEngineError
+
+        try:
+            voice_map = dict(voice.split("=", 1) for voice in voices)
+        except ValueError:
+            raise click.BadParameter('use LANG=VOICE, e.g. "ko=f3"', param_hint="--voice")
+        try:
+            manifest = build_audio_pack(output_dir or AUDIO_PACK_DIR, voices=voice_map,
+                                        rate=rate or int(os.getenv("KIOSK_TTS_RATE", DEFAULT_RATE)))
+        except TtsEngineError as e:
+            raise click.ClickException(str(e))
+        prompts = sum(len(table) for table in manifest["prompts"].values())
+        click.echo(f"Audio pack {manifest['version']}: {prompts} prompts, "
+                   f"{manifest['synthesized']} newly synthesized with {manifest['engine']}")
+
+    @app.cli.command("build-assets")
+    def build_assets_command():
+        """Fingerprint and precompress static files into static/dist."""
+        from app.utils.assets import build_assets
+
+        result = build_assets(app.static_folder)
+        click.echo(
+            f"Built {result['files']} assets ({result['compressed']} precompressed"
+            f"{' with gzip and brotli' if result['brotli'] else ' with gzip; pip install brotli for .br'}), "
+            f"removed {result['removed']} stale files"
+        )
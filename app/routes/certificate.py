@@ -1,9 +1,10 @@
 import io # Will be used for BytesIO for PDF generation
 # from datetime import datetime # For filename timestamp - now handled by service
-import inspect # Added for logging
-import sys # Added for logging
+import hmac
+import os
+from datetime import datetime
 from flask import (
-    Blueprint, render_template, session, redirect, url_for, Response
+    Blueprint, render_template, session, redirect, url_for, Response, request, jsonify, send_file, abort
 )
 from werkzeug.http import dump_options_header # Added for Content-Disposition
 from urllib.parse import quote
@@ -19,8 +20,13 @@ from app.services.certificate_service import (
     get_prescription_data_for_pdf,
     prepare_prescription_pdf,
     prepare_medical_confirmation_pdf,
+    render_batch,
+    BATCH_KINDS,
+    BATCH_FORMATS,
 )
 from app.services.reception_service import lookup_reservation
+from app.services import download_service
+from app.utils.tracing import traced
 
 certificate_bp = Blueprint(
     "certificate", __name__, url_prefix="/certificate", template_folder="../../templates"
@@ -30,24 +36,20 @@ certificate_bp = Blueprint(
 
 
 @certificate_bp.route("/", methods=["GET"])
+@traced
 def certificate():
     """
     Renders the main certificate choice page.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.certificate(args={{_func_args}})")
     return render_template("certificate.html")
 
 
 @certificate_bp.route("/prescription/", methods=["GET"])
+@traced
 def generate_prescription_pdf():
     """
     Generates a prescription PDF.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.generate_prescription_pdf(args={{_func_args}})")
     patient_name = session.get("patient_name")
     patient_rrn = session.get("patient_rrn")
     # department = session.get("department") # Removed
@@ -99,12 +101,9 @@ def generate_prescription_pdf():
         except MissingKoreanFontError as e:
             return render_template("error.html", message=str(e)), 500
 
-        disposition = f"inline; filename*=UTF-8''{quote(filename)}"
-        return Response(
-            pdf_bytes,
-            mimetype='application/pdf',
-            headers={'Content-Disposition': disposition}
-        )
+        # Served from the download spool (Content-Length, ETag, Range)
+        token = download_service.publish(pdf_bytes, filename)
+        return redirect(url_for("certificate.download_certificate", token=token))
     # Handle error cases based on status_code from get_prescription_data_for_pdf
     elif status_code == "NEEDS_RECEPTION_COMPLETION": # New condition
         return render_template("error.html", message=result_payload), 400
@@ -125,13 +124,11 @@ def generate_prescription_pdf():
 
 
 @certificate_bp.route("/medical_confirmation/", methods=["GET"])
+@traced
 def generate_confirmation_pdf():
     """
     Generates a medical confirmation PDF.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.generate_confirmation_pdf(args={{_func_args}})")
     patient_name = session.get("patient_name")
     patient_rrn = session.get("patient_rrn")
     # department = session.get("department") # Removed
@@ -165,9 +162,68 @@ def generate_confirmation_pdf():
     except MissingKoreanFontError as e:
         return render_template("error.html", message=str(e)), 500
 
-    disposition = f"inline; filename*=UTF-8''{quote(filename)}"
+    # Served from the download spool (Content-Length, ETag, Range)
+    token = download_service.publish(pdf_bytes, filename)
+    return redirect(url_for("certificate.download_certificate", token=token))
+
+
+@certificate_bp.route("/download/<token>", methods=["GET"])
+@traced
+def download_certificate(token):
+    """
+    Streams a PDF published by download_service. Tokens are short-lived
+    (KIOSK_DOWNLOAD_TTL); unknown or expired tokens return 404.
+    """
+    entry = download_service.resolve(token)
+    if entry is None:
+        abort(404)
+    path, filename, mimetype = entry
+    # conditional=True: If-None-Match / If-Modified-Since → 304, Range → 206
+    response = send_file(path, mimetype=mimetype, download_name=filename, conditional=True, etag=True, max_age=0)
+    response.headers["Content-Disposition"] = f"inline; filename*=UTF-8''{quote(filename)}"
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@certificate_bp.route("/batch", methods=["POST"])
+@traced
+def generate_batch():
+    """
+    End-of-day bulk export (staff only).
+    JSON body: {"kind": "prescription"|"confirmation", "format": "zip"|"pdf", "rrns": [...]}
+    Omitting "rrns" exports every reservation. Requires the X-Admin-Token header
+    to match the KIOSK_ADMIN_TOKEN environment variable.
+    """
+    admin_token = os.getenv("KIOSK_ADMIN_TOKEN")
+    if not admin_token:
+        return jsonify({"error": "Batch export is disabled (KIOSK_ADMIN_TOKEN is not set)."}), 403
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), admin_token):
+        return jsonify({"error": "Invalid admin token."}), 403
+
+    data = request.get_json(silent=True) or {}
+    kind = data.get("kind", "prescription")
+    fmt = data.get("format", "zip")
+    rrns = data.get("rrns")
+    if kind not in BATCH_KINDS or fmt not in BATCH_FORMATS:
+        return jsonify({"error": f"kind must be one of {BATCH_KINDS}, format one of {BATCH_FORMATS}."}), 400
+    if rrns is not None and (not isinstance(rrns, list) or not all(isinstance(rrn, str) for rrn in rrns)):
+        return jsonify({"error": "rrns must be a list of strings."}), 400
+
+    try:
+        chunks, rendered, skipped = render_batch(rrns, kind, fmt=fmt)
+    except MissingKoreanFontError as e:
+        return jsonify({"error": str(e)}), 500
+    if rendered == 0:
+        return jsonify({"error": "No certificates could be issued.",
+                        "skipped": [{"rrn": rrn, "reason": reason} for rrn, reason in skipped]}), 404
+
+    filename = f"{kind}_batch_{datetime.now().strftime('%Y%m%d%H%M%S')}.{fmt}"
     return Response(
-        pdf_bytes, # pdf_bytes is already BytesIO object from service
-        mimetype='application/pdf',
-        headers={'Content-Disposition': disposition}
+        chunks,
+        mimetype="application/zip" if fmt == "zip" else "application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+            "X-Rendered-Count": str(rendered),
+            "X-Skipped-Count": str(len(skipped)),
+        },
     )
@@ -1,31 +1,59 @@
-import sys # Added for logging
-from flask import Blueprint, request, jsonify, render_template
-# Removed: os, google.generativeai, base64, io since they are handled by the service
+import contextlib
+import json
+import os
+from flask import Blueprint, request, jsonify, render_template, url_for, Response, stream_with_context
+# Removed: google.generativeai, base64, io since they are handled by the service
 
-from app.services.chatbot_service import generate_chatbot_response
+from app.services.chatbot_service import generate_chatbot_response, stream_chatbot_response, is_local_command
+from app.services.intent_router import router_stats
+from app.services.response_cache import get_response_cache
+from app.utils.limiter import ThreadLimiter, LimiterSaturated
+from app.utils.tracing import traced
 
 chatbot_bp = Blueprint('chatbot', __name__, url_prefix='/api')
 
+# Gemini 호출은 1~5초 걸리므로, 동기 워커에서는 동시에 몇 개만 허용하고
+# 나머지는 잠시 줄 세운 뒤 503 으로 돌려보냅니다 (다른 화면용 스레드 확보).
+# 모델을 부르지 않는 정형 명령(로컬 라우터)은 슬롯을 쓰지 않습니다.
+# 많은 동시 대화는 ASGI 앱(asgi.py)에서 처리합니다.
+BUSY_MESSAGE = "지금 상담 요청이 많습니다. 잠시 후 다시 시도해주세요."
+chat_limiter = ThreadLimiter(
+    max_in_flight=int(os.getenv("KIOSK_CHATBOT_MAX_IN_FLIGHT", "4")),
+    max_waiting=int(os.getenv("KIOSK_CHATBOT_MAX_WAITING", "16")),
+    max_wait=float(os.getenv("KIOSK_CHATBOT_MAX_WAIT", "5")),
+)
+
 # SYSTEM_INSTRUCTION_PROMPT is now defined in chatbot_service.py
 
-@chatbot_bp.route('/chatbot', methods=['POST'])
-def handle_chatbot_request():
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.handle_chatbot_request(args={{_func_args}})")
-    data = request.get_json()
+def parse_chatbot_request(data):
+    """Returns (user_question, base64_image_data, None) or (None, None, (error_payload, status))."""
     if not data:
-        return jsonify({"error": "Invalid JSON request"}), 400
+        return None, None, ({"error": "Invalid JSON request"}, 400)
 
     user_question = data.get('message')
     base64_image_data = data.get('base64_image_data') # Optional
 
     if not user_question:
-        return jsonify({"error": "No message (user_question) provided"}), 400
+        return None, None, ({"error": "No message (user_question) provided"}, 400)
+    return user_question, base64_image_data, None
 
-    # Call the service function
-    service_response = generate_chatbot_response(user_question, base64_image_data)
 
+def conversation_id_from_request(data):
+    """
+    None if the client does not use conversations (stateless turn); otherwise
+    the id it got from the previous reply, or "" to start a new conversation.
+    """
+    if not data or "conversation_id" not in data:
+        return None
+    conversation_id = data.get("conversation_id")
+    return conversation_id if isinstance(conversation_id, str) else ""
+
+
+def build_chatbot_payload(service_response):
+    """
+    Maps a service response to (JSON payload, HTTP status). Needs a request
+    context (download URLs are built with url_for).
+    """
     if "error" in service_response:
         # The service returns a 'status_code' key for errors, use it.
         # Also, the service might put the user-facing message in 'error' or 'details'
@@ -45,11 +73,111 @@ def handle_chatbot_request():
         # For user display, use the 'error' message from service as 'reply'
         error_payload["reply"] = service_response.get("error", "죄송합니다. 현재 답변을 생성할 수 없습니다.")
 
-        return jsonify(error_payload), status_code
+        return error_payload, status_code
     else:
         # Successful response from service, which might include 'reply',
-        # 'pdf_filename', 'pdf_data_base64', etc.
-        return jsonify(service_response)
+        # 'pdf_filename', 'pdf_token', etc.
+        # PDFs are never embedded in the JSON: the token becomes a short-lived download URL.
+        pdf_token = service_response.pop("pdf_token", None)
+        if pdf_token:
+            service_response["pdf_url"] = url_for("certificate.download_certificate", token=pdf_token)
+        return service_response, 200
+
+
+def model_call_slot(limiter, user_question, base64_image_data):
+    """The limiter's slot for messages that go to the model; a no-op for local commands."""
+    if is_local_command(user_question, base64_image_data):
+        return contextlib.nullcontext()
+    return limiter.slot()
+
+
+def busy_payload(retry_after):
+    """(payload, status, headers) for a saturated limiter."""
+    return {"error": "Chatbot is busy.", "reply": BUSY_MESSAGE}, 503, {"Retry-After": str(retry_after)}
+
+
+@chatbot_bp.route('/chatbot', methods=['POST'])
+@traced
+def handle_chatbot_request():
+    data = request.get_json(silent=True)
+    user_question, base64_image_data, parse_error = parse_chatbot_request(data)
+    if parse_error:
+        payload, status_code = parse_error
+        return jsonify(payload), status_code
+
+    # Call the service function (bounded number of concurrent model calls)
+    try:
+        with model_call_slot(chat_limiter, user_question, base64_image_data):
+            service_response = generate_chatbot_response(
+                user_question, base64_image_data, conversation_id=conversation_id_from_request(data)
+            )
+    except LimiterSaturated as e:
+        payload, status_code, headers = busy_payload(e.retry_after)
+        return jsonify(payload), status_code, headers
+
+    payload, status_code = build_chatbot_payload(service_response)
+    return jsonify(payload), status_code
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@chatbot_bp.route('/chatbot/stream', methods=['POST'])
+@traced
+def handle_chatbot_stream_request():
+    """
+    Same request body as /api/chatbot, answered as Server-Sent Events:
+      event: token   data: {"text": "..."}        - reply text as the model streams it
+      event: result  data: {...,"status": 200}    - the final /api/chatbot payload
+    """
+    data = request.get_json(silent=True)
+    user_question, base64_image_data, parse_error = parse_chatbot_request(data)
+    if parse_error:
+        payload, status_code = parse_error
+        return jsonify(payload), status_code
+    conversation_id = conversation_id_from_request(data)
+
+    # Saturation is reported before the stream starts; the slot is held until it ends
+    needs_slot = not is_local_command(user_question, base64_image_data)
+    if needs_slot:
+        try:
+            chat_limiter.acquire()
+        except LimiterSaturated as e:
+            payload, status_code, headers = busy_payload(e.retry_after)
+            return jsonify(payload), status_code, headers
+
+    def events():
+        for kind, event_data in stream_chatbot_response(user_question, base64_image_data, conversation_id=conversation_id):
+            if kind == "token":
+                yield _sse("token", {"text": event_data})
+            else:
+                payload, status_code = build_chatbot_payload(event_data)
+                payload["status"] = status_code
+                yield _sse("result", payload)
+
+    response = Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Runs when the server closes the response, even if the client went away early
+    if needs_slot:
+        response.call_on_close(chat_limiter.release)
+    return response
+
+@chatbot_bp.route('/chatbot/router-stats', methods=['GET'])
+@traced
+def chatbot_router_stats():
+    """Local intent router counters: local / model / fallback, total and hit_rate."""
+    return jsonify(router_stats())
+
+
+@chatbot_bp.route('/chatbot/cache-stats', methods=['GET'])
+@traced
+def chatbot_cache_stats():
+    """FAQ reply cache counters: hits / similar_hits / misses, entries and hit_rate."""
+    cache = get_response_cache()
+    return jsonify(cache.stats() if cache is not None else {"enabled": False})
 
 # The chatbot_interface route remains unchanged.
 # Example of how to register this blueprint in app/__init__.py:
@@ -57,9 +185,7 @@ def handle_chatbot_request():
 # app.register_blueprint(chatbot_bp)
 
 @chatbot_bp.route('/interface')
+@traced
 def chatbot_interface():
     """Renders the chatbot interface page."""
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.chatbot_interface(args={{_func_args}})")
     return render_template("chatbot_interface.html")
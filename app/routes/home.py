@@ -1,15 +1,14 @@
-import sys 
 from flask import Blueprint, render_template, session, redirect, request, url_for
+from app.services.audio_pack import load_audio_pack, prompt_audio_file
 from app.utils.i18n import get_locale
+from app.utils.tracing import traced
 
 home_bp = Blueprint("home", __name__)
 
 
 @home_bp.context_processor
+@traced
 def inject_globals():
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.inject_globals(args={{_func_args}})")
     lang = session.get("lang", "ko")
     return dict(
         font_size=session.get("font_size", "normal"),
@@ -17,14 +16,28 @@ def inject_globals():
         locale=get_locale(lang),        
     )
 
+
+@home_bp.app_context_processor
+def inject_audio_pack():
+    """Prerendered prompt audio (flask build-audio-pack) for every page."""
+    lang = session.get("lang", "ko")
+
+    def audio_prompt(key):
+        filename = prompt_audio_file(key, lang)
+        return url_for("static", filename=f"audio/pack/{filename}") if filename else None
+
+    manifest = load_audio_pack()
+    return dict(
+        audio_prompt=audio_prompt,
+        audio_pack_url=url_for("static", filename="audio/pack/manifest.json", v=manifest["version"]) if manifest else "",
+    )
+
 # ────────────────────────────────────────────────
 # 홈 화면
 # ────────────────────────────────────────────────
 @home_bp.route("/")
+@traced
 def index():
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.index(args={{_func_args}})")
     return render_template("home.html")
 
 
@@ -33,13 +46,11 @@ def index():
 # ────────────────────────────────────────────────
 
 @home_bp.route("/font/<size>")
+@traced
 def set_font(size: str):
     """
     <size> : small | normal | large
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.set_font(args={{_func_args}})")
     if size in {"small", "normal", "large"}:
         session["font_size"] = size
     # 직전 페이지로 돌아가거나 없으면 홈으로
@@ -47,16 +58,12 @@ def set_font(size: str):
 
 
 @home_bp.route("/switch-language")
+@traced
 def switch_language():
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.switch_language(args={{_func_args}})")
     session["lang"] = "en" if session.get("lang") == "ko" else "ko"
     return redirect(request.referrer or url_for("home.index"))
 
 @home_bp.route("/emergency")
+@traced
 def emergency():
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.emergency(args={{_func_args}})")
     return render_template("emergency.html")
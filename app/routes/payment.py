@@ -4,7 +4,6 @@
   • POST /payment/       → 결제 처리 → /payment/done
   • GET  /payment/done   → 결제 완료 화면
 """
-import sys # Added for logging
 from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify
 # Removed: uuid, random, csv, os as their functionality is moved to service
 
@@ -15,6 +14,7 @@ from app.services.payment_service import (
     update_reservation_with_payment_details,
 )
 from app.services.reception_service import lookup_reservation
+from app.utils.tracing import traced
 
 # ──────────────────────────────────────────────────────────
 #  Blueprint 인스턴트를 'payment_bp'라는 이름으로 노출
@@ -25,14 +25,11 @@ payment_bp = Blueprint("payment", __name__, url_prefix="/payment")
 
 
 @payment_bp.route("/", methods=["GET", "POST"])
+@traced
 def payment():
     """
     결제 폼 & 처리
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.payment(args={{_func_args}})")
-
     if request.method == "POST":
         # POST logic remains largely the same, ensure department is available if needed
         # For POST, department is implicitly handled by what's in session from GET or load_prescriptions
@@ -110,11 +107,8 @@ def payment():
 
 
 @payment_bp.route("/load_prescriptions", methods=["GET"])
+@traced
 def load_prescriptions():
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.load_prescriptions(args={{_func_args}})")
-
     patient_rrn = session.get("patient_rrn")
     patient_name = session.get("patient_name")
 
@@ -213,13 +207,11 @@ def load_prescriptions():
 
 
 @payment_bp.route("/done")
+@traced
 def done():
     """
     결제 완료 화면
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.done(args={{_func_args}})")
     pay_id = request.args.get("pay_id", "")
     payment_record = get_payment_details(pay_id)
 
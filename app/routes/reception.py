@@ -1,5 +1,4 @@
 # app/routes/reception.py - 접수 화면 입니다. /
-import sys  
 from flask import Blueprint, render_template, request, session, redirect, url_for
 
 # 서비스 함수들과 증상 리스트를 불러 옵니다.
@@ -10,6 +9,7 @@ from app.services.reception_service import (
     SYMPTOMS,  #증상들은 템플릿에 올라온 내용을 바탕으로 진행합니다
     update_reservation_status
 )
+from app.utils.tracing import traced
 
 reception_bp = Blueprint(
     "reception",
@@ -23,13 +23,8 @@ reception_bp = Blueprint(
 
 
 #reception 접수 할때 사용하는 함수
+@traced
 def reception():
-    _func_args = locals()
-    _module_path = (
-        sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    )
-    print(f"ENTERING: {_module_path}.reception(args={{_func_args}})")
-
     if request.method == "POST":
         action = request.form.get("action")
 
@@ -0,0 +1,34 @@
+import io
+
+from flask import Blueprint, request, session, jsonify, send_file
+
+from app.services.tts_service import get_speech
+from app.utils.tracing import traced
+
+tts_bp = Blueprint("tts", __name__)
+
+
+@tts_bp.route("/tts", methods=["GET"])
+@traced
+def tts():
+    """
+    Speaks `text` (query string) with the server-side engine.
+    Optional: lang (defaults to the kiosk language), voice, rate (words per minute).
+    """
+    result = get_speech(
+        request.args.get("text", ""),
+        lang=request.args.get("lang") or session.get("lang"),
+        voice=request.args.get("voice"),
+        rate=request.args.get("rate"),
+    )
+    if "error" in result:
+        status_code = result.pop("status_code", 500)
+        return jsonify(result), status_code
+    # 같은 문장 = 같은 키이므로 ETag 로 그대로 씀. conditional=True: If-None-Match → 304, Range → 206
+    response = send_file(
+        io.BytesIO(result["audio"]), mimetype=result["mimetype"], etag=result["key"],
+        conditional=True, max_age=86400,
+    )
+    # 환자 이름이 들어간 안내 문장도 있으므로 공유 캐시에는 남기지 않음
+    response.headers["Cache-Control"] = "private, max-age=86400"
+    return response
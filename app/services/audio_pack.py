@@ -0,0 +1,151 @@
+"""
+고정 안내 문구 음성 팩 (빌드 시 미리 합성)
+
+화면 제목, 버튼 이름처럼 바뀌지 않는 안내 문구(app/utils/i18n.py 의 TRANSLATIONS,
+템플릿의 locale.get('키', '기본 문구'), 각 페이지의 <title>)를 언어별로 모아
+오프라인 엔진(tts_service 와 같은 엔진)으로 미리 합성해 static/audio/pack 에 둡니다.
+
+    flask --app run build-audio-pack
+
+  • static/audio/pack/manifest.json  버전, 엔진, 언어별 {키: {text, file, bytes}}
+  • static/audio/pack/<언어>/<해시>.wav  내용 주소 파일 - 문구가 같으면 파일명도 같음
+
+다시 빌드하면 바뀐 문구만 합성하고, 더 이상 쓰지 않는 파일은 지웁니다. 템플릿은
+audio_prompt('키') 로 파일 URL 을 얻고, 브라우저는 manifest 를 한 번 받아 모든
+파일을 미리 받아 둡니다. 팩에 없는 문장만 /tts 로 실시간 합성합니다.
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import secrets
+import threading
+from datetime import datetime
+
+from app.services.tts_service import get_tts_engine, normalize_text, speech_key, DEFAULT_RATE
+from app.utils.i18n import TRANSLATIONS
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+AUDIO_PACK_DIR = os.path.join(STATIC_DIR, "audio", "pack")
+MANIFEST_NAME = "manifest.json"
+
+_LOCALE_GET_RE = re.compile(r"""locale\.get\(\s*['"](\w+)['"]\s*,\s*['"]([^'"]+)['"]\s*\)""")
+_TITLE_RE = re.compile(r"{%\s*block title\s*%}(.*?){%\s*endblock\s*%}", re.S)
+
+
+def collect_prompts(templates_dir: str = TEMPLATES_DIR) -> dict:
+    """
+    Returns {lang: {key: text}} of every fixed prompt: TRANSLATIONS, the
+    fallbacks of locale.get('key', '...') in templates (used when a locale lacks
+    the key) and literal page titles (what the TTS button speaks), keyed
+    "title:<template>" in the default locale.
+    """
+    prompts = {lang: dict(table) for lang, table in TRANSLATIONS.items()}
+    for name in sorted(os.listdir(templates_dir)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(templates_dir, name), encoding="utf-8") as f:
+            source = f.read()
+        for key, fallback in _LOCALE_GET_RE.findall(source):
+            for table in prompts.values():
+                table.setdefault(key, fallback)
+        title = _TITLE_RE.search(source)
+        if title and "{{" not in title.group(1) and title.group(1).strip():
+            prompts["ko"][f"title:{name[:-len('.html')]}"] = title.group(1).strip()
+    return {lang: {key: normalize_text(text) for key, text in table.items()} for lang, table in prompts.items()}
+
+
+def _write_atomic(path, data: bytes):
+    tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_audio_pack(output_dir: str = AUDIO_PACK_DIR, engine=None, voices: dict = None,
+                     rate: int = DEFAULT_RATE, templates_dir: str = TEMPLATES_DIR) -> dict:
+    """
+    Synthesizes every prompt into `output_dir` and writes manifest.json.
+    `voices` maps lang → espeak variant. Returns the manifest; its "synthesized"
+    entry counts the files that were not already present.
+    """
+    engine = engine or get_tts_engine()
+    voices = voices or {}
+    extension = mimetypes.guess_extension(engine.mimetype) or ".audio"
+    entries = {}
+    synthesized = 0
+    for lang, table in sorted(collect_prompts(templates_dir).items()):
+        os.makedirs(os.path.join(output_dir, lang), exist_ok=True)
+        voice = voices.get(lang, "")
+        for key, text in sorted(table.items()):
+            relative = f"{lang}/{speech_key(engine.name, text, lang, voice, rate)[:20]}{extension}"
+            path = os.path.join(output_dir, relative)
+            if os.path.exists(path):
+                size = os.path.getsize(path)
+            else:
+                audio = engine.synthesize(text, lang, voice, rate)
+                _write_atomic(path, audio)
+                size = len(audio)
+                synthesized += 1
+            entries.setdefault(lang, {})[key] = {"text": text, "file": relative, "bytes": size}
+
+    digest = hashlib.sha256(json.dumps(entries, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    manifest = {
+        "version": digest.hexdigest()[:12],
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "engine": engine.name,
+        "mimetype": engine.mimetype,
+        "rate": rate,
+        "prompts": entries,
+    }
+    _write_atomic(os.path.join(output_dir, MANIFEST_NAME),
+                  json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    # 새 manifest 가 가리키지 않는 파일 정리
+    referenced = {entry["file"] for table in entries.values() for entry in table.values()}
+    for lang in os.listdir(output_dir):
+        lang_dir = os.path.join(output_dir, lang)
+        if not os.path.isdir(lang_dir):
+            continue
+        for name in os.listdir(lang_dir):
+            if f"{lang}/{name}" not in referenced:
+                os.remove(os.path.join(lang_dir, name))
+    return dict(manifest, synthesized=synthesized)
+
+
+# ── 실행 중 manifest 읽기 (파일이 바뀌면 다시 읽음) ─────────────
+_manifest_cache = {}  # pack_dir → (mtime_ns, manifest)
+_manifest_lock = threading.Lock()
+
+
+def load_audio_pack(pack_dir: str = AUDIO_PACK_DIR):
+    """Returns the parsed manifest of `pack_dir`, or None if no pack was built."""
+    path = os.path.join(pack_dir, MANIFEST_NAME)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _manifest_lock:
+        cached = _manifest_cache.get(pack_dir)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    with _manifest_lock:
+        _manifest_cache[pack_dir] = (mtime_ns, manifest)
+    return manifest
+
+
+def prompt_audio_file(key: str, lang: str = "ko", pack_dir: str = AUDIO_PACK_DIR):
+    """Path of the prerendered prompt relative to the pack directory, or None."""
+    manifest = load_audio_pack(pack_dir)
+    if not manifest:
+        return None
+    entry = manifest["prompts"].get(lang, {}).get(key)
+    return entry["file"] if entry else None
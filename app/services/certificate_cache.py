@@ -0,0 +1,201 @@
+"""
+생성된 증명서 PDF 캐시 (메모리 LRU + 디스크)
+
+같은 환자가 같은 처방전을 여러 번 재출력하는 경우가 많아, 렌더링 결과를
+내용 주소(content-addressed) 키로 저장해 두고 다시 읽습니다.
+
+키 = sha256(증명서 종류, 주민등록번호, 예약 행 version, 진료비 카탈로그 version, 입력값)
+예약 행이 바뀌면(version 증가) 키가 달라지므로 오래된 PDF 가 나올 수 없고,
+invalidate(rrn) 은 해당 환자의 항목을 즉시 지워 공간을 돌려줍니다.
+
+  • KIOSK_CERT_CACHE_DIR  디스크 캐시 위치 (기본 data/cert_cache)
+  • KIOSK_CERT_CACHE_MB   디스크 용량 한도(MB, 기본 256). 0 이면 캐시를 쓰지 않습니다.
+
+디스크 파일명에는 주민등록번호 대신 그 해시만 쓰며, 오래 읽히지 않은 파일부터
+(mtime 기준) 지웁니다. 여러 워커 프로세스가 같은 디렉터리를 공유해도 됩니다.
+"""
+import hashlib
+import json
+import os
+import secrets
+import threading
+from collections import OrderedDict
+
+DEFAULT_DISK_MB = 256
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+FILE_SUFFIX = ".pdf"
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, "data", "cert_cache")
+
+
+def certificate_key(kind: str, rrn: str, row_version, catalog_version, **inputs) -> str:
+    """Content-addressed key of one rendered certificate."""
+    payload = json.dumps(
+        [kind, rrn, str(row_version), str(catalog_version), inputs],
+        ensure_ascii=False, sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _rrn_tag(rrn: str) -> str:
+    return hashlib.sha256(rrn.encode("utf-8")).hexdigest()[:16]
+
+
+class CertificateCache:
+    """
+    Size-bounded two-level cache of PDF bytes.
+
+        cache.get(key, rrn)        -> bytes | None
+        cache.put(key, rrn, data)
+        cache.invalidate(rrn)      # drop every entry of one patient
+    """
+
+    def __init__(self, directory=None, max_disk_bytes=DEFAULT_DISK_MB * 1024 * 1024,
+                 max_memory_bytes=DEFAULT_MEMORY_BYTES):
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key → (rrn_tag, bytes), 오래된 것부터
+        self._memory_bytes = 0
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, key, rrn_tag):
+        return os.path.join(self.directory, f"{rrn_tag}_{key}{FILE_SUFFIX}")
+
+    # ── 메모리 LRU ─────────────────────────────────────────
+    def _remember(self, key, rrn_tag, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old[1])
+            self._memory[key] = (rrn_tag, data)
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get(self, key: str, rrn: str):
+        """Returns the cached bytes for `key`, or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry[1]
+        if not self.directory:
+            return None
+        rrn_tag = _rrn_tag(rrn)
+        path = self._path(key, rrn_tag)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # 디스크 LRU: 최근 사용 시각 갱신
+        except OSError:
+            return None
+        self._remember(key, rrn_tag, data)
+        return data
+
+    def put(self, key: str, rrn: str, data: bytes):
+        rrn_tag = _rrn_tag(rrn)
+        self._remember(key, rrn_tag, data)
+        if not self.directory or len(data) > self.max_disk_bytes:
+            return
+        path = self._path(key, rrn_tag)
+        tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # 디스크 캐시는 최적화일 뿐이므로 실패해도 발급은 계속합니다.
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._evict_disk()
+
+    def _scan(self):
+        try:
+            return list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return []
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for entry in self._scan():
+            if not entry.name.endswith(FILE_SUFFIX):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def invalidate(self, rrn: str) -> int:
+        """Drops every cached certificate of `rrn`. Returns the number of entries removed."""
+        rrn_tag = _rrn_tag(rrn)
+        removed = 0
+        with self._lock:
+            for key in [key for key, (tag, _) in self._memory.items() if tag == rrn_tag]:
+                self._memory_bytes -= len(self._memory.pop(key)[1])
+                removed += 1
+        if self.directory:
+            prefix = f"{rrn_tag}_"
+            for entry in self._scan():
+                if entry.name.startswith(prefix) and entry.name.endswith(FILE_SUFFIX):
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+        return removed
+
+
+_cache = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def _cache_from_env():
+    try:
+        disk_mb = int(os.getenv("KIOSK_CERT_CACHE_MB", DEFAULT_DISK_MB))
+    except ValueError:
+        disk_mb = DEFAULT_DISK_MB
+    if disk_mb <= 0:
+        return None
+    return CertificateCache(os.getenv("KIOSK_CERT_CACHE_DIR") or DEFAULT_CACHE_DIR, disk_mb * 1024 * 1024)
+
+
+def get_certificate_cache():
+    """Returns the process-wide CertificateCache, or None if caching is disabled."""
+    global _cache, _cache_configured
+    if not _cache_configured:
+        with _cache_lock:
+            if not _cache_configured:
+                _cache = _cache_from_env()
+                _cache_configured = True
+    return _cache
+
+
+def set_certificate_cache(cache):
+    """Replaces the process-wide cache (None disables caching). Mainly for tests."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = cache
+        _cache_configured = True
@@ -1,49 +1,78 @@
 import csv
+import io
+import multiprocessing
 import os
 import random
-import sys # Added for logging
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta # Moved timedelta here
 from io import BytesIO
 
+from app.services.certificate_cache import certificate_key, get_certificate_cache
+from app.storage import get_storage
+from app.utils import pdf_generator
+from app.utils.metrics import PRESCRIPTION_DATA_STATUS
 from app.utils.pdf_generator import create_prescription_pdf_bytes, create_confirmation_pdf_bytes, MissingKoreanFontError
+from app.utils.tracing import traced
 
+BATCH_KINDS = ("prescription", "confirmation")
+BATCH_FORMATS = ("zip", "pdf")
 
+
+def _load_fee_map():
+    try:
+        return get_storage().fee_catalog().by_name
+    except Exception:
+        # If the fee data is missing or unreadable, fall back to zero fees
+        return {}
+
+
+def _certificate_cache_key(kind: str, rrn: str, **inputs):
+    """
+    Cache key for one certificate: the reservation row version and the fee
+    catalog version are part of it, so a changed row or fee table never hits
+    a stale PDF. None if the versions cannot be read (then no caching).
+    """
+    try:
+        storage = get_storage()
+        reservation = storage.get_reservation(rrn) or {}
+        catalog_version = storage.fee_catalog().version
+    except Exception:
+        return None
+    return certificate_key(kind, rrn, reservation.get("version"), catalog_version, **inputs)
+
+
+@traced
 def get_prescription_data_for_pdf(patient_rrn: str, department: str):
     """
     Loads and prepares prescription data for PDF generation by fetching
-    details from reservations.csv and then prescription item details.
+    details from the reservation storage and then prescription item details.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.get_prescription_data_for_pdf(args={{_func_args}})")
-    try:
-        # Determine project base directory
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-        reservations_csv_path = os.path.join(base_dir, "data", "reservations.csv")
-    except NameError:
-        # Fallback if __file__ is not defined
-        reservations_csv_path = os.path.join("data", "reservations.csv") # Assumes PWD is project root
-
-    if not os.path.exists(reservations_csv_path):
-        return ("FILE_NOT_FOUND", "예약 데이터 파일을 찾을 수 없습니다.")
+    status_code, payload = _load_prescription_data(patient_rrn, department)
+    PRESCRIPTION_DATA_STATUS.labels(status=status_code).inc()
+    return status_code, payload
 
-    patient_reservation_data = None
+
+def _load_prescription_data(patient_rrn: str, department: str):
     try:
-        with open(reservations_csv_path, mode='r', encoding='utf-8-sig') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                if row.get('rrn') == patient_rrn:
-                    patient_reservation_data = row
-                    break
-    except FileNotFoundError: # Should be caught by os.path.exists, but good for robustness
+        patient_reservation_data = get_storage().get_reservation(patient_rrn)
+    except FileNotFoundError:
         return ("FILE_NOT_FOUND", "예약 데이터 파일을 찾을 수 없습니다.")
     except Exception as e:
-        # print(f"Error reading {reservations_csv_path}: {e}") # For server-side debugging
+        # print(f"Error reading reservation data: {e}") # For server-side debugging
         return ("DATA_ERROR", "예약 데이터 처리 중 오류가 발생했습니다.")
 
     if not patient_reservation_data:
         return ("NOT_FOUND", "해당 환자의 예약 정보를 찾을 수 없습니다.")
 
+    return _prescription_data_from_reservation(patient_reservation_data, department)
+
+
+def _prescription_data_from_reservation(patient_reservation_data: dict, department: str, treatment_fee_map=None):
+    """
+    Status/fee checks and PDF data for one reservation row (also used by render_batch).
+    Returns (status_code, payload) like get_prescription_data_for_pdf.
+    """
     # Extract data and perform refined status/fee checks
     actual_status = patient_reservation_data.get("status")
     total_fee_str = patient_reservation_data.get("total_fee", "0") # Keep this for fee calculation
@@ -82,17 +111,8 @@ def get_prescription_data_for_pdf(patient_rrn: str, department: str):
             else:
                 parsed_prescription_names = []
 
-            treatment_fees_path = os.path.join(base_dir, "data", "treatment_fees.csv")
-            treatment_fee_map = {}
-            if os.path.exists(treatment_fees_path):
-                try:
-                    with open(treatment_fees_path, newline="", encoding="utf-8-sig") as fee_file:
-                        fee_reader = csv.DictReader(fee_file)
-                        for row in fee_reader:
-                            treatment_fee_map[row.get("Prescription", "").strip()] = int(row.get("Fee", 0))
-                except Exception:
-                    # If CSV reading fails, fall back to zero fees
-                    treatment_fee_map = {}
+            if treatment_fee_map is None:
+                treatment_fee_map = _load_fee_map()
 
             selected_prescriptions = []
             for med_name in parsed_prescription_names:
@@ -111,13 +131,11 @@ def get_prescription_data_for_pdf(patient_rrn: str, department: str):
             return ("OK", prescription_data_template)
 
 
+@traced
 def prepare_prescription_pdf(patient_name: str, patient_rrn: str, department: str, prescription_details: dict):
     """
     Prepares the prescription PDF using the provided data.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.prepare_prescription_pdf(args={{_func_args}})")
     if not prescription_details:
         return None, None
 
@@ -126,8 +144,7 @@ def prepare_prescription_pdf(patient_name: str, patient_rrn: str, department: st
     prescription_data["patient_name"] = patient_name
     prescription_data["patient_rrn"] = patient_rrn
 
-    # Call with explicit arguments matching the updated signature
-    pdf_bytes = create_prescription_pdf_bytes(
+    pdf_fields = dict(
         patient_name=prescription_data["patient_name"],
         patient_rrn=prescription_data["patient_rrn"],
         department=prescription_data["department"],
@@ -136,28 +153,196 @@ def prepare_prescription_pdf(patient_name: str, patient_rrn: str, department: st
         doctor_name=prescription_data["doctor_name"],
         issue_date=prescription_data["issue_date"]
     )
+    # Reprints of an unchanged reservation are served from the certificate cache
+    cache = get_certificate_cache()
+    cache_key = _certificate_cache_key("prescription", patient_rrn, **pdf_fields) if cache else None
+    pdf_bytes = cache.get(cache_key, patient_rrn) if cache_key else None
+    if pdf_bytes is None:
+        # Call with explicit arguments matching the updated signature
+        pdf_bytes = create_prescription_pdf_bytes(**pdf_fields)
+        if cache_key:
+            cache.put(cache_key, patient_rrn, pdf_bytes)
     filename = f"prescription_{patient_name}_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
     return pdf_bytes, filename
 
 
+@traced
 def prepare_medical_confirmation_pdf(patient_name: str, patient_rrn: str, disease_name: str):
     """
     Prepares the medical confirmation PDF.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.prepare_medical_confirmation_pdf(args={{_func_args}})")
-    # For confirmation, we might need a diagnosis date.
-    # This could come from session or be fixed for simplicity here.
-    date_of_diagnosis = (datetime.now() - timedelta(days=random.randint(1, 30))).strftime("%Y-%m-%d") # Simulate a past diagnosis
     date_of_issue = datetime.now().strftime("%Y-%m-%d")
+    # Keyed before the (simulated) diagnosis date is drawn, so a reprint shows the same date
+    cache = get_certificate_cache()
+    cache_key = _certificate_cache_key(
+        "confirmation", patient_rrn, patient_name=patient_name, disease_name=disease_name, date_of_issue=date_of_issue
+    ) if cache else None
+    pdf_bytes = cache.get(cache_key, patient_rrn) if cache_key else None
+    if pdf_bytes is None:
+        # For confirmation, we might need a diagnosis date.
+        # This could come from session or be fixed for simplicity here.
+        date_of_diagnosis = (datetime.now() - timedelta(days=random.randint(1, 30))).strftime("%Y-%m-%d") # Simulate a past diagnosis
 
-    pdf_bytes = create_confirmation_pdf_bytes(
-        patient_name=patient_name,
-        patient_rrn=patient_rrn,
-        disease_name=disease_name, # department is used as disease_name
-        date_of_diagnosis=date_of_diagnosis,
-        date_of_issue=date_of_issue
-    )
+        pdf_bytes = create_confirmation_pdf_bytes(
+            patient_name=patient_name,
+            patient_rrn=patient_rrn,
+            disease_name=disease_name, # department is used as disease_name
+            date_of_diagnosis=date_of_diagnosis,
+            date_of_issue=date_of_issue
+        )
+        if cache_key:
+            cache.put(cache_key, patient_rrn, pdf_bytes)
     filename = f"medical_confirmation_{patient_name}_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
     return pdf_bytes, filename
+
+
+# ── 일괄 발급 (일 마감 내보내기) ──────────────────────────────
+
+def _confirmation_dates():
+    date_of_diagnosis = (datetime.now() - timedelta(days=random.randint(1, 30))).strftime("%Y-%m-%d") # Simulate a past diagnosis
+    date_of_issue = datetime.now().strftime("%Y-%m-%d")
+    return date_of_diagnosis, date_of_issue
+
+
+@traced
+def prepare_batch(rrns, kind: str):
+    """
+    Loads reservation and fee data once and builds the PDF fields for every RRN.
+    `rrns` of None means every reservation. Returns (jobs, skipped) where jobs is
+    a list of (filename, fields) and skipped a list of (rrn, reason).
+    """
+    if kind not in BATCH_KINDS:
+        raise ValueError(f"Unknown certificate kind: {kind}")
+
+    storage = get_storage()
+    if rrns is None:
+        reservations = storage.list_reservations()
+    else:
+        reservations = []
+        for rrn in rrns:
+            row = storage.get_reservation(rrn)
+            reservations.append(row if row is not None else {"rrn": rrn, "_missing": True})
+    treatment_fee_map = _load_fee_map() if kind == "prescription" else None
+
+    jobs, skipped = [], []
+    for row in reservations:
+        rrn = row.get("rrn", "")
+        if row.get("_missing"):
+            skipped.append((rrn, "해당 환자의 예약 정보를 찾을 수 없습니다."))
+            continue
+        name = row.get("name", "")
+        department = row.get("department", "")
+        if not department:
+            skipped.append((rrn, "진료과 정보가 없습니다."))
+            continue
+
+        if kind == "prescription":
+            status_code, payload = _prescription_data_from_reservation(row, department, treatment_fee_map)
+            if status_code != "OK":
+                skipped.append((rrn, payload))
+                continue
+            fields = {
+                "patient_name": name,
+                "patient_rrn": rrn,
+                "department": payload["department"],
+                "prescriptions": payload["prescriptions"],
+                "total_fee": payload["total_fee"],
+                "doctor_name": payload["doctor_name"],
+                "issue_date": payload["issue_date"],
+            }
+        else:
+            date_of_diagnosis, date_of_issue = _confirmation_dates()
+            fields = {
+                "patient_name": name,
+                "patient_rrn": rrn,
+                "disease_name": department, # department is used as disease_name
+                "date_of_diagnosis": date_of_diagnosis,
+                "date_of_issue": date_of_issue,
+            }
+        # 파일명에는 주민등록번호를 넣지 않음
+        jobs.append((f"{len(jobs) + 1:04d}_{kind}_{name}.pdf", fields))
+    return jobs, skipped
+
+
+def _render_batch_job(kind, fields):
+    """Process pool worker: renders one document."""
+    return pdf_generator.create_pdf_bytes(kind, fields)
+
+
+class _ChunkWriter:
+    """Write-only, non-seekable sink for zipfile; collected bytes are drained as chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _iter_rendered(kind, jobs, workers):
+    """Yields (filename, pdf_bytes) in job order, rendered across `workers` processes."""
+    if workers <= 1 or len(jobs) <= 1:
+        for filename, fields in jobs:
+            yield filename, pdf_generator.create_pdf_bytes(kind, fields)
+        return
+    # spawn: 요청 스레드/백그라운드 스레드의 잠금 상태를 물려받지 않도록
+    context = multiprocessing.get_context("spawn")
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=pdf_generator.warm_up) as executor:
+        results = executor.map(_render_batch_job, [kind] * len(jobs), [fields for _, fields in jobs],
+                               chunksize=chunksize)
+        for (filename, _), pdf_bytes in zip(jobs, results):
+            yield filename, pdf_bytes
+
+
+def _iter_zip(kind, jobs, skipped, workers):
+    sink = _ChunkWriter()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, pdf_bytes in _iter_rendered(kind, jobs, workers):
+            archive.writestr(filename, pdf_bytes)
+            yield sink.drain()
+        if skipped:
+            report = io.StringIO()
+            writer = csv.writer(report)
+            writer.writerow(["rrn", "reason"])
+            writer.writerows(skipped)
+            archive.writestr("skipped.csv", report.getvalue())
+    yield sink.drain()
+
+
+@traced
+def render_batch(rrns, kind: str, fmt: str = "zip", workers: int | None = None):
+    """
+    Renders prescriptions or medical confirmations for many patients in one pass.
+
+    Reservation and fee data are loaded once. With fmt='zip', one PDF per
+    patient is rendered across a process pool (`workers`, default: CPU count)
+    and streamed into a ZIP archive. With fmt='pdf', all patients become pages
+    of one merged PDF (single process, font embedded once).
+
+    Returns (chunks, rendered_count, skipped): `chunks` is an iterator of bytes
+    to write or stream, `skipped` a list of (rrn, reason).
+    """
+    if fmt not in BATCH_FORMATS:
+        raise ValueError(f"Unknown batch format: {fmt}")
+    jobs, skipped = prepare_batch(rrns, kind)
+    # 폰트 누락은 스트리밍 시작 전에 알림
+    pdf_generator.warm_up()
+
+    if fmt == "pdf":
+        merged = pdf_generator.create_merged_pdf_bytes(kind, [fields for _, fields in jobs])
+        chunks = iter([merged] if merged is not None else [])
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunks = _iter_zip(kind, jobs, skipped, workers)
+    return chunks, len(jobs), skipped
@@ -1,9 +1,13 @@
 import os
-import base64
+import asyncio
 import google.generativeai as genai
-import sys # Added for logging
 import json # Added for JSON parsing
+from contextlib import contextmanager
+import re
+import threading
+import time
 import traceback # Added for stack trace logging
+from google.api_core import retry as api_retry
 # import io # Not strictly needed for current logic but good for future image manipulation
 
 from app.services.reception_service import (
@@ -25,8 +29,16 @@ from app.services.certificate_service import (
     prepare_prescription_pdf,
     prepare_medical_confirmation_pdf
 )
+from app.services import download_service
+from app.services.intent_router import (
+    route_message, record_route, contains_personal_data, NO_ROUTE, ROUTER_MIN_CONFIDENCE, ROUTER_FALLBACK_CONFIDENCE
+)
+from app.services.response_cache import get_response_cache
+from app.services.image_pipeline import normalize_image, get_image_reply_cache
+from app.services.conversation_store import get_conversation_store, append_history, history_prompt
+from app.utils.metrics import CHATBOT_INTENTS, GEMINI_REQUEST_SECONDS, GEMINI_TOKENS
 from app.utils.pdf_generator import MissingKoreanFontError
-# base64 is already imported at the top of the file, so no need to re-import here.
+from app.utils.tracing import traced
 
 # Corrected SYSTEM_INSTRUCTION_PROMPT based on original chatbot.py
 SYSTEM_INSTRUCTION_PROMPT = """당신은 대한민국 공공 보건소의 친절하고 유능한 AI 안내원 '늘봄이'입니다. 당신의 임무는 사용자의 요청을 이해하고, 적절한 서비스로 안내하거나 일반적인 질문에 답변하는 것입니다.
@@ -210,12 +222,123 @@ SYSTEM_INSTRUCTION_PROMPT = """당신은 대한민국 공공 보건소의 친절
 
 이제 사용자의 요청에 따라 위 지침을 정확히 준수하여 응답해주세요."""
 
-# Placeholder functions for handling specific intents
-def handle_reception_request(parameters: dict, user_query: str) -> dict:
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.handle_reception_request(args={{_func_args}})")
+# ── Gemini 클라이언트 (워커 프로세스당 1개) ─────────────────────
+# configure / GenerativeModel 생성은 최초 요청 때 한 번만 하고 재사용합니다.
+# 고정 프롬프트는 system_instruction 으로 모델에 붙여, 매 요청의 프롬프트에는
+# 사용자 입력(과 이미지)만 들어갑니다.
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT", "20"))
+# 일시적 오류(429/500/503)만 지수 백오프로 재시도, 전체 시간은 timeout 이내
+GEMINI_RETRY = api_retry.Retry(
+    predicate=api_retry.if_transient_error,
+    initial=0.5,
+    maximum=4.0,
+    multiplier=2.0,
+    timeout=GEMINI_TIMEOUT_SECONDS,
+)
+GEMINI_ASYNC_RETRY = api_retry.AsyncRetry(
+    predicate=api_retry.if_transient_error,
+    initial=0.5,
+    maximum=4.0,
+    multiplier=2.0,
+    timeout=GEMINI_TIMEOUT_SECONDS,
+)
+
+_gemini_lock = threading.Lock()
+_gemini_model = None
+_gemini_api_key = None
+
+
+def _get_gemini_model(api_key: str):
+    """
+    Returns (model, None) with the shared GenerativeModel, creating it on first
+    use (or when the API key changed), or (None, error_dict) if setup failed.
+    """
+    global _gemini_model, _gemini_api_key
+    model = _gemini_model
+    if model is not None and _gemini_api_key == api_key:
+        return model, None
+    with _gemini_lock:
+        if _gemini_model is not None and _gemini_api_key == api_key:
+            return _gemini_model, None
+        try:
+            genai.configure(api_key=api_key)
+        except Exception as e:
+            return None, {"error": "Failed to configure Generative AI.", "details": str(e), "status_code": 500}
+        try:
+            model = genai.GenerativeModel(GEMINI_MODEL_NAME, system_instruction=SYSTEM_INSTRUCTION_PROMPT)
+        except Exception as e:
+            return None, {"error": "Failed to initialize Generative Model.", "details": str(e), "status_code": 500}
+        _gemini_model, _gemini_api_key = model, api_key
+        return model, None
+
+
+def reset_gemini_client():
+    """Drops the shared model so the next request builds a new one (tests, key rotation)."""
+    global _gemini_model, _gemini_api_key
+    with _gemini_lock:
+        _gemini_model = None
+        _gemini_api_key = None
+
+
+# ── 대화 상태 (conversation_store) ─────────────────────────
+# conversation 이 None 이면 예전처럼 매 턴 독립적으로 처리합니다.
+
+def _with_known_patient(parameters: dict, conversation: dict | None) -> dict:
+    """Fills a missing name/RRN from the patient confirmed earlier in the conversation."""
+    patient = (conversation or {}).get("patient")
+    if not patient or (parameters.get("name") and parameters.get("rrn")):
+        return parameters
+    return {**parameters, "name": parameters.get("name") or patient["name"], "rrn": parameters.get("rrn") or patient["rrn"]}
+
+
+def _find_reservation(name: str, rrn: str, conversation: dict | None, cached_status: str):
+    """
+    Returns (reservation, from_cache). The row is kept in the conversation
+    between turns and reused only while its status is `cached_status` - the
+    status whose next step is a version-checked write (or, for "Paid", final).
+    Any other status is read again so replies never rely on a stale row.
+    """
+    if conversation is not None:
+        cached = conversation.get("reservation")
+        if cached and cached["name"] == name and cached["rrn"] == rrn and cached["row"].get("status") == cached_status:
+            return cached["row"], True
+    reservation_details = lookup_reservation(name, rrn)
+    if conversation is not None and reservation_details:
+        conversation["patient"] = {"name": name, "rrn": rrn}
+        conversation["reservation"] = {"name": name, "rrn": rrn, "row": reservation_details}
+    return reservation_details, False
+
+
+def _forget_reservation(conversation: dict | None):
+    """Called after the reservation row was written (or found stale)."""
+    if conversation is not None:
+        conversation["reservation"] = None
+        conversation["quote"] = None
+
 
+def _version_guard(reservation_details: dict, from_cache: bool) -> dict:
+    """A cached row may be stale: writes based on it must match its version."""
+    if from_cache and reservation_details.get("version") is not None:
+        return {"expected_version": reservation_details["version"]}
+    return {}
+
+
+def _department_prescriptions(department: str, conversation: dict | None) -> dict:
+    """load_department_prescriptions, reused between the payment "initial" and "confirmation" turns."""
+    quote = (conversation or {}).get("quote")
+    if quote and quote["department"] == department:
+        return quote["prescription_info"]
+    prescription_info = load_department_prescriptions(department)
+    if conversation is not None and not prescription_info.get("error"):
+        conversation["quote"] = {"department": department, "prescription_info": prescription_info}
+    return prescription_info
+
+
+# Placeholder functions for handling specific intents
+@traced
+def handle_reception_request(parameters: dict, user_query: str, conversation: dict | None = None) -> dict:
+    parameters = _with_known_patient(parameters, conversation)
     name = parameters.get("name")
     rrn = parameters.get("rrn")
     symptom_param = parameters.get("symptom") # This might be a display name or a key
@@ -225,7 +348,7 @@ def handle_reception_request(parameters: dict, user_query: str) -> dict:
         # This should ideally be caught by Gemini's prompting, but as a fallback.
         return {"reply": "접수를 위해 성함과 주민등록번호를 알려주시겠어요? 예: 홍길동, 123456-1234567"}
 
-    reservation_details = lookup_reservation(name, rrn)
+    reservation_details, from_cache = _find_reservation(name, rrn, conversation, "Pending")
 
     if reservation_details:
         status = reservation_details.get("status")
@@ -288,7 +411,14 @@ def handle_reception_request(parameters: dict, user_query: str) -> dict:
                 # time, location, doctor are not saved via this function call directly.
                 # They are assumed to be part of the reservation_details if set initially.
             }
-            update_success = update_reservation_status(patient_rrn, 'Registered', **update_kwargs)
+            update_success = update_reservation_status(
+                patient_rrn, 'Registered', **_version_guard(reservation_details, from_cache), **update_kwargs
+            )
+            if not update_success and from_cache:
+                # 이전 턴에서 읽은 예약이 그 사이 바뀜 - 새로 읽어서 다시 처리
+                _forget_reservation(conversation)
+                return handle_reception_request(parameters, user_query, conversation)
+            _forget_reservation(conversation)
 
             if update_success:
                 base_reply = f"{patient_name}님의 예약이 확인되었습니다. {final_department}으로 접수되었으며, 대기번호는 {new_ticket_number}번입니다."
@@ -312,11 +442,9 @@ def handle_reception_request(parameters: dict, user_query: str) -> dict:
     else: # No existing reservation, patient not found in reservations.csv
         return {"reply": f"죄송합니다, {name}님의 정보를 시스템에서 찾을 수 없습니다. 데스크에 문의하여 등록을 먼저 진행해주시기 바랍니다."}
 
-def handle_payment_request(parameters: dict, user_query: str) -> dict:
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.handle_payment_request(args={{_func_args}})")
-
+@traced
+def handle_payment_request(parameters: dict, user_query: str, conversation: dict | None = None) -> dict:
+    parameters = _with_known_patient(parameters, conversation)
     name = parameters.get("name")
     rrn = parameters.get("rrn")
     payment_stage = parameters.get("payment_stage") # "initial" or "confirmation"
@@ -331,7 +459,7 @@ def handle_payment_request(parameters: dict, user_query: str) -> dict:
     if not name or not rrn:
         return {"reply": "수납을 진행하시려면 성함과 주민등록번호를 알려주세요. 예: 홍길동, 123456-1234567"}
 
-    reservation_details = lookup_reservation(name, rrn)
+    reservation_details, from_cache = _find_reservation(name, rrn, conversation, "Registered")
 
     if not reservation_details:
         return {"reply": "등록된 예약 정보를 찾을 수 없습니다. 먼저 접수를 진행해주세요."}
@@ -351,7 +479,7 @@ def handle_payment_request(parameters: dict, user_query: str) -> dict:
 
     if payment_stage == "initial":
         try:
-            prescription_info = load_department_prescriptions(department)
+            prescription_info = _department_prescriptions(department, conversation)
             if prescription_info.get("error"):
                 return {"reply": f"처방 정보를 불러오는 중 오류가 발생했습니다: {prescription_info['error']}"}
 
@@ -396,7 +524,7 @@ def handle_payment_request(parameters: dict, user_query: str) -> dict:
         # For now, we will trust the re-fetched data as the source of truth.
         # The variables retrieved_total_fee_str and retrieved_prescription_names from parameters are no longer used directly for processing.
 
-        prescription_info = load_department_prescriptions(department)
+        prescription_info = _department_prescriptions(department, conversation)
         if prescription_info.get("error"):
             return {"reply": f"처방 정보를 불러오는 중 오류가 발생했습니다: {prescription_info['error']}"}
 
@@ -420,7 +548,14 @@ def handle_payment_request(parameters: dict, user_query: str) -> dict:
             if not isinstance(actual_total_fee, int):
                  actual_total_fee = int(actual_total_fee)
 
-            success = update_reservation_with_payment_details(rrn, actual_prescription_names, actual_total_fee)
+            success = update_reservation_with_payment_details(
+                rrn, actual_prescription_names, actual_total_fee, **_version_guard(reservation_details, from_cache)
+            )
+            if not success and from_cache:
+                # 이전 턴에서 읽은 예약이 그 사이 바뀜 - 새로 읽어서 다시 처리
+                _forget_reservation(conversation)
+                return handle_payment_request(parameters, user_query, conversation)
+            _forget_reservation(conversation)
 
             if success:
                 return {"reply": f"{name}님의 결제가 {payment_method}로 완료되었습니다. 총 {actual_total_fee}원이 결제되었습니다. 감사합니다."}
@@ -433,11 +568,9 @@ def handle_payment_request(parameters: dict, user_query: str) -> dict:
     else:
         return {"error": f"알 수 없는 결제 단계(payment_stage)입니다: '{payment_stage}'.", "status_code": 400}
 
-def handle_certificate_request(parameters: dict, user_query: str) -> dict:
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.handle_certificate_request(args={{_func_args}})")
-
+@traced
+def handle_certificate_request(parameters: dict, user_query: str, conversation: dict | None = None) -> dict:
+    parameters = _with_known_patient(parameters, conversation)
     name = parameters.get("name")
     rrn = parameters.get("rrn")
     certificate_type = parameters.get("certificate_type") # "prescription" or "confirmation"
@@ -450,7 +583,7 @@ def handle_certificate_request(parameters: dict, user_query: str) -> dict:
         # If certificate_type is missing, Gemini should have asked for it based on the system prompt.
         return {"reply": "발급받으실 증명서 종류를 말씀해주세요. '처방전' 또는 '진료확인서' 중에서 선택할 수 있습니다."}
 
-    reservation_details = lookup_reservation(name, rrn)
+    reservation_details, _ = _find_reservation(name, rrn, conversation, "Paid")
 
     if not reservation_details:
         return {"reply": "등록된 예약 정보를 찾을 수 없습니다. 증명서 발급을 위해서는 접수 및 진료, 수납이 완료되어야 합니다."}
@@ -476,11 +609,10 @@ def handle_certificate_request(parameters: dict, user_query: str) -> dict:
             pdf_bytes, filename = prepare_prescription_pdf(name, rrn, department, prescription_pdf_data)
 
             if pdf_bytes and filename:
-                pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
                 return {
                     "reply": f"{name}님의 처방전 발급이 완료되었습니다. 새 창에서 확인해주세요.",
                     "pdf_filename": filename,
-                    "pdf_data_base64": pdf_base64  # For the API to send to client
+                    "pdf_token": download_service.publish(pdf_bytes, filename)  # The route turns this into a download URL
                 }
             else: # Should ideally not happen if prepare_prescription_pdf is robust
                 return {"reply": "처방전 PDF 생성 중 예상치 못한 오류가 발생했습니다."}
@@ -500,11 +632,10 @@ def handle_certificate_request(parameters: dict, user_query: str) -> dict:
             pdf_bytes, filename = prepare_medical_confirmation_pdf(name, rrn, department)
 
             if pdf_bytes and filename:
-                pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
                 return {
                     "reply": f"{name}님의 진료확인서 발급이 완료되었습니다. 새 창에서 확인해주세요.",
                     "pdf_filename": filename,
-                    "pdf_data_base64": pdf_base64 # For the API to send to client
+                    "pdf_token": download_service.publish(pdf_bytes, filename) # The route turns this into a download URL
                 }
             else: # Should ideally not happen
                 return {"reply": "진료확인서 PDF 생성 중 예상치 못한 오류가 발생했습니다."}
@@ -521,70 +652,430 @@ def handle_certificate_request(parameters: dict, user_query: str) -> dict:
         print(f"Error in handle_certificate_request for {name} ({rrn}), type {certificate_type}: {e}")
         return {"error": "증명서 발급 처리 중 예기치 않은 오류가 발생했습니다.", "status_code": 500}
 
-def generate_chatbot_response(user_question: str, base64_image_data: str | None = None) -> dict:
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.generate_chatbot_response(args={{_func_args}})")
+def _prepare_gemini_request(user_question: str, image: dict | None = None, history: str | None = None):
+    """
+    Returns (model, prompt_parts, None), or (None, None, error_dict) if the API
+    key or the model is not usable. Shared by the sync and async paths.
+    `image` comes from normalize_image(); `history` is the compact transcript
+    of the earlier turns, if any.
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return None, None, {"error": "API key not configured.", "details": "GEMINI_API_KEY is not set.", "status_code": 500}
+
+    model, setup_error = _get_gemini_model(api_key)
+    if setup_error:
+        return None, None, setup_error
+
+    # SYSTEM_INSTRUCTION_PROMPT is attached to the model as its system_instruction
+    prompt_parts = [history] if history else []
+
+    if image:
+        prompt_parts.append({"mime_type": image["mime_type"], "data": image["data"]})
+
+    prompt_parts.append(user_question)
+    return model, prompt_parts, None
+
+
+def _dispatch_intent(intent: str, parameters: dict, user_query: str, conversation: dict | None = None) -> dict:
+    """Calls the service handler of a kiosk intent (reception/payment/certificate)."""
+    handlers = {
+        "reception": handle_reception_request,
+        "payment": handle_payment_request,
+        "certificate": handle_certificate_request,
+    }
+    handler = handlers.get(intent)
+    CHATBOT_INTENTS.labels(intent=intent if handler else "unknown").inc()
+    if handler is None:
+        return {"error": f"알 수 없거나 누락된 의도(intent) 값: {intent}", "status_code": 500}
+    if conversation is None:
+        return handler(parameters, user_query)
+    return handler(parameters, user_query, conversation=conversation)
+
+
+def _route_locally(user_question: str, base64_image_data: str | None):
+    """Local router result for a message; images always go to the model."""
+    if base64_image_data:
+        return NO_ROUTE
+    return route_message(user_question)
+
+
+def is_local_command(user_question: str, base64_image_data: str | None = None) -> bool:
+    """True if the message is answered by the local router without calling the model."""
+    return _route_locally(user_question, base64_image_data).confidence >= ROUTER_MIN_CONFIDENCE
+
+
+def _fallback_route(route):
+    """
+    Called when the model could not be reached. Returns True (and counts a
+    fallback) if the local route is good enough to answer instead.
+    """
+    if route.intent and route.confidence >= ROUTER_FALLBACK_CONFIDENCE:
+        record_route("fallback")
+        return True
+    record_route("model")
+    return False
+
+
+def _is_cacheable_question(user_question: str, base64_image_data: str | None) -> bool:
+    """Only text questions without names/RRNs may be answered from the FAQ cache."""
+    return not base64_image_data and not contains_personal_data(user_question)
+
+
+def _cached_general_reply(user_question: str, base64_image_data: str | None):
+    cache = get_response_cache()
+    if cache is None or not _is_cacheable_question(user_question, base64_image_data):
+        return None
+    reply = cache.get(user_question)
+    if reply is not None:
+        CHATBOT_INTENTS.labels(intent="general").inc()
+    return reply
+
+
+def _load_image(base64_image_data: str | None):
+    """(normalized image or None, error dict or None) for an optional camera upload."""
+    if not base64_image_data:
+        return None, None
+    image = normalize_image(base64_image_data)
+    if "error" in image:
+        return None, image
+    return image, None
+
+
+def _is_standalone_turn(conversation: dict | None) -> bool:
+    """
+    True if the reply can only depend on the question itself: no earlier turns
+    the model sees as history and no confirmed patient.
+    """
+    return not conversation or not (conversation["patient"] or conversation["history"])
+
+
+def _cached_reply(user_question: str, image: dict | None, conversation: dict | None = None):
+    """FAQ cache for text questions; the perceptual-hash cache for questions about an image."""
+    # 이어지는 질문("그럼 거기는 몇 시까지 해요?")의 답은 앞선 대화에 따라 달라지므로 캐시를 보지 않음
+    if not _is_standalone_turn(conversation):
+        return None
+    if image is None:
+        return _cached_general_reply(user_question, None)
+    cache = get_image_reply_cache()
+    if cache is None or contains_personal_data(user_question):
+        return None
+    reply = cache.get(image["phash"], user_question)
+    if reply is not None:
+        CHATBOT_INTENTS.labels(intent="general").inc()
+    return reply
+
+
+def _image_reply_key(user_question: str, image: dict | None, conversation: dict | None):
+    """Perceptual hash under which a general reply about `image` may be cached, or None."""
+    if image is None or contains_personal_data(user_question) or not _is_standalone_turn(conversation):
+        return None
+    return image["phash"]
+
+
+@contextmanager
+def _timed_gemini_call(mode: str):
+    """
+    Records the latency of the Gemini call in the block (mode: sync/async/stream).
+    outcome is "ok", "error", or "aborted" when the block is cut short by a
+    client closing the stream (GeneratorExit) or a cancelled task.
+    """
+    started = time.perf_counter()
+    outcome = "aborted"
+    try:
+        yield
+        outcome = "ok"
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        GEMINI_REQUEST_SECONDS.labels(mode=mode, outcome=outcome).observe(time.perf_counter() - started)
+
+
+def _record_token_usage(response):
+    """Adds the token counts the API reports in usage_metadata (if any)."""
+    usage = getattr(response, "usage_metadata", None)
+    for kind, field in (("prompt", "prompt_token_count"), ("completion", "candidates_token_count")):
+        count = getattr(usage, field, None)
+        if isinstance(count, int) and count > 0:
+            GEMINI_TOKENS.labels(kind=kind).inc(count)
+
+
+def _may_cache_reply(base64_image_data: str | None, conversation: dict | None) -> bool:
+    # 환자가 확인된 대화의 답변은 그 환자 정보를, 이어지는 질문의 답변은 앞선 대화를
+    # 전제로 하므로 캐시하지 않음
+    return not base64_image_data and _is_standalone_turn(conversation)
+
+
+def _end_turn(store, conversation_id: str, conversation: dict, user_question: str, result: dict) -> dict:
+    """Records the turn in the conversation, saves it and adds conversation_id to the result."""
+    append_history(conversation, "user", user_question)
+    append_history(conversation, "bot", result.get("reply") or result.get("error"))
+    store.save(conversation_id, conversation)
+    result["conversation_id"] = conversation_id
+    return result
+
+
+@traced
+def generate_chatbot_response(user_question: str, base64_image_data: str | None = None,
+                              conversation_id: str | None = None) -> dict:
     """
     Generates a chatbot response using Google Gemini API.
 
     Args:
         user_question: The user's question.
         base64_image_data: Optional base64 encoded image data.
+        conversation_id: None for a stateless turn. Otherwise the id returned by
+            the previous turn ("" or an expired id starts a new conversation).
 
     Returns:
         A dictionary containing the bot's reply or an error message.
         e.g., {"reply": "bot_response_text"} or
               {"error": "error_message", "details": "...", "status_code": http_status_code}
+        With a conversation, the dictionary also carries "conversation_id".
     """
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        return {"error": "API key not configured.", "details": "GEMINI_API_KEY is not set.", "status_code": 500}
+    if conversation_id is None:
+        return _generate_response(user_question, base64_image_data, None)
+    store = get_conversation_store()
+    conversation_id, conversation = store.open(conversation_id)
+    result = _generate_response(user_question, base64_image_data, conversation)
+    return _end_turn(store, conversation_id, conversation, user_question, result)
+
+
+def _generate_response(user_question: str, base64_image_data: str | None, conversation: dict | None) -> dict:
+    # 정형화된 키오스크 명령은 모델 없이 바로 처리
+    route = _route_locally(user_question, base64_image_data)
+    if route.confidence >= ROUTER_MIN_CONFIDENCE:
+        record_route("local")
+        return _dispatch_intent(route.intent, route.parameters, user_question, conversation)
+
+    image, image_error = _load_image(base64_image_data)
+    if image_error:
+        return image_error
+
+    # 반복되는 일반 질문(같은 장면에 대한 같은 질문 포함)은 캐시된 답변으로
+    cached_reply = _cached_reply(user_question, image, conversation)
+    if cached_reply is not None:
+        return {"reply": cached_reply}
+
+    model, prompt_parts, request_error = _prepare_gemini_request(
+        user_question, image, history_prompt(conversation)
+    )
+    if request_error:
+        if _fallback_route(route):
+            return _dispatch_intent(route.intent, route.parameters, user_question, conversation)
+        return request_error
 
     try:
-        genai.configure(api_key=api_key)
+        with _timed_gemini_call("sync"):
+            response = model.generate_content(
+                prompt_parts,
+                request_options={"timeout": GEMINI_TIMEOUT_SECONDS, "retry": GEMINI_RETRY},
+            )
     except Exception as e:
-        return {"error": "Failed to configure Generative AI.", "details": str(e), "status_code": 500}
+        # This can catch various API call related errors (network, quota, etc.)
+        if _fallback_route(route):
+            return _dispatch_intent(route.intent, route.parameters, user_question, conversation)
+        return {"error": "Failed to generate content from model.", "details": str(e), "status_code": 500}
+
+    record_route("model")
+    return process_gemini_response(
+        response, user_question, cache_reply=_may_cache_reply(base64_image_data, conversation), conversation=conversation,
+        image_key=_image_reply_key(user_question, image, conversation),
+    )
+
+
+@traced
+async def generate_chatbot_response_async(user_question: str, base64_image_data: str | None = None,
+                                          conversation_id: str | None = None) -> dict:
+    """
+    asyncio version of generate_chatbot_response (used by the ASGI app).
+    The model call does not hold a thread; intent handlers, which read storage
+    and render PDFs, and the conversation store run in a worker thread.
+    """
+    if conversation_id is None:
+        return await _generate_response_async(user_question, base64_image_data, None)
+    store = get_conversation_store()
+    conversation_id, conversation = await asyncio.to_thread(store.open, conversation_id)
+    result = await _generate_response_async(user_question, base64_image_data, conversation)
+    return await asyncio.to_thread(_end_turn, store, conversation_id, conversation, user_question, result)
+
+
+async def _generate_response_async(user_question: str, base64_image_data: str | None,
+                                   conversation: dict | None) -> dict:
+    route = _route_locally(user_question, base64_image_data)
+    if route.confidence >= ROUTER_MIN_CONFIDENCE:
+        record_route("local")
+        return await asyncio.to_thread(_dispatch_intent, route.intent, route.parameters, user_question, conversation)
+
+    # 이미지 디코딩/축소는 CPU 작업이므로 이벤트 루프 밖에서
+    image, image_error = await asyncio.to_thread(_load_image, base64_image_data)
+    if image_error:
+        return image_error
+
+    cached_reply = _cached_reply(user_question, image, conversation)
+    if cached_reply is not None:
+        return {"reply": cached_reply}
+
+    model, prompt_parts, request_error = _prepare_gemini_request(
+        user_question, image, history_prompt(conversation)
+    )
+    if request_error:
+        if _fallback_route(route):
+            return await asyncio.to_thread(_dispatch_intent, route.intent, route.parameters, user_question, conversation)
+        return request_error
 
-    # Model initialization (e.g., "gemini-1.5-flash-latest")
-    # Consider making model name a parameter or a constant if it changes frequently
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash-latest")
+        with _timed_gemini_call("async"):
+            response = await model.generate_content_async(
+                prompt_parts,
+                request_options={"timeout": GEMINI_TIMEOUT_SECONDS, "retry": GEMINI_ASYNC_RETRY},
+            )
     except Exception as e:
-        return {"error": "Failed to initialize Generative Model.", "details": str(e), "status_code": 500}
+        if _fallback_route(route):
+            return await asyncio.to_thread(_dispatch_intent, route.intent, route.parameters, user_question, conversation)
+        return {"error": "Failed to generate content from model.", "details": str(e), "status_code": 500}
 
-    prompt_parts = [SYSTEM_INSTRUCTION_PROMPT]
+    record_route("model")
+    return await asyncio.to_thread(
+        process_gemini_response, response, user_question,
+        cache_reply=_may_cache_reply(base64_image_data, conversation), conversation=conversation,
+        image_key=_image_reply_key(user_question, image, conversation),
+    )
 
-    if base64_image_data:
-        try:
-            # Remove potential "data:image/...;base64," prefix if present
-            if "," in base64_image_data:
-                header, encoded_data = base64_image_data.split(",", 1)
-                mime_type = header.split(":")[1].split(";")[0] if ":" in header and ";" in header else "image/png" # default
-            else:
-                encoded_data = base64_image_data
-                mime_type = "image/png" # default if no header
 
-            image_bytes = base64.b64decode(encoded_data)
+class ReplyStreamExtractor:
+    """
+    Incrementally pulls the "reply" string out of the model's JSON while it is
+    still being streamed, so the kiosk can show and speak the first words early.
 
-            image_blob = {
-                "mime_type": mime_type,
-                "data": image_bytes
-            }
-            prompt_parts.append(image_blob)
-        except (base64.binascii.Error, ValueError) as e:
-            return {"error": "Invalid base64 image data.", "details": str(e), "status_code": 400}
-        except Exception as e: # Catch any other image processing errors
-            return {"error": "Error processing image.", "details": str(e), "status_code": 500}
+        extractor.feed('{"intent": "general", "reply": "안녕')  -> "안녕"
+        extractor.feed('하세요"}')                               -> "하세요"
+    """
+    _START = re.compile(r'"reply"\s*:\s*"')
+
+    def __init__(self):
+        self._raw = ""
+        self._pos = None  # 아직 내보내지 않은 reply 문자열의 시작 위치
+        self.done = False
+
+    def feed(self, text: str) -> str:
+        self._raw += text
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = self._START.search(self._raw)
+            if not match:
+                return ""
+            self._pos = match.end()
+        raw = self._raw
+        i = safe_end = self._pos
+        while i < len(raw):
+            char = raw[i]
+            if char == "\\":
+                # 이스케이프가 청크 경계에서 잘렸으면 다음 청크를 기다립니다
+                step = 6 if raw[i + 1:i + 2] == "u" else 2
+                if i + step > len(raw):
+                    break
+                i += step
+            elif char == '"':
+                self.done = True
+                break
+            else:
+                i += 1
+            safe_end = i
+        chunk = raw[self._pos:safe_end]
+        self._pos = safe_end
+        return json.loads(f'"{chunk}"') if chunk else ""
 
-    prompt_parts.append(user_question)
 
+@traced
+def stream_chatbot_response(user_question: str, base64_image_data: str | None = None,
+                           conversation_id: str | None = None):
+    """
+    Streaming version of generate_chatbot_response. Yields ("token", text) for
+    each new piece of the reply as Gemini streams it, then exactly one
+    ("result", dict) with the same dict generate_chatbot_response would return.
+    """
+    if conversation_id is None:
+        yield from _stream_response(user_question, base64_image_data, None)
+        return
+    store = get_conversation_store()
+    conversation_id, conversation = store.open(conversation_id)
+    for kind, data in _stream_response(user_question, base64_image_data, conversation):
+        if kind == "result":
+            data = _end_turn(store, conversation_id, conversation, user_question, data)
+        yield kind, data
+
+
+def _stream_response(user_question: str, base64_image_data: str | None, conversation: dict | None):
+    route = _route_locally(user_question, base64_image_data)
+    if route.confidence >= ROUTER_MIN_CONFIDENCE:
+        record_route("local")
+        yield "result", _dispatch_intent(route.intent, route.parameters, user_question, conversation)
+        return
+
+    image, image_error = _load_image(base64_image_data)
+    if image_error:
+        yield "result", image_error
+        return
+
+    cached_reply = _cached_reply(user_question, image, conversation)
+    if cached_reply is not None:
+        yield "token", cached_reply
+        yield "result", {"reply": cached_reply}
+        return
+
+    model, prompt_parts, request_error = _prepare_gemini_request(
+        user_question, image, history_prompt(conversation)
+    )
+    if request_error:
+        if _fallback_route(route):
+            request_error = _dispatch_intent(route.intent, route.parameters, user_question, conversation)
+        yield "result", request_error
+        return
+
+    extractor = ReplyStreamExtractor()
     try:
-        response = model.generate_content(prompt_parts)
+        with _timed_gemini_call("stream"):
+            response = model.generate_content(
+                prompt_parts,
+                stream=True,
+                request_options={"timeout": GEMINI_TIMEOUT_SECONDS, "retry": GEMINI_RETRY},
+            )
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue  # 텍스트가 없는 청크 (안전 차단 등) - 최종 처리에서 보고
+                piece = extractor.feed(text)
+                if piece:
+                    yield "token", piece
     except Exception as e:
-        # This can catch various API call related errors (network, quota, etc.)
-        return {"error": "Failed to generate content from model.", "details": str(e), "status_code": 500}
+        if _fallback_route(route):
+            yield "result", _dispatch_intent(route.intent, route.parameters, user_question, conversation)
+        else:
+            yield "result", {"error": "Failed to generate content from model.", "details": str(e), "status_code": 500}
+        return
+
+    record_route("model")
+    # The streamed response has accumulated every chunk; handle it like a regular one
+    yield "result", process_gemini_response(
+        response, user_question, cache_reply=_may_cache_reply(base64_image_data, conversation), conversation=conversation,
+        image_key=_image_reply_key(user_question, image, conversation),
+    )
 
+
+def process_gemini_response(response, user_question: str, cache_reply: bool = False,
+                            conversation: dict | None = None, image_key: str | None = None) -> dict:
+    """
+    Turns a Gemini response into the chatbot reply: safety/empty checks,
+    JSON parsing and dispatch to the intent handlers. With cache_reply, a
+    general-intent reply to a question without personal data is stored in
+    the FAQ cache; with image_key (a perceptual hash), in the image reply
+    cache unless the reply itself carries personal data.
+    """
+    _record_token_usage(response)
     # Process the response (checking for blocks, safety ratings, etc.)
     try:
         if not response.candidates:
@@ -650,17 +1141,18 @@ def generate_chatbot_response(user_question: str, base64_image_data: str | None
         if intent == "general":
             reply = parsed_response.get("reply")
             if reply:
+                CHATBOT_INTENTS.labels(intent="general").inc()
+                cache = get_response_cache()
+                if cache_reply and cache is not None and _is_cacheable_question(user_question, None):
+                    cache.put(user_question, reply)
+                image_cache = get_image_reply_cache()
+                if image_key and image_cache is not None and not contains_personal_data(reply):
+                    image_cache.put(image_key, user_question, reply)
                 return {"reply": reply}
             else:
                 return {"error": "AI 응답에서 'reply' 필드를 찾을 수 없습니다 (intent=general).", "status_code": 500}
-        elif intent == "reception":
-            return handle_reception_request(parameters, user_query_from_response)
-        elif intent == "payment":
-            return handle_payment_request(parameters, user_query_from_response)
-        elif intent == "certificate":
-            return handle_certificate_request(parameters, user_query_from_response)
         else:
-            return {"error": f"알 수 없거나 누락된 의도(intent) 값: {intent}", "status_code": 500}
+            return _dispatch_intent(intent, parameters, user_query_from_response, conversation)
 
     except Exception as e: # Catch errors during response processing
         # Log the exception for more detailed debugging if possible
@@ -0,0 +1,202 @@
+"""
+챗봇 대화 상태 저장소
+
+대화 ID 별로 확인된 환자(이름/주민등록번호), 예약 행, 안내한 처방 내역,
+짧은 대화 기록을 서버에 보관합니다. 다음 턴에서는 모델이 이름과 번호를 다시
+뽑지 않아도 되고, 수납 "initial" → "confirmation" 사이에 예약/진료비를 다시
+읽지 않습니다. 모델에는 최근 몇 턴의 요약(주민등록번호는 가림)만 보냅니다.
+
+환경 변수 KIOSK_CONVERSATION_STORE 로 백엔드를 고릅니다.
+  • memory  (기본) 워커 프로세스 메모리 - 워커 1개 또는 sticky 세션용
+  • sqlite  KIOSK_CONVERSATION_DB (기본 data/conversations.db) - 여러 워커가 공유
+  • KIOSK_CONVERSATION_TTL  마지막 대화 후 상태를 지우기까지의 시간(초, 기본 600)
+"""
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+DEFAULT_TTL_SECONDS = 600
+MAX_MEMORY_CONVERSATIONS = 1000
+HISTORY_TURNS = 6          # 모델에 보내는 최근 메시지 수
+HISTORY_TEXT_CHARS = 200   # 메시지 하나당 최대 글자 수
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_DB_PATH = os.path.join(BASE_DIR, "data", "conversations.db")
+
+_CONVERSATION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{32}$")
+_RRN_RE = re.compile(r"\d{6}\s*-?\s*[1-4]\d{6}")
+
+
+def new_conversation_id() -> str:
+    return secrets.token_urlsafe(24)
+
+
+def new_conversation_state() -> dict:
+    """patient: {name, rrn}; reservation: {name, rrn, row}; quote: department → prescription info."""
+    return {"patient": None, "reservation": None, "quote": None, "history": []}
+
+
+def append_history(state: dict, role: str, text: str):
+    """Keeps the last HISTORY_TURNS messages, trimmed and with RRNs masked."""
+    if not text:
+        return
+    text = _RRN_RE.sub("******-*******", text.strip())[:HISTORY_TEXT_CHARS]
+    state["history"] = (state["history"] + [[role, text]])[-HISTORY_TURNS:]
+
+
+def history_prompt(state: dict) -> str | None:
+    """Compact transcript of the previous turns for the model, or None."""
+    if not state or not state["history"]:
+        return None
+    lines = [f"{'사용자' if role == 'user' else '늘봄이'}: {text}" for role, text in state["history"]]
+    return "이전 대화 (참고용):\n" + "\n".join(lines)
+
+
+class ConversationStore(ABC):
+    """load() returns None for unknown or expired conversations."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def load(self, conversation_id: str) -> dict | None:
+        ...
+
+    @abstractmethod
+    def save(self, conversation_id: str, state: dict) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, conversation_id: str) -> None:
+        ...
+
+    def open(self, conversation_id: str | None):
+        """Returns (conversation_id, state); unknown ids start a new conversation with a new id."""
+        if conversation_id and _CONVERSATION_ID_RE.match(conversation_id):
+            state = self.load(conversation_id)
+            if state is not None:
+                return conversation_id, state
+        return new_conversation_id(), new_conversation_state()
+
+
+class MemoryConversationStore(ConversationStore):
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_conversations: int = MAX_MEMORY_CONVERSATIONS,
+                 clock=time.monotonic):
+        super().__init__(ttl_seconds)
+        self.max_conversations = max_conversations
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conversations = OrderedDict()  # id → (expires_at, state), 오래된 것부터
+
+    def load(self, conversation_id: str) -> dict | None:
+        with self._lock:
+            entry = self._conversations.get(conversation_id)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._conversations[conversation_id]
+                return None
+            # 호출자가 상태를 고쳐도 save() 전까지는 저장본이 바뀌지 않도록 복사
+            return json.loads(entry[1])
+
+    def save(self, conversation_id: str, state: dict) -> None:
+        data = json.dumps(state, ensure_ascii=False)
+        with self._lock:
+            self._conversations.pop(conversation_id, None)
+            self._conversations[conversation_id] = (self._clock() + self.ttl_seconds, data)
+            now = self._clock()
+            while self._conversations:
+                oldest_id, (expires_at, _) = next(iter(self._conversations.items()))
+                if expires_at > now and len(self._conversations) <= self.max_conversations:
+                    break
+                del self._conversations[oldest_id]
+
+    def delete(self, conversation_id: str) -> None:
+        with self._lock:
+            self._conversations.pop(conversation_id, None)
+
+
+class SqliteConversationStore(ConversationStore):
+    """Shared by every worker that opens the same file (WAL mode)."""
+
+    def __init__(self, db_path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS, timeout: float = 5.0):
+        super().__init__(ttl_seconds)
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                " id TEXT PRIMARY KEY, state TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_conversations_expires ON conversations (expires)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, conversation_id: str) -> dict | None:
+        row = self._connect().execute(
+            "SELECT state FROM conversations WHERE id = ? AND expires > ?", (conversation_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, conversation_id: str, state: dict) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO conversations (id, state, expires) VALUES (?, ?, ?)",
+                (conversation_id, json.dumps(state, ensure_ascii=False), now + self.ttl_seconds),
+            )
+            conn.execute("DELETE FROM conversations WHERE expires <= ?", (now,))
+
+    def delete(self, conversation_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def create_conversation_store(backend: str | None = None) -> ConversationStore:
+    """Builds a store by name ('memory' or 'sqlite'); defaults to KIOSK_CONVERSATION_STORE, then 'memory'."""
+    backend = (backend or os.getenv("KIOSK_CONVERSATION_STORE") or "memory").lower()
+    try:
+        ttl_seconds = float(os.getenv("KIOSK_CONVERSATION_TTL", DEFAULT_TTL_SECONDS))
+    except ValueError:
+        ttl_seconds = DEFAULT_TTL_SECONDS
+    if backend == "memory":
+        return MemoryConversationStore(ttl_seconds)
+    if backend == "sqlite":
+        return SqliteConversationStore(os.getenv("KIOSK_CONVERSATION_DB") or DEFAULT_DB_PATH, ttl_seconds)
+    raise ValueError(f"Unknown conversation store: {backend}")
+
+
+def get_conversation_store() -> ConversationStore:
+    """Returns the process-wide conversation store (created on first use)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_conversation_store()
+    return _store
+
+
+def set_conversation_store(store: ConversationStore | None) -> None:
+    """Replaces the process-wide store (None → recreate on next use)."""
+    global _store
+    with _store_lock:
+        _store = store
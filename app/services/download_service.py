@@ -0,0 +1,137 @@
+"""
+일회성 다운로드 토큰 (생성된 증명서 PDF 전달용)
+
+PDF 를 JSON 응답에 base64 로 넣는 대신 임시 디렉터리에 파일로 저장하고,
+추측할 수 없는 토큰을 발급합니다. 클라이언트는 토큰 URL 로 파일을 받으며,
+라우트는 send_file 로 Content-Length / ETag / Range 를 처리합니다.
+
+  • KIOSK_DOWNLOAD_DIR  저장 위치 (기본: 시스템 임시 디렉터리/kiosk_downloads)
+  • KIOSK_DOWNLOAD_TTL  토큰 유효 시간(초, 기본 300)
+
+파일만으로 토큰을 해석하므로 여러 워커 프로세스가 같은 디렉터리를 공유해도 됩니다.
+"""
+import contextlib
+import json
+import os
+import re
+import secrets
+import tempfile
+import time
+
+DEFAULT_TTL_SECONDS = 300
+DATA_SUFFIX = ".bin"
+META_SUFFIX = ".json"
+_TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]{43}$")  # secrets.token_urlsafe(32)
+
+
+def download_dir() -> str:
+    path = os.getenv("KIOSK_DOWNLOAD_DIR") or os.path.join(tempfile.gettempdir(), "kiosk_downloads")
+    # 주민등록번호가 들어 있는 문서이므로 소유자만 접근 가능하게 만듭니다.
+    # makedirs 의 mode 는 새로 만들 때만 적용되므로 이미 있던 디렉터리도 좁힙니다.
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    os.chmod(path, 0o700)
+    return path
+
+
+def ttl_seconds() -> int:
+    try:
+        return int(os.getenv("KIOSK_DOWNLOAD_TTL", DEFAULT_TTL_SECONDS))
+    except ValueError:
+        return DEFAULT_TTL_SECONDS
+
+
+def _paths(directory, token):
+    base = os.path.join(directory, token)
+    return base + DATA_SUFFIX, base + META_SUFFIX
+
+
+def _write_atomic(path, data: bytes):
+    tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def publish(data: bytes, filename: str, mimetype: str = "application/pdf") -> str:
+    """
+    Stores `data` and returns a token that resolves to it for ttl_seconds().
+    Expired entries are purged on the way.
+    """
+    directory = download_dir()
+    purge_expired(directory)
+    token = secrets.token_urlsafe(32)
+    data_path, meta_path = _paths(directory, token)
+    _write_atomic(data_path, data)
+    meta = {"filename": filename, "mimetype": mimetype, "expires": time.time() + ttl_seconds()}
+    # 메타데이터를 마지막에 써서, resolve 가 반쯤 쓰인 파일을 내주지 않도록 합니다.
+    try:
+        _write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(data_path)
+        raise
+    return token
+
+
+def resolve(token: str):
+    """
+    Returns (path, filename, mimetype) for a live token, or None if the token
+    is malformed, unknown or expired.
+    """
+    if not token or not _TOKEN_RE.match(token):
+        return None
+    data_path, meta_path = _paths(download_dir(), token)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("expires", 0) < time.time() or not os.path.exists(data_path):
+        return None
+    return data_path, meta.get("filename") or os.path.basename(data_path), meta.get("mimetype") or "application/pdf"
+
+
+def _purge_orphan(path, cutoff) -> bool:
+    """Removes a PDF whose metadata was never written (crash mid-publish) once it is older than the TTL."""
+    try:
+        if os.stat(path).st_mtime >= cutoff:
+            return False  # 다른 워커가 아직 게시 중일 수 있음
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def purge_expired(directory=None) -> int:
+    """
+    Deletes expired entries, and PDFs left without metadata for longer than
+    the TTL. Returns the number of tokens removed.
+    """
+    directory = directory or download_dir()
+    now = time.time()
+    removed = 0
+    entries = os.listdir(directory)
+    names = set(entries)
+    for entry in entries:
+        if entry.endswith(DATA_SUFFIX):
+            if entry[: -len(DATA_SUFFIX)] + META_SUFFIX not in names:
+                removed += _purge_orphan(os.path.join(directory, entry), now - ttl_seconds())
+            continue
+        if not entry.endswith(META_SUFFIX):
+            continue
+        token = entry[: -len(META_SUFFIX)]
+        data_path, meta_path = _paths(directory, token)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                expires = json.load(f).get("expires", 0)
+        except (OSError, ValueError):
+            expires = 0
+        if expires >= now:
+            continue
+        for path in (meta_path, data_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        removed += 1
+    return removed
@@ -0,0 +1,111 @@
+"""
+진료비 카탈로그 (treatment_fees.csv 인메모리 인덱스)
+
+파일을 한 번만 읽어 불변(immutable) FeeCatalog 로 만들고, 파일의 mtime/크기가
+바뀌었을 때만 다시 만듭니다. 진료과별(`by_department`), 처방명별(`by_name`)
+인덱스를 두어 조회 비용이 카탈로그 크기와 무관하게 일정합니다.
+`version` 은 내용의 해시라서, 저장소(CSV/SQLite)와 무관하게 같은 진료비 표는
+같은 버전을 가집니다 (증명서 캐시 키에 사용).
+"""
+import csv
+import hashlib
+import os
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+from app.utils.metrics import CSV_IO_SECONDS
+
+FeeItem = namedtuple("FeeItem", ["department", "name", "fee"])
+
+
+class FeeCatalog:
+    """
+    Immutable, indexed set of treatment fees.
+
+        catalog.for_department("내과")  -> (FeeItem, ...)   # case-insensitive
+        catalog.by_name["감기약 처방"]   -> 5000
+        catalog.version                 -> content hash (hex)
+    """
+
+    def __init__(self, items=(), invalid=None):
+        by_department = {}
+        by_name = {}
+        digest = hashlib.sha256()
+        for item in items:
+            digest.update(f"{item.department}\x1f{item.name}\x1f{item.fee}\n".encode("utf-8"))
+            by_department.setdefault(item.department.lower(), []).append(item)
+            # 같은 처방명이 여러 번 나오면 마지막 값 (기존 dict 생성과 동일)
+            by_name[item.name] = item.fee
+        self.by_department = MappingProxyType({key: tuple(value) for key, value in by_department.items()})
+        self.by_name = MappingProxyType(by_name)
+        # 진료과(소문자) → 잘못된 Fee 값 오류 메시지
+        self._invalid = MappingProxyType(dict(invalid or {}))
+        for department, message in sorted(self._invalid.items()):
+            digest.update(f"!{department}\x1f{message}\n".encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
+
+    @classmethod
+    def from_csv(cls, csv_path: str) -> "FeeCatalog":
+        """
+        Builds a catalog from a `Department,Prescription,Fee` CSV file.
+        Rows with a non-integer fee are left out; looking up their department
+        raises ValueError, as the per-call CSV scan used to.
+        """
+        items = []
+        invalid = {}
+        with CSV_IO_SECONDS.labels(file="treatment_fees", operation="read").time(), \
+                open(csv_path, newline="", encoding="utf-8-sig") as csvfile:
+            for row in csv.DictReader(csvfile):
+                department = (row.get("Department") or "").strip()
+                name = row.get("Prescription") or ""
+                try:
+                    fee = int(row.get("Fee", 0))
+                except (TypeError, ValueError):
+                    invalid.setdefault(department.lower(), f"Invalid fee format for {name} in {department}.")
+                    continue
+                items.append(FeeItem(department, name.strip(), fee))
+        return cls(items, invalid)
+
+    def for_department(self, department: str) -> tuple:
+        """
+        Returns the fee items of `department` (case-insensitive, surrounding
+        whitespace ignored). Raises ValueError if the department has a bad fee.
+        """
+        key = department.strip().lower()
+        if key in self._invalid:
+            raise ValueError(self._invalid[key])
+        return self.by_department.get(key, ())
+
+    def __len__(self):
+        return len(self.by_name)
+
+
+# 경로별 카탈로그 캐시: {abspath: (signature, FeeCatalog)}
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def _stat_signature(path):
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def get_fee_catalog(csv_path: str) -> FeeCatalog:
+    """
+    Returns the cached FeeCatalog for `csv_path`, rebuilding it only when the
+    file changed on disk. Raises FileNotFoundError if the file does not exist.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(csv_path)
+    key = os.path.abspath(csv_path)
+    signature = _stat_signature(key)
+    cached = _catalogs.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _catalogs_lock:
+        cached = _catalogs.get(key)
+        if cached is None or cached[0] != signature:
+            cached = (signature, FeeCatalog.from_csv(key))
+            _catalogs[key] = cached
+        return cached[1]
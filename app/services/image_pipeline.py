@@ -0,0 +1,227 @@
+"""
+챗봇 카메라 이미지 정규화
+
+chatbot_interface.html 은 카메라 원본 해상도 프레임을 base64 data URL 로 보냅니다.
+모델 업로드 크기와 응답 시간은 픽셀 수에 비례하므로, Gemini 로 보내기 전에
+
+  1. base64 를 조각 단위로 풀면서 바이트 한도를 넘으면 즉시 거절하고
+  2. JPEG 는 draft 모드로 필요한 만큼만 줄여서 디코딩한 뒤
+  3. 긴 변을 KIOSK_IMAGE_MAX_SIDE 로 줄이고 EXIF(위치·기기 정보)를 버린 채
+     JPEG/WebP 로 다시 인코딩합니다 (회전 정보는 픽셀에 반영).
+
+같은 장면을 다시 찍어 같은 질문을 하면 모델을 다시 부르지 않도록, 정규화된 이미지의
+지각 해시(dHash 256비트) + 질문으로 일반 답변(intent=general)을 잠시 저장합니다.
+카메라 노이즈로 몇 비트가 달라도 같은 장면으로 보며(해밍 거리 KIOSK_IMAGE_HASH_DISTANCE 이하),
+신분증처럼 개인정보가 있을 수 있으므로 짧게만 보관하고, 이름·주민등록번호가 들어간
+질문/답변이나 환자가 확인된 대화의 답변은 저장하지 않습니다.
+
+  • KIOSK_IMAGE_MAX_BYTES   디코딩된 업로드 최대 크기 (기본 8MB)
+  • KIOSK_IMAGE_MAX_PIXELS  원본 최대 픽셀 수 (기본 40,000,000)
+  • KIOSK_IMAGE_MAX_SIDE    모델로 보내는 긴 변 픽셀 (기본 1024)
+  • KIOSK_IMAGE_FORMAT      jpeg (기본) | webp
+  • KIOSK_IMAGE_QUALITY     인코딩 품질 (기본 85)
+  • KIOSK_IMAGE_CACHE_SIZE  답변 캐시 항목 수 (기본 64). 0 이면 쓰지 않습니다.
+  • KIOSK_IMAGE_CACHE_TTL   답변 캐시 유효 시간(초, 기본 120)
+  • KIOSK_IMAGE_HASH_DISTANCE  같은 장면으로 볼 최대 해밍 거리 (256비트 중, 기본 8)
+"""
+import base64
+import binascii
+import io
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.services.response_cache import normalize_question
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_MAX_PIXELS = 40_000_000
+DEFAULT_MAX_SIDE = 1024
+DEFAULT_QUALITY = 85
+DEFAULT_CACHE_SIZE = 64
+DEFAULT_CACHE_TTL_SECONDS = 120
+DEFAULT_HASH_DISTANCE = 8
+HASH_SIZE = 16  # dHash 16x16 = 256비트
+DECODE_CHUNK_CHARS = 64 * 1024  # 4 의 배수
+
+_WHITESPACE_RE = re.compile(r"\s")
+
+FORMATS = {"jpeg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp")}
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def max_image_bytes() -> int:
+    return _env_int("KIOSK_IMAGE_MAX_BYTES", DEFAULT_MAX_BYTES)
+
+
+def max_request_bytes() -> int:
+    """Request body cap for chatbot uploads: the image limit in base64 plus room for the JSON."""
+    return max_image_bytes() * 4 // 3 + 64 * 1024
+
+
+def _error(error, details, status_code):
+    return {"error": error, "details": details, "status_code": status_code}
+
+
+def decode_base64_stream(encoded: str, max_bytes: int) -> io.BytesIO:
+    """
+    Decodes `encoded` chunk by chunk into a buffer. Raises ValueError if the
+    result would exceed `max_bytes` (checked before decoding anything) and
+    binascii.Error on invalid base64.
+    """
+    if _WHITESPACE_RE.search(encoded):
+        encoded = "".join(encoded.split())
+    if len(encoded) // 4 * 3 > max_bytes:
+        raise ValueError(f"image exceeds {max_bytes} bytes")
+    buffer = io.BytesIO()
+    for start in range(0, len(encoded), DECODE_CHUNK_CHARS):
+        buffer.write(base64.b64decode(encoded[start:start + DECODE_CHUNK_CHARS], validate=True))
+    buffer.seek(0)
+    return buffer
+
+
+def perceptual_hash(image: Image.Image) -> str:
+    """Difference hash: neighbouring-pixel gradients of a 17x16 grey thumbnail, as hex."""
+    grey = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR)
+    pixels = grey.tobytes()
+    bits = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{bits:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def normalize_image(data_url: str) -> dict:
+    """
+    Turns a camera data URL (or bare base64) into a model-ready image.
+    Returns {"data", "mime_type", "phash", "width", "height"}, or an error
+    dict ({"error", "details", "status_code"}).
+    """
+    encoded = data_url.split(",", 1)[1] if "," in data_url else data_url
+    max_bytes = max_image_bytes()
+    try:
+        buffer = decode_base64_stream(encoded, max_bytes)
+    except binascii.Error as e:
+        return _error("Invalid base64 image data.", str(e), 400)
+    except ValueError as e:
+        return _error("Image too large.", str(e), 413)
+
+    max_side = _env_int("KIOSK_IMAGE_MAX_SIDE", DEFAULT_MAX_SIDE)
+    try:
+        image = Image.open(buffer)
+        max_pixels = _env_int("KIOSK_IMAGE_MAX_PIXELS", DEFAULT_MAX_PIXELS)
+        if image.width * image.height > max_pixels:
+            return _error("Image too large.", f"{image.width}x{image.height} exceeds {max_pixels} pixels", 413)
+        # JPEG: DCT 단계에서 1/2~1/8 로 줄여 디코딩 (긴 변이 max_side 이상 유지되는 만큼)
+        image.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        return _error("Invalid image data.", str(e), 400)
+
+    fmt = os.getenv("KIOSK_IMAGE_FORMAT", "jpeg").lower()
+    pil_format, mime_type = FORMATS.get(fmt, FORMATS["jpeg"])
+    output = io.BytesIO()
+    # exif 를 넘기지 않으므로 메타데이터는 모두 빠짐
+    image.save(output, format=pil_format, quality=_env_int("KIOSK_IMAGE_QUALITY", DEFAULT_QUALITY), optimize=True)
+    return {
+        "data": output.getvalue(),
+        "mime_type": mime_type,
+        "phash": perceptual_hash(image),
+        "width": image.width,
+        "height": image.height,
+    }
+
+
+class ImageReplyCache:
+    """
+    TTL + LRU cache of general replies about an image, matched by question and
+    perceptual-hash distance.
+
+        cache.get(phash, question)         -> reply | None
+        cache.put(phash, question, reply)
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE, ttl_seconds=DEFAULT_CACHE_TTL_SECONDS,
+                 max_distance=DEFAULT_HASH_DISTANCE, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (phash, question) → (expires_at, hash bits, reply), 오래된 것부터
+
+    def get(self, phash: str, question: str):
+        question = normalize_question(question)
+        bits = int(phash, 16)
+        now = self._clock()
+        with self._lock:
+            best_key, best_distance = None, self.max_distance + 1
+            for key, (expires_at, entry_bits, _) in list(self._entries.items()):
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                if key[1] != question:
+                    continue
+                distance = (bits ^ entry_bits).bit_count()
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][2]
+
+    def put(self, phash: str, question: str, reply: str):
+        key = (phash, normalize_question(question))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + self.ttl_seconds, int(phash, 16), reply)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_cache = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def _cache_from_env():
+    size = _env_int("KIOSK_IMAGE_CACHE_SIZE", DEFAULT_CACHE_SIZE)
+    if size <= 0:
+        return None
+    return ImageReplyCache(
+        max_entries=size,
+        ttl_seconds=_env_int("KIOSK_IMAGE_CACHE_TTL", DEFAULT_CACHE_TTL_SECONDS),
+        max_distance=_env_int("KIOSK_IMAGE_HASH_DISTANCE", DEFAULT_HASH_DISTANCE),
+    )
+
+
+def get_image_reply_cache():
+    """Returns the process-wide image reply cache, or None if disabled."""
+    global _cache, _cache_configured
+    if not _cache_configured:
+        with _cache_lock:
+            if not _cache_configured:
+                _cache = _cache_from_env()
+                _cache_configured = True
+    return _cache
+
+
+def set_image_reply_cache(cache):
+    """Replaces the process-wide cache (None disables it). Mainly for tests."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = cache
+        _cache_configured = True
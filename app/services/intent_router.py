@@ -0,0 +1,239 @@
+"""
+로컬 의도 분류기 (Gemini 호출 전 단계)
+
+"접수할게요 홍길동 900101-1234567", "카드로 결제", "처방전 뽑아주세요" 처럼
+정형화된 키오스크 명령은 정규식과 키워드 사전만으로 의도와 파라미터를 뽑아
+바로 처리합니다. 확신도(confidence)가 낮은 문장(질문, 여러 의도가 섞인 문장,
+일반 대화)만 모델로 넘깁니다. 모델 호출이 실패하면 확신도가 낮더라도 의도가
+잡힌 경우 로컬 결과로 처리해, 외부 API 장애 중에도 키오스크를 쓸 수 있습니다.
+
+증상 사전은 reception_service 의 SYMPTOMS / SYM_TO_DEPT 에서 만듭니다.
+
+"현금 없어요", "접수 취소해주세요" 처럼 부정/취소 표현이 들어간 문장은 키워드가
+같아도 뜻이 반대이므로 로컬에서 처리하지 않고(모델 장애 시 대체 처리도 하지 않음)
+모델에 맡깁니다. 결제 확정은 "카드로", "현금으로 할게요" 처럼 결제 수단을 고르는
+표현이 있을 때만 로컬에서 처리합니다.
+
+이름은 주민등록번호로 예약을 찾아 그 이름이 문장에 있으면 그대로 쓰고, 예약이
+없으면 문장 형태(주민등록번호 앞뒤 단어, "이름은 ..." 등)로 추정합니다.
+"""
+import re
+import threading
+from collections import namedtuple
+
+from app.services.reception_service import SYMPTOMS, SYM_TO_DEPT
+from app.storage import get_storage
+
+# 이 값 이상이면 모델 없이 처리
+ROUTER_MIN_CONFIDENCE = 0.8
+# 모델 호출이 실패했을 때 로컬 결과를 쓰는 기준
+ROUTER_FALLBACK_CONFIDENCE = 0.3
+
+RouteResult = namedtuple("RouteResult", ["intent", "parameters", "confidence"])
+NO_ROUTE = RouteResult(None, {}, 0.0)
+
+_RRN_RE = re.compile(r"(?<!\d)(\d{6})\s*-?\s*([1-4]\d{6})(?!\d)")
+_NAME_PATTERNS = (
+    re.compile(r"(?:이름은|이름이|성함은|성함이|저는|제가)\s*([가-힣]{2,4}?)(?:이고|이구요|입니다|이에요|예요|이요|고|요|[\s,.]|$)"),
+    re.compile(r"(?:^|[\s,])([가-힣]{2,4}?)(?:이고|이구요|입니다|이에요|예요)(?=[\s,.]|$)"),
+)
+_HANGUL_TOKEN_RE = re.compile(r"^[가-힣]{2,4}$")
+
+_INTENT_KEYWORDS = {
+    "reception": ("접수",),
+    "payment": ("수납", "결제", "계산", "진료비", "카드", "현금"),
+    "certificate": ("처방전", "진료확인서", "확인서", "증명서"),
+}
+_PAYMENT_METHODS = (("카드", "card"), ("현금", "cash"))
+_CERTIFICATE_TYPES = (("처방전", "prescription"), ("진료확인서", "confirmation"), ("확인서", "confirmation"))
+# 질문/설명 요청은 안내 문장이 필요하므로 모델에 맡깁니다.
+_QUESTION_MARKERS = ("?", "어디", "언제", "얼마", "몇", "왜", "어떻게", "뭐", "무엇", "무슨", "알려", "가능", "되나", "있나")
+# 부정/취소 표현 ("현금 없어요", "카드 말고", "결제 안 할게요") - 키워드와 반대 뜻
+_NEGATION_MARKERS = ("없", "안 ", "안돼", "안되", "않", "말고", "취소", "못", "싫", "그만")
+_NEGATED_CONFIDENCE = 0.2  # ROUTER_FALLBACK_CONFIDENCE 보다 낮게
+# 결제 수단을 고르는 표현 ("카드로", "현금으로 할게요", "카드 결제", "현금이요")
+_PAYMENT_CHOICE_RE = re.compile(r"(카드|현금)\s*(?:으로|로|결제|계산|이요|요(?=[\s.!]|$))")
+
+# 증상 표시명(‧ 로 나뉜 각 단어)과 자주 쓰는 표현 → SYM_TO_DEPT 키
+_SYMPTOM_SYNONYMS = {
+    "fever": ("열이", "열나", "오한"),
+    "cough": ("기침", "가래"),
+    "soreth": ("목이 아", "목아", "목감기", "인후통"),
+    "stomach": ("배가 아", "배아", "복통", "소화"),
+    "diarr": ("설사",),
+    "headache": ("머리가 아", "머리아", "두통"),
+    "dizzy": ("어지러", "어지럼"),
+    "skin": ("발진", "두드러기", "피부"),
+    "injury": ("다쳤", "상처", "타박상"),
+}
+
+
+def _build_symptom_lexicon():
+    lexicon = []
+    for key, display in SYMPTOMS:
+        if key not in SYM_TO_DEPT or key == "etc":
+            continue
+        words = set(display.split("‧")) | set(_SYMPTOM_SYNONYMS.get(key, ()))
+        lexicon.extend((word, key) for word in words if word)
+    # 긴 표현부터 비교 ("목이 아" 가 "아" 류보다 먼저)
+    lexicon.sort(key=lambda item: -len(item[0]))
+    return tuple(lexicon)
+
+
+_SYMPTOM_LEXICON = _build_symptom_lexicon()
+_STOPWORDS = tuple(
+    {word for words in _INTENT_KEYWORDS.values() for word in words}
+    | {word for word, _ in _SYMPTOM_LEXICON}
+    | {"주민번호", "주민등록번호", "번호", "이름", "성함", "진료", "발급", "오늘", "지금", "감사", "안녕", "부탁"}
+)
+_VERB_ENDINGS = ("요", "다", "고", "서", "게", "줘", "죠", "까")
+
+
+def _is_name_candidate(token):
+    return (
+        bool(_HANGUL_TOKEN_RE.match(token))
+        and not token.endswith(_VERB_ENDINGS)
+        and not any(word in token for word in _STOPWORDS)
+        and not any(marker in token for marker in _QUESTION_MARKERS)
+    )
+
+
+def _extract_rrn(message):
+    match = _RRN_RE.search(message)
+    if not match:
+        return None, None
+    return f"{match.group(1)}-{match.group(2)}", match
+
+
+def _stored_name(message, rrn):
+    """The reserved patient's name for `rrn` if the message contains it."""
+    try:
+        reservation = get_storage().get_reservation(rrn)
+    except FileNotFoundError:
+        return None
+    name = reservation.get("name") if isinstance(reservation, dict) else None
+    return name if isinstance(name, str) and name and name in message else None
+
+
+def _extract_name(message, rrn_match):
+    for pattern in _NAME_PATTERNS:
+        for match in pattern.finditer(message):
+            if _is_name_candidate(match.group(1)):
+                return match.group(1)
+    if rrn_match is None:
+        return None
+    # 주민등록번호 바로 앞/뒤의 한글 단어 ("홍길동 900101-1234567", "900101-1234567 홍길동")
+    before = re.split(r"[\s,]+", message[:rrn_match.start()].strip(" ,"))
+    after = re.split(r"[\s,]+", message[rrn_match.end():].strip(" ,"))
+    for token in (before[-1] if before else "", after[0] if after else ""):
+        token = token.strip(".,!")
+        if _is_name_candidate(token):
+            return token
+    return None
+
+
+def _extract_symptom(message):
+    for word, key in _SYMPTOM_LEXICON:
+        if word in message:
+            return key
+    return None
+
+
+def contains_personal_data(message: str) -> bool:
+    """True if the message carries an RRN or a recognisable name."""
+    if not message:
+        return False
+    _, rrn_match = _extract_rrn(message)
+    return rrn_match is not None or _extract_name(message, None) is not None
+
+
+def route_message(message: str) -> RouteResult:
+    """
+    Classifies a kiosk message without the model.
+    Returns RouteResult(intent, parameters, confidence); intent is None when no
+    service keyword was found. parameters use the same keys as the model's JSON.
+    """
+    if not message or not message.strip():
+        return NO_ROUTE
+    text = message.strip()
+    intents = [intent for intent, words in _INTENT_KEYWORDS.items() if any(word in text for word in words)]
+    if not intents:
+        return NO_ROUTE
+    if len(intents) > 1:
+        # "수납하고 처방전도" 처럼 섞인 요청 - 카드/현금은 수납 신호로만 쓰이므로 다른 의도가 우선
+        non_method = [intent for intent in intents if not (
+            intent == "payment" and not any(word in text for word in ("수납", "결제", "계산", "진료비"))
+        )]
+        if len(non_method) != 1:
+            return RouteResult(intents[0], {}, 0.2)
+        intents = non_method
+    intent = intents[0]
+
+    parameters = {}
+    rrn, rrn_match = _extract_rrn(text)
+    if rrn:
+        parameters["rrn"] = rrn
+    # "류열다" 처럼 어미로 끝나는 이름도 예약에 있으면 그대로 인식
+    name = (_stored_name(text, rrn) if rrn else None) or _extract_name(text, rrn_match)
+    if name:
+        parameters["name"] = name
+
+    if intent == "reception":
+        symptom = _extract_symptom(text)
+        if symptom:
+            parameters["symptom"] = symptom
+    elif intent == "payment":
+        choice = _PAYMENT_CHOICE_RE.search(text)
+        method = next((value for word, value in _PAYMENT_METHODS if choice and word == choice.group(1)), None)
+        parameters["payment_stage"] = "confirmation" if method else "initial"
+        if method:
+            parameters["payment_method"] = method
+    elif intent == "certificate":
+        certificate_type = next((value for word, value in _CERTIFICATE_TYPES if word in text), None)
+        if certificate_type:
+            parameters["certificate_type"] = certificate_type
+
+    unnamed_text = text.replace(name, " ") if name else text
+    if any(marker in unnamed_text for marker in _NEGATION_MARKERS):
+        confidence = _NEGATED_CONFIDENCE
+    elif any(marker in text for marker in _QUESTION_MARKERS):
+        confidence = 0.5
+    elif intent == "payment" and not method and not any(word in text for word in ("수납", "결제", "계산", "진료비")):
+        # "카드", "현금" 만 있고 고르는 표현이 없음 - 뜻이 애매하므로 모델에 맡김
+        confidence = 0.5
+    elif rrn and not name:
+        # 번호는 있는데 이름을 못 찾음 - 이름 표현이 특이한 경우라 모델이 더 정확
+        confidence = 0.6
+    elif rrn and name:
+        confidence = 0.98
+    else:
+        # 이름/번호가 없으면 처리기가 되묻는 것으로 끝나므로 모델과 결과가 같음
+        confidence = 0.9
+    return RouteResult(intent, parameters, confidence)
+
+
+# ── 적중률 집계 ───────────────────────────────────────────
+_stats_lock = threading.Lock()
+_stats = {"local": 0, "model": 0, "fallback": 0}
+
+
+def record_route(outcome: str):
+    """outcome: 'local' (handled without the model), 'model', or 'fallback' (model failed, local used)."""
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def router_stats() -> dict:
+    """Counters since start plus hit_rate = share of messages answered without the model."""
+    with _stats_lock:
+        stats = dict(_stats)
+    total = sum(stats.values())
+    stats["total"] = total
+    stats["hit_rate"] = round((stats["local"] + stats["fallback"]) / total, 4) if total else 0.0
+    return stats
+
+
+def reset_router_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
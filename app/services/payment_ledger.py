@@ -0,0 +1,162 @@
+"""
+결제 원장 (워커 메모리)
+
+결제 기록을 payment_id 로 바로 찾고(dict), 환자별 결제 목록도 보조 인덱스로
+바로 찾습니다. 기록은 생성 순서대로 보관되며, 보존 기간이 지났거나 개수 한도를
+넘은 가장 오래된 기록부터 새 결제가 들어올 때 지웁니다 (결제당 평균 O(1)).
+지워지는 기록은 아카이브 파일(CSV)에 덧붙여 남길 수 있습니다.
+
+  • KIOSK_PAYMENT_RETENTION  메모리에 두는 기간(초, 기본 86400 = 하루)
+  • KIOSK_PAYMENT_MAX        메모리에 두는 최대 결제 수 (기본 10000)
+  • KIOSK_PAYMENT_ARCHIVE    지워지는 기록을 덧붙일 CSV 경로 (기본 없음)
+
+SQLite 백엔드는 결제 시점에 이미 DB 에 저장하므로, 메모리에서 지워진 결제도
+get_payment_details() 가 DB 에서 찾습니다.
+"""
+import csv
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_RETENTION_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_PAYMENTS = 10_000
+ARCHIVE_FIELDNAMES = ["payment_id", "patient_id", "amount", "method", "status", "timestamp"]
+
+
+class CsvPaymentArchive:
+    """Appends evicted payment records to a CSV file (header written once)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, records: list):
+        with self._lock:
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=ARCHIVE_FIELDNAMES, extrasaction="ignore")
+                if new_file:
+                    writer.writeheader()
+                writer.writerows(records)
+
+
+class PaymentLedger:
+    """
+    Payment records indexed by payment_id and patient_id, oldest evicted first.
+
+        ledger.add(record)
+        ledger.get(payment_id)        -> dict | None
+        ledger.for_patient(patient_id) -> [dict, ...]   # oldest first
+    """
+
+    def __init__(self, retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+                 max_payments: int = DEFAULT_MAX_PAYMENTS, archive=None, clock=time.time):
+        self.retention_seconds = retention_seconds
+        self.max_payments = max_payments
+        self.archive = archive
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._by_id = OrderedDict()  # payment_id → (added_at, record), 오래된 것부터
+        self._by_patient = {}        # patient_id → OrderedDict(payment_id → record)
+
+    def add(self, record: dict) -> None:
+        now = self._clock()
+        with self._lock:
+            payment_id = record["payment_id"]
+            self._remove(payment_id)
+            self._by_id[payment_id] = (now, record)
+            self._by_patient.setdefault(record["patient_id"], OrderedDict())[payment_id] = record
+            evicted = self._evict(now)
+        self._spill(evicted)
+
+    def get(self, payment_id: str) -> dict | None:
+        # 조회 때도 보관 기간이 지난 결제를 먼저 내보냄 (다음 add 까지 남아 있지 않도록)
+        with self._lock:
+            evicted = self._evict(self._clock())
+            entry = self._by_id.get(payment_id)
+        self._spill(evicted)
+        return entry[1] if entry is not None else None
+
+    def for_patient(self, patient_id: str) -> list:
+        with self._lock:
+            evicted = self._evict(self._clock())
+            payments = list(self._by_patient.get(patient_id, {}).values())
+        self._spill(evicted)
+        return payments
+
+    def evict_expired(self) -> int:
+        """Drops records older than the retention window; returns how many."""
+        with self._lock:
+            evicted = self._evict(self._clock())
+        self._spill(evicted)
+        return len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_id.clear()
+            self._by_patient.clear()
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def _remove(self, payment_id):
+        entry = self._by_id.pop(payment_id, None)
+        if entry is None:
+            return None
+        record = entry[1]
+        payments = self._by_patient.get(record["patient_id"])
+        if payments is not None:
+            payments.pop(payment_id, None)
+            if not payments:
+                del self._by_patient[record["patient_id"]]
+        return record
+
+    def _evict(self, now) -> list:
+        evicted = []
+        cutoff = now - self.retention_seconds
+        while self._by_id:
+            payment_id, (added_at, _) = next(iter(self._by_id.items()))
+            if added_at > cutoff and len(self._by_id) <= self.max_payments:
+                break
+            evicted.append(self._remove(payment_id))
+        return evicted
+
+    def _spill(self, records):
+        # 파일 쓰기는 잠금 밖에서 - 다른 결제 조회를 막지 않음
+        if records and self.archive is not None:
+            self.archive(records)
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def _ledger_from_env() -> PaymentLedger:
+    try:
+        retention_seconds = float(os.getenv("KIOSK_PAYMENT_RETENTION", DEFAULT_RETENTION_SECONDS))
+    except ValueError:
+        retention_seconds = DEFAULT_RETENTION_SECONDS
+    try:
+        max_payments = int(os.getenv("KIOSK_PAYMENT_MAX", DEFAULT_MAX_PAYMENTS))
+    except ValueError:
+        max_payments = DEFAULT_MAX_PAYMENTS
+    archive_path = os.getenv("KIOSK_PAYMENT_ARCHIVE")
+    return PaymentLedger(retention_seconds, max_payments, CsvPaymentArchive(archive_path) if archive_path else None)
+
+
+def get_payment_ledger() -> PaymentLedger:
+    """Returns the process-wide payment ledger (created on first use)."""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = _ledger_from_env()
+    return _ledger
+
+
+def set_payment_ledger(ledger: PaymentLedger | None) -> None:
+    """Replaces the process-wide ledger (None → recreate from the environment on next use)."""
+    global _ledger
+    with _ledger_lock:
+        _ledger = ledger
@@ -1,26 +1,23 @@
 import uuid
 import random
-import csv
-import os
-import sys # Added for logging
+from datetime import datetime
 
-# In-memory "database" for payments
-_payments_db = []
+from app.services.certificate_cache import get_certificate_cache
+from app.services.payment_ledger import get_payment_ledger
+from app.storage import get_storage, TREATMENT_FEES_CSV, VersionConflictError
+from app.utils.tracing import traced
 
-# Define BASE_DIR and TREATMENT_FEES_CSV path
-# Assuming the structure is app/services/payment_service.py
-# and data/treatment_fees.csv is relative to the project root.
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
-TREATMENT_FEES_CSV = os.path.join(BASE_DIR, "data", "treatment_fees.csv")
+# Recent payments live in the worker's PaymentLedger (indexed, time-bounded)
 
+# Treatment fees and reservations are read through app.storage
+# (TREATMENT_FEES_CSV is the CSV backend's fee file, kept for error messages).
 
+
+@traced
 def process_new_payment(patient_id: str, amount: int, method: str) -> str:
     """
     Processes a new payment, stores it, and returns a unique payment ID.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.process_new_payment(args={{_func_args}})")
     payment_id = str(uuid.uuid4())
     payment_record = {
         "payment_id": payment_id,
@@ -28,112 +25,90 @@ def process_new_payment(patient_id: str, amount: int, method: str) -> str:
         "amount": amount,
         "method": method,
         "status": "completed",  # Assuming payment is always successful for now
-        "timestamp": uuid.uuid4().hex # Using hex for a simple timestamp-like string
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
     }
-    _payments_db.append(payment_record)
+    get_payment_ledger().add(payment_record)
+    # Durable backends (e.g. SQLite) share the record with other workers
+    get_storage().save_payment(payment_record)
     return payment_id
 
 
+@traced
 def get_payment_details(payment_id: str) -> dict | None:
     """
     Retrieves payment details for a given payment ID.
     Returns the payment record or None if not found.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.get_payment_details(args={{_func_args}})")
-    for payment in _payments_db:
-        if payment["payment_id"] == payment_id:
-            return payment
-    return None
+    payment = get_payment_ledger().get(payment_id)
+    if payment is not None:
+        return payment
+    # Not created by this worker (or already evicted) - ask the shared storage backend
+    return get_storage().get_payment(payment_id)
 
 
-def update_reservation_with_payment_details(patient_rrn: str, prescription_names: list, total_fee: int) -> bool:
+@traced
+def get_patient_payments(patient_id: str) -> list:
     """
-    Updates a reservation in reservations.csv with prescription names and total fee.
+    Payments of one patient recorded by this worker within the retention
+    window, oldest first.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.update_reservation_with_payment_details(args={{_func_args}})")
-    RESERVATIONS_CSV = os.path.join(BASE_DIR, "data", "reservations.csv")
+    return get_payment_ledger().for_patient(patient_id)
 
-    if not os.path.exists(RESERVATIONS_CSV):
-        # Consider logging this error: print(f"Error: {RESERVATIONS_CSV} not found.")
-        return False
 
-    rows = []
-    original_fieldnames = None # To store the original fieldnames
+@traced
+def update_reservation_with_payment_details(patient_rrn: str, prescription_names: list, total_fee: int,
+                                            expected_version=None) -> bool:
+    """
+    Updates a reservation with prescription names and total fee, and marks it as paid.
+    With `expected_version`, returns False if the reservation changed in the meantime.
+    """
+    storage = get_storage()
 
     try:
-        with open(RESERVATIONS_CSV, mode='r', newline='', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile)
-            original_fieldnames = reader.fieldnames
-            if not original_fieldnames or not all(field in original_fieldnames for field in ['rrn', 'prescription_names', 'total_fee']):
-                # Log error: print("Error: CSV headers are missing or incorrect.")
-                return False
-            rows.extend(list(reader)) # Read all rows into memory
-
-        updated = False
-        # Find and update the specific row
-        for row_idx, row in enumerate(rows):
-            if row.get('rrn') == patient_rrn:
-                # Convert prescription_names list to a comma-separated string
-                if prescription_names and isinstance(prescription_names, list):
-                    rows[row_idx]['prescription_names'] = ",".join(prescription_names)
-                else:
-                    rows[row_idx]['prescription_names'] = "" # Empty string if list is empty or None
-
-                rows[row_idx]['total_fee'] = str(total_fee) # Store total_fee as string
-                rows[row_idx]['status'] = "Paid" # <--- ADDED THIS LINE
-                updated = True
-                break
+        fieldnames = storage.reservation_fieldnames()
+        if not fieldnames or not all(field in fieldnames for field in ['rrn', 'prescription_names', 'total_fee']):
+            # Log error: print("Error: CSV headers are missing or incorrect.")
+            return False
 
-        if updated:
-            # Write all rows back (including the updated one)
-            with open(RESERVATIONS_CSV, mode='w', newline='', encoding='utf-8') as csvfile:
-                if not original_fieldnames:
-                     # This should ideally not be reached if reading was successful
-                     # print("Error: Original fieldnames not available for writing.")
-                     return False
-
-                writer = csv.DictWriter(csvfile, fieldnames=original_fieldnames)
-                writer.writeheader()
-                writer.writerows(rows)
-            return True
+        # Convert prescription_names list to a comma-separated string
+        if prescription_names and isinstance(prescription_names, list):
+            prescription_names_str = ",".join(prescription_names)
         else:
-            # Patient RRN not found
-            # print(f"Info: Patient RRN {patient_rrn} not found in reservations.")
-            return False
+            prescription_names_str = "" # Empty string if list is empty or None
 
+        updated = storage.update_reservation(patient_rrn, {
+            'prescription_names': prescription_names_str,
+            'total_fee': str(total_fee), # Store total_fee as string
+            'status': "Paid",
+        }, expected_version=expected_version) # False if patient RRN not found
+        if updated:
+            # Previously issued certificates of this patient are now stale
+            cache = get_certificate_cache()
+            if cache:
+                cache.invalidate(patient_rrn)
+        return updated
+
+    except VersionConflictError:
+        # Reservation was modified by another worker since it was read
+        return False
     except FileNotFoundError:
-        # print(f"Error: File {RESERVATIONS_CSV} not found during update.")
+        # print("Error: Reservation data not found during update.")
         return False
     except Exception as e:
         # print(f"Error updating reservation for RRN {patient_rrn}: {e}")
         return False
 
 
+@traced
 def load_department_prescriptions(department: str) -> dict:
     random.seed(42)
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.load_department_prescriptions(args={{_func_args}})")
-    if not os.path.exists(TREATMENT_FEES_CSV):
-        return {"error": f"Data file not found: {TREATMENT_FEES_CSV}", "prescriptions": [], "total_fee": 0}
-
     try: # New top-level try block
-        department_prescriptions_details = []
-        try: # Inner try for CSV processing (can be kept or simplified)
-            with open(TREATMENT_FEES_CSV, newline="", encoding="utf-8-sig") as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    if row["Department"].strip().lower() == department.lower():
-                        try:
-                            department_prescriptions_details.append(
-                                {"name": row["Prescription"], "fee": int(row["Fee"])}
-                            )
-                        except ValueError:
-                             return {"error": f"Invalid fee format for {row['Prescription']} in {department}.", "prescriptions": [], "total_fee": 0}
+        try: # Inner try for storage access (CSV or database)
+            department_prescriptions_details = get_storage().fees_for_department(department)
+        except FileNotFoundError:
+            return {"error": f"Data file not found: {TREATMENT_FEES_CSV}", "prescriptions": [], "total_fee": 0}
+        except ValueError as fee_e: # Invalid fee format in the data source
+            return {"error": str(fee_e), "prescriptions": [], "total_fee": 0}
         except Exception as csv_e: # Catch errors during CSV read/parse specifically
             # It's good practice to log csv_e here for debugging
             return {"error": f"Error reading or parsing CSV: {str(csv_e)}", "prescriptions": [], "total_fee": 0}
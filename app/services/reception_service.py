@@ -1,9 +1,11 @@
-import csv
 import os
 import random
-import sys # Added for logging
 from datetime import datetime
 
+from app.services.ticket_sequencer import get_ticket_sequencer
+from app.storage import get_storage, RESERVATION_FIELDNAMES, VersionConflictError
+from app.utils.tracing import traced
+
 # Path constants
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
 RESV_CSV = os.path.join(BASE_DIR, "data", "reservations.csv")
@@ -35,17 +37,14 @@ SYM_TO_DEPT = {
 
 # Helper functions (moved from routes)
 
+@traced
 def fake_scan_rrn() -> tuple[str, str]:
     """
     주민등록번호 스캔 흉내 (실제 스캐너 대신 임의의 데이터를 생성)
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.fake_scan_rrn(args={{_func_args}})")
-    # CSV 파일에서 임의의 환자 정보 읽기 (데모용)
+    # 예약 저장소에서 임의의 환자 정보 읽기 (데모용)
     try:
-        with open(RESV_CSV, mode="r", encoding="utf-8-sig") as f:
-            reservations = list(csv.DictReader(f))
+        reservations = get_storage().list_reservations()
         if not reservations:
             # Fallback if CSV is empty or not found
             return "김민준", "900101-1234567"
@@ -61,21 +60,13 @@ def fake_scan_rrn() -> tuple[str, str]:
         return "박도윤", "950505-1010101"
 
 
+@traced
 def lookup_reservation(name: str, rrn: str) -> dict | None:
     """
     예약 내역 조회 (이름과 주민번호로 조회)
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.lookup_reservation(args={{_func_args}})")
     try:
-        with open(RESV_CSV, mode="r", encoding="utf-8-sig") as f:
-            reservations = list(csv.DictReader(f))
-
-        for res in reservations:
-            if res["name"] == name and res["rrn"] == rrn:
-                return res # Return the entire reservation dict
-        return None
+        return get_storage().find_reservation(name, rrn) # Return the entire reservation dict
     except FileNotFoundError:
         print(f"Warning: {RESV_CSV} not found in lookup_reservation.")
         return None
@@ -83,77 +74,48 @@ def lookup_reservation(name: str, rrn: str) -> dict | None:
         print(f"Error in lookup_reservation reading {RESV_CSV}: {e}")
         return None
 
+@traced
 def new_ticket(department: str) -> str:
     """
-    새로운 대기표 발급 (간단한 규칙으로 생성)
+    새로운 대기표 발급: 진료과 코드 + 그날의 일련번호 (예: "A-007")
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.new_ticket(args={{_func_args}})")
-    now = datetime.now()
-    dept_code = department[0] if department else "X" # Use first letter of department
-    ticket_num = f"{dept_code}{now.strftime('%H%M%S')}{random.randint(10,99)}"
-    return ticket_num
+    return get_ticket_sequencer().issue(department)
 
 
-def update_reservation_status(patient_rrn: str, new_status: str, **kwargs) -> bool:
+@traced
+def update_reservation_status(patient_rrn: str, new_status: str, expected_version=None, **kwargs) -> bool:
     """
     Updates the status of a patient's reservation in reservations.csv.
     Can also update other reservation fields (e.g., 'department', 'ticket_number', 'name')
     by passing them as keyword arguments. All values will be stored as strings.
+    If `expected_version` is given, the update only happens when the row's
+    'version' still matches (returns False if another worker changed it first).
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.update_reservation_status(args={{_func_args}})")
-
-    if not os.path.exists(RESV_CSV):
-        # print(f"Error: {RESV_CSV} not found.") # Optional: for server-side logging
-        return False
-
-    rows = []
-    original_fieldnames = None
-    updated = False
-
+    storage = get_storage()
     try:
-        with open(RESV_CSV, mode='r', newline='', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile)
-            original_fieldnames = reader.fieldnames
-            # Ensure 'rrn' and 'status' are valid fieldnames
-            if not original_fieldnames or not all(field in original_fieldnames for field in ['rrn', 'status']):
-                # print("Error: CSV headers are missing 'rrn' or 'status'.") # Optional
-                return False
-            rows = list(reader)
-
-        for i, row in enumerate(rows):
-            if row.get('rrn') == patient_rrn:
-                rows[i]['status'] = str(new_status) # Ensure status is also a string
-
-                # Update other fields from kwargs if they are valid column names
-                for key, value in kwargs.items():
-                    if key in original_fieldnames: # Ensure the key is a valid column
-                        rows[i][key] = str(value) # Store all CSV data as strings
-                    else:
-                        # Optional: Log a warning if a kwarg key is not a valid fieldname
-                        print(f"Warning: In update_reservation_status, '{key}' is not a valid field in reservations.csv. Cannot update.")
-
-                updated = True
-                # RRN should be unique, so we can break after finding and updating.
-                break
-
-        if updated:
-            with open(RESV_CSV, mode='w', newline='', encoding='utf-8') as csvfile:
-                if not original_fieldnames: # Should have been caught earlier
-                    return False
-                writer = csv.DictWriter(csvfile, fieldnames=original_fieldnames)
-                writer.writeheader()
-                writer.writerows(rows)
-            return True
-        else:
-            # print(f"Info: Patient RRN {patient_rrn} not found for status update.") # Optional
-            return False # Patient not found
-
-    except FileNotFoundError: # Should be caught by os.path.exists, but as a safeguard
-        # print(f"Error: File {RESV_CSV} disappeared during update operation.") # Optional
+        fieldnames = storage.reservation_fieldnames()
+        # Ensure 'rrn' and 'status' are valid fieldnames
+        if not fieldnames or not all(field in fieldnames for field in ['rrn', 'status']):
+            # print("Error: CSV headers are missing 'rrn' or 'status'.") # Optional
+            return False
+
+        updates = {'status': str(new_status)} # Ensure status is also a string
+        # Update other fields from kwargs if they are valid column names
+        for key, value in kwargs.items():
+            if key in fieldnames: # Ensure the key is a valid column
+                updates[key] = str(value) # Store all CSV data as strings
+            else:
+                # Optional: Log a warning if a kwarg key is not a valid fieldname
+                print(f"Warning: In update_reservation_status, '{key}' is not a valid field in reservations.csv. Cannot update.")
+
+        # RRN is unique, so the store updates a single indexed row.
+        return storage.update_reservation(patient_rrn, updates, expected_version=expected_version) # False if patient not found
+
+    except VersionConflictError:
+        # Another worker updated this reservation after the caller read it
+        return False
+    except FileNotFoundError:
+        # print(f"Error: {RESV_CSV} not found.") # Optional: for server-side logging
         return False
     except Exception as e:
         # print(f"Error updating reservation status for RRN {patient_rrn}: {e}") # Optional
@@ -162,14 +124,12 @@ def update_reservation_status(patient_rrn: str, new_status: str, **kwargs) -> bo
 
 # Service action functions
 
+@traced
 def handle_scan_action() -> dict:
     """
     Handles the 'scan' action: simulates RRN scan and looks up reservation.
     Returns a dictionary with name, rrn, and reservation_details.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.handle_scan_action(args={{_func_args}})")
     name, rrn = fake_scan_rrn()
     reservation_details = lookup_reservation(name, rrn)
     return {
@@ -178,14 +138,12 @@ def handle_scan_action() -> dict:
         "reservation_details": reservation_details
     }
 
+@traced
 def handle_manual_action(name: str, rrn: str) -> dict | None:
     """
     Handles the 'manual' input action: looks up reservation.
     Returns reservation_details dictionary or None.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.handle_manual_action(args={{_func_args}})")
     # Basic validation, though more robust validation might be in the route or a shared util
     if not name or not rrn: # Or more specific RRN format validation
         return None # Or raise ValueError
@@ -193,14 +151,12 @@ def handle_manual_action(name: str, rrn: str) -> dict | None:
     reservation_details = lookup_reservation(name, rrn)
     return reservation_details # This will be None if not found, or the dict if found
 
+@traced
 def handle_choose_symptom_action(symptom: str) -> dict:
     """
     Handles the 'choose_symptom' action: determines department and issues a new ticket.
     Returns a dictionary with department and ticket number.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.handle_choose_symptom_action(args={{_func_args}})")
     department = SYM_TO_DEPT.get(symptom, SYM_TO_DEPT.get("etc", "가정의학과")) # Default to "가정의학과" if symptom not in map
     ticket = new_ticket(department)
     return {
@@ -208,46 +164,29 @@ def handle_choose_symptom_action(symptom: str) -> dict:
         "ticket": ticket
     }
 
-DEFAULT_FIELDNAMES = [
-    "name", "rrn", "time", "department", "ticket_number",
-    "location", "doctor", "status", "prescription_names", "total_fee"
-]
+DEFAULT_FIELDNAMES = RESERVATION_FIELDNAMES
 
+@traced
 def add_new_patient_reception(name: str, rrn: str, department: str, ticket_number: str, initial_status: str = "Registered") -> bool:
     """
-    Appends a new patient reception record to reservations.csv.
-    If the CSV doesn't exist, it creates it with headers.
+    Appends a new patient reception record to the reservation storage.
+    With the CSV backend, a missing reservations.csv is created with headers.
     """
-    _func_args = locals()
-    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
-    print(f"ENTERING: {_module_path}.add_new_patient_reception(args={{_func_args}})")
-
-    file_exists = os.path.exists(RESV_CSV)
-    if not file_exists:
-        print(f"Info: {RESV_CSV} not found, will be created with headers.")
-
     try:
-        with open(RESV_CSV, mode='a', newline='', encoding='utf-8') as csvfile:
-            # Use DEFAULT_FIELDNAMES consistently
-            writer = csv.DictWriter(csvfile, fieldnames=DEFAULT_FIELDNAMES)
-
-            if not file_exists or os.path.getsize(RESV_CSV) == 0:
-                writer.writeheader()
-
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            new_row = {
-                "name": name,
-                "rrn": rrn,
-                "time": current_time,
-                "department": department,
-                "ticket_number": ticket_number,
-                "location": "",  # Default empty
-                "doctor": "",    # Default empty
-                "status": initial_status,
-                "prescription_names": "", # Default empty
-                "total_fee": "0"          # Default 0
-            }
-            writer.writerow(new_row)
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        new_row = {
+            "name": name,
+            "rrn": rrn,
+            "time": current_time,
+            "department": department,
+            "ticket_number": ticket_number,
+            "location": "",  # Default empty
+            "doctor": "",    # Default empty
+            "status": initial_status,
+            "prescription_names": "", # Default empty
+            "total_fee": "0"          # Default 0
+        }
+        get_storage().insert_reservation(new_row)
         return True
     except Exception as e:
         print(f"Error adding new patient reception for RRN {rrn}: {e}")
@@ -0,0 +1,497 @@
+"""
+예약 데이터 인메모리 저장소
+
+reservations.csv 를 한 번만 읽어 메모리에 올려 두고 `rrn` / `(name, rrn)`
+해시 인덱스로 조회합니다.
+
+변경 사항은 CSV 전체를 다시 쓰지 않고 저널 파일(reservations.csv.journal)에
+한 줄씩 추가(append)합니다. 로딩 시에는 기본 CSV 위에 저널을 재생(replay)하며,
+백그라운드 컴팩터가 주기적으로 저널을 새 CSV 스냅샷으로 합칩니다
+(임시 파일 작성 후 os.replace 로 원자적 교체). 교체 직전에 옮겨 둔 저널 끝에
+스냅샷 파일의 서명을 적어 두므로, 교체 후 저널을 지우기 전에 중단되어도 이미
+합쳐진 항목을 다시 재생하지 않습니다.
+
+여러 프로세스(gunicorn 워커)가 같은 파일을 쓰므로 모든 변경과 컴팩션은
+reservations.csv.lock 파일 잠금 안에서 최신 상태를 다시 읽은 뒤 수행합니다.
+각 행에는 `version` 컬럼이 있어 변경 때마다 1씩 증가하며, expected_version 을
+넘기면 낙관적 동시성 검사(다르면 VersionConflictError)를 합니다.
+"""
+import contextlib
+import csv
+import json
+import os
+import threading
+import time
+
+from app.storage.base import VersionConflictError
+from app.utils.file_lock import FileLock
+from app.utils.metrics import CSV_IO_SECONDS
+
+# 저널 / 컴팩션 기본 설정
+JOURNAL_SUFFIX = ".journal"
+COMPACTING_SUFFIX = ".journal.compacting"
+LOCK_SUFFIX = ".lock"
+VERSION_FIELD = "version"
+FSYNC_BATCH_SIZE = 32          # 이 개수만큼 쌓이면 fsync
+FSYNC_INTERVAL_SEC = 0.5       # 또는 마지막 fsync 이후 이 시간이 지나면 fsync
+COMPACT_THRESHOLD = 1000       # 저널 항목이 이만큼 쌓이면 즉시 컴팩션
+COMPACT_INTERVAL_SEC = 60.0    # 그 외에는 주기적으로 컴팩션
+
+
+class ReservationStore:
+    """
+    In-memory, indexed view of a reservations CSV file backed by an
+    append-only journal.
+
+    Rows are kept as dicts exactly as `csv.DictReader` produces them. Lookups
+    return copies so callers can never mutate the cached rows by accident.
+    Mutations are O(1): they touch one indexed row and append one journal line.
+    """
+
+    def __init__(self, csv_path: str, fsync_batch_size: int = FSYNC_BATCH_SIZE,
+                 fsync_interval: float = FSYNC_INTERVAL_SEC,
+                 compact_threshold: int = COMPACT_THRESHOLD,
+                 compact_interval: float = COMPACT_INTERVAL_SEC):
+        self.csv_path = csv_path
+        self.journal_path = csv_path + JOURNAL_SUFFIX
+        self.compacting_path = csv_path + COMPACTING_SUFFIX
+        self._file_lock = FileLock(csv_path + LOCK_SUFFIX)
+        self.fsync_batch_size = fsync_batch_size
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+        self.compact_interval = compact_interval
+
+        self._lock = threading.RLock()
+        self._signature = None      # (csv_sig, compacting_sig) of the loaded base
+        self._journal_ino = None    # inode of the journal replayed so far
+        self._journal_offset = 0    # bytes of the journal replayed so far
+        self._fieldnames = []
+        self._rows = []
+        self._by_rrn = {}
+        self._by_name_rrn = {}
+
+        self._journal_file = None
+        self._journal_entries = 0   # entries in the current journal (approx.)
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+        self._compactor = None
+        self._compactor_wakeup = threading.Event()
+        self._compacted_at = time.monotonic()
+        self._closed = False
+
+    # ── 로딩 / 인덱스 ────────────────────────────────────────
+    def _clear(self):
+        self._signature = None
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._fieldnames = []
+        self._rows = []
+        self._by_rrn = {}
+        self._by_name_rrn = {}
+
+    @staticmethod
+    def _stat_signature(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _base_signature(self):
+        csv_sig = self._stat_signature(self.csv_path)
+        if csv_sig is None:
+            raise FileNotFoundError(self.csv_path)
+        return (csv_sig, self._stat_signature(self.compacting_path))
+
+    def _load(self, signature):
+        with CSV_IO_SECONDS.labels(file="reservations", operation="read").time(), \
+                open(self.csv_path, mode="r", newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            fieldnames = list(reader.fieldnames or [])
+
+        if fieldnames and VERSION_FIELD not in fieldnames:
+            # 버전 컬럼이 없던 기존 파일 - 0 으로 시작 (다음 컴팩션 때 기록됨)
+            fieldnames.append(VERSION_FIELD)
+            for row in rows:
+                row[VERSION_FIELD] = "0"
+
+        self._fieldnames = fieldnames
+        self._rows = rows
+        self._rebuild_indexes()
+        self._signature = signature
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+        # 컴팩션 도중 중단된 저널이 남아 있으면 먼저 재생
+        if signature[1] is not None:
+            try:
+                self._replay_file(self.compacting_path, 0, snapshot=signature[0])
+            except FileNotFoundError:
+                # 다른 프로세스가 방금 컴팩션을 끝냄 - 서명이 달라져 다음 refresh 에서 다시 로드
+                self._signature = None
+                return
+        self._replay_journal()
+
+    def _rebuild_indexes(self):
+        by_rrn = {}
+        by_name_rrn = {}
+        for row in self._rows:
+            rrn = row.get("rrn")
+            # 첫 번째 행이 우선 (기존 선형 탐색과 동일한 결과)
+            by_rrn.setdefault(rrn, row)
+            by_name_rrn.setdefault((row.get("name"), rrn), row)
+        self._by_rrn = by_rrn
+        self._by_name_rrn = by_name_rrn
+
+    def _replay_file(self, path, offset, snapshot=None):
+        """
+        Applies journal entries of `path` starting at byte `offset`; returns the
+        new offset. Entries before a snapshot marker matching `snapshot` (the
+        loaded CSV's signature) are already part of the CSV and are skipped.
+        """
+        pending = []
+        with CSV_IO_SECONDS.labels(file="reservations", operation="journal_replay").time(), \
+                open(path, mode="rb") as f:
+            f.seek(offset)
+            for raw_line in f:
+                if not raw_line.endswith(b"\n"):
+                    break  # 기록 중이던(혹은 충돌로 잘린) 마지막 줄은 건너뜀
+                offset += len(raw_line)
+                try:
+                    entry = json.loads(raw_line.decode("utf-8"))
+                except ValueError:
+                    continue
+                if entry.get("op") == "snapshot":
+                    if snapshot is not None and entry.get("csv") == list(snapshot):
+                        pending = []
+                    continue
+                pending.append(entry)
+        for entry in pending:
+            self._apply(entry)
+        self._journal_entries += len(pending)
+        return offset
+
+    def _replay_journal(self):
+        sig = self._stat_signature(self.journal_path)
+        if sig is None:
+            self._journal_ino = None
+            self._journal_offset = 0
+            return
+        ino, _, size = sig
+        if ino != self._journal_ino or size < self._journal_offset:
+            # 새 저널 (컴팩션으로 교체됨) - 처음부터 재생
+            self._journal_ino = ino
+            self._journal_offset = 0
+        if size > self._journal_offset:
+            try:
+                self._journal_offset = self._replay_file(self.journal_path, self._journal_offset)
+            except FileNotFoundError:
+                # 다른 프로세스의 컴팩션이 저널을 옮김 - 다음 refresh 에서 전체 재로드
+                self._signature = None
+
+    def refresh(self):
+        """
+        Brings the in-memory table up to date with the files on disk.
+        A changed base CSV triggers a full reload; journal growth is replayed
+        incrementally. Raises FileNotFoundError if the CSV does not exist.
+        """
+        with self._lock:
+            try:
+                signature = self._base_signature()
+            except FileNotFoundError:
+                self._clear()
+                raise
+            if signature != self._signature:
+                self._load(signature)
+            else:
+                self._replay_journal()
+
+    # ── 조회 ─────────────────────────────────────────────────
+    @property
+    def fieldnames(self) -> list:
+        with self._lock:
+            self.refresh()
+            return list(self._fieldnames)
+
+    def get_by_rrn(self, rrn: str) -> dict | None:
+        with self._lock:
+            self.refresh()
+            row = self._by_rrn.get(rrn)
+            return dict(row) if row is not None else None
+
+    def find(self, name: str, rrn: str) -> dict | None:
+        with self._lock:
+            self.refresh()
+            row = self._by_name_rrn.get((name, rrn))
+            return dict(row) if row is not None else None
+
+    def rows(self) -> list:
+        with self._lock:
+            self.refresh()
+            return [dict(row) for row in self._rows]
+
+    def __len__(self):
+        with self._lock:
+            self.refresh()
+            return len(self._rows)
+
+    # ── 변경 (저널) ──────────────────────────────────────────
+    def _apply(self, entry: dict):
+        op = entry.get("op")
+        if op == "update":
+            row = self._by_rrn.get(entry.get("rrn"))
+            if row is None:
+                return
+            old_key = (row.get("name"), row.get("rrn"))
+            for key, value in entry.get("fields", {}).items():
+                if key in self._fieldnames:
+                    row[key] = value
+            new_key = (row.get("name"), row.get("rrn"))
+            if new_key != old_key:
+                # 이름이 바뀐 경우 (name, rrn) 인덱스만 갱신
+                if self._by_name_rrn.get(old_key) is row:
+                    del self._by_name_rrn[old_key]
+                self._by_name_rrn.setdefault(new_key, row)
+        elif op == "insert":
+            values = entry.get("row", {})
+            stored = {key: values.get(key, "") for key in self._fieldnames}
+            # 같은 사람의 두 번째 접수도 별도 행 (인덱스는 첫 번째 행이 우선)
+            self._rows.append(stored)
+            self._by_rrn.setdefault(stored.get("rrn"), stored)
+            self._by_name_rrn.setdefault((stored.get("name"), stored.get("rrn")), stored)
+
+    def _open_journal(self):
+        """(Re)opens the journal for appending if another process replaced or removed it."""
+        if self._journal_file is not None:
+            try:
+                current = os.stat(self.journal_path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current != os.fstat(self._journal_file.fileno()).st_ino:
+                self._journal_file.close()
+                self._journal_file = None
+        if self._journal_file is None:
+            self._journal_file = open(self.journal_path, mode="ab")
+
+    @contextlib.contextmanager
+    def _mutation(self):
+        """
+        Context for every write: thread lock + cross-process file lock, so
+        the refresh() inside sees every change other workers have made.
+        """
+        with self._lock, self._file_lock:
+            yield self
+
+    def _append_journal(self, entry: dict):
+        self._open_journal()
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with CSV_IO_SECONDS.labels(file="reservations", operation="journal_append").time():
+            self._journal_file.write(line)
+            self._journal_file.flush()
+        self._unsynced += 1
+        self._journal_entries += 1
+
+        # 방금 쓴 줄은 이미 메모리에 반영되어 있으므로 재생 위치만 전진
+        sig = self._stat_signature(self.journal_path)
+        if sig is not None and (sig[0] == self._journal_ino or self._journal_ino is None):
+            self._journal_ino = sig[0]
+            self._journal_offset = sig[2]
+
+        if (self._unsynced >= self.fsync_batch_size
+                or time.monotonic() - self._last_fsync >= self.fsync_interval):
+            self._fsync_journal()
+        self._ensure_compactor()
+        if self._journal_entries >= self.compact_threshold:
+            self._compactor_wakeup.set()
+
+    def _fsync_journal(self):
+        if self._journal_file is not None and self._unsynced:
+            os.fsync(self._journal_file.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    def sync(self):
+        """Forces pending journal entries to stable storage."""
+        with self._lock:
+            self._fsync_journal()
+
+    def update(self, rrn: str, fields: dict, expected_version=None) -> bool:
+        """
+        Updates the row identified by `rrn` with `fields` and journals the change.
+        Keys that are not CSV columns are ignored. Returns False if no such row.
+
+        The row's version is incremented. If `expected_version` is given and the
+        row has moved on since the caller read it, VersionConflictError is raised.
+        """
+        with self._mutation():
+            self.refresh()
+            row = self._by_rrn.get(rrn)
+            if row is None:
+                return False
+            current_version = int(row.get(VERSION_FIELD) or 0)
+            if expected_version is not None and int(expected_version) != current_version:
+                raise VersionConflictError(rrn, expected_version, current_version)
+            changes = {
+                key: str(value) for key, value in fields.items()
+                if key in self._fieldnames and key != VERSION_FIELD
+            }
+            # 재생 시에도 멱등이 되도록 증가시킨 값을 그대로 기록
+            changes[VERSION_FIELD] = str(current_version + 1)
+            entry = {"op": "update", "rrn": rrn, "fields": changes}
+            self._append_journal(entry)
+            self._apply(entry)
+            return True
+
+    def append(self, row: dict, default_fieldnames: list) -> None:
+        """
+        Appends a new row, creating the file with `default_fieldnames` as header
+        if it does not exist yet. Values are mapped onto the file's own header.
+        """
+        with self._mutation():
+            try:
+                self.refresh()
+            except FileNotFoundError:
+                self._create_empty(default_fieldnames)
+            if not self._fieldnames:
+                # 빈 파일 - 헤더부터 작성
+                self._fieldnames = list(default_fieldnames)
+                self._write_snapshot()
+            if VERSION_FIELD not in self._fieldnames:
+                self._fieldnames.append(VERSION_FIELD)
+
+            values = {key: str(row.get(key, "")) for key in self._fieldnames}
+            values[VERSION_FIELD] = "0"
+            entry = {"op": "insert", "row": values}
+            self._append_journal(entry)
+            self._apply(entry)
+
+    def _create_empty(self, fieldnames):
+        self._clear()
+        self._fieldnames = list(fieldnames)
+        if VERSION_FIELD not in self._fieldnames:
+            self._fieldnames.append(VERSION_FIELD)
+        self._write_snapshot()
+
+    # ── 컴팩션 ───────────────────────────────────────────────
+    def _write_snapshot(self, before_replace=None):
+        """
+        Writes the in-memory table to a temp file and atomically replaces the CSV.
+        `before_replace`, if given, is called with the new file's stat signature
+        just before the replace.
+        """
+        tmp_path = f"{self.csv_path}.{os.getpid()}.tmp"
+        with CSV_IO_SECONDS.labels(file="reservations", operation="snapshot").time(), \
+                open(tmp_path, mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self._fieldnames)
+            writer.writeheader()
+            writer.writerows(self._rows)
+            f.flush()
+            os.fsync(f.fileno())
+        if before_replace is not None:
+            before_replace(self._stat_signature(tmp_path))
+        os.replace(tmp_path, self.csv_path)
+        self._signature = self._base_signature()
+
+    def _mark_compacted(self, snapshot_signature):
+        """Records in the compacting journal which CSV snapshot already contains its entries."""
+        line = (json.dumps({"op": "snapshot", "csv": list(snapshot_signature)}) + "\n").encode("utf-8")
+        with open(self.compacting_path, "a+b") as f:
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line  # 잘린 마지막 줄과 붙지 않도록
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self):
+        """
+        Folds the journal into a fresh CSV snapshot.
+
+        The journal is first renamed aside (so a crash leaves it replayable),
+        the snapshot replaces the CSV atomically, and only then is the old
+        journal removed.
+        """
+        with self._mutation():
+            self.refresh()
+            if not os.path.exists(self.journal_path) and not os.path.exists(self.compacting_path):
+                return
+            self._fsync_journal()
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
+            if os.path.exists(self.journal_path):
+                if os.path.exists(self.compacting_path):
+                    # 이전 컴팩션 잔여분 뒤에 이어 붙여 하나로 합침
+                    with open(self.journal_path, "rb") as src, open(self.compacting_path, "ab") as dst:
+                        dst.write(src.read())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, self.compacting_path)
+
+            self._write_snapshot(before_replace=self._mark_compacted)
+            os.remove(self.compacting_path)
+            self._signature = self._base_signature()
+            self._journal_ino = None
+            self._journal_offset = 0
+            self._journal_entries = 0
+            self._compacted_at = time.monotonic()
+
+    def _ensure_compactor(self):
+        if self._compactor is None and not self._closed:
+            self._compactor = threading.Thread(
+                target=self._compactor_loop, name="reservation-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    def _compactor_loop(self):
+        while not self._closed:
+            woke = self._compactor_wakeup.wait(timeout=min(self.fsync_interval, self.compact_interval))
+            self._compactor_wakeup.clear()
+            if self._closed:
+                break
+            try:
+                with self._lock:
+                    self._fsync_journal()
+                    due = time.monotonic() - self._compacted_at >= self.compact_interval
+                    if woke or (due and self._journal_entries):
+                        self.compact()
+            except Exception as e:
+                print(f"Error compacting {self.csv_path}: {e}")
+
+    def close(self):
+        """Stops the compactor, compacts pending changes and closes the journal."""
+        with self._lock:
+            self._closed = True
+            self._compactor_wakeup.set()
+            try:
+                self.compact()
+            except FileNotFoundError:
+                pass
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
+        if self._compactor is not None:
+            self._compactor.join(timeout=5)
+            self._compactor = None
+
+
+# 경로별 저장소 인스턴스 (프로세스당 한 번만 로드)
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_reservation_store(csv_path: str) -> ReservationStore:
+    """
+    Returns the process-wide ReservationStore for `csv_path`.
+    """
+    key = os.path.abspath(csv_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = ReservationStore(key)
+            _stores[key] = store
+        return store
@@ -0,0 +1,148 @@
+"""
+일반 질문(FAQ) 답변 캐시
+
+"화장실 어디예요?", "운영시간이 어떻게 돼요?" 같은 일반 질문은 키오스크마다
+계속 반복되므로, 모델의 답변(intent=general)을 정규화된 질문 문장 기준으로
+저장해 두고 바로 돌려줍니다. 접수/수납/증명서 흐름과 이름·주민등록번호가 들어간
+질문은 절대 저장하지 않습니다.
+
+  • KIOSK_FAQ_CACHE_SIZE        최대 항목 수 (기본 512, LRU). 0 이면 캐시를 쓰지 않습니다.
+  • KIOSK_FAQ_CACHE_TTL         항목 유효 시간(초, 기본 3600)
+  • KIOSK_FAQ_CACHE_SIMILARITY  0~1. 0 보다 크면 문장이 정확히 같지 않아도 글자 2-gram
+                                유사도가 이 값 이상인 질문의 답을 씁니다 (기본 0, 사용 안 함).
+"""
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_SECONDS = 3600
+
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+def normalize_question(question: str) -> str:
+    """'화장실 어디예요?' and '화장실어디예요' share one key."""
+    text = unicodedata.normalize("NFKC", question or "").lower()
+    return _NON_WORD_RE.sub("", text).replace("_", "")
+
+
+def _bigrams(text: str) -> frozenset:
+    if len(text) < 2:
+        return frozenset((text,)) if text else frozenset()
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1))
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of general-question replies.
+
+        cache.get(question)         -> reply | None
+        cache.put(question, reply)
+        cache.stats()               -> hits / similar_hits / misses / entries / hit_rate
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 similarity_threshold=0.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key → (expires_at, bigrams, reply), 오래된 것부터
+        self._counters = {"hits": 0, "similar_hits": 0, "misses": 0}
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry[2]
+            del self._entries[key]
+        if self.similarity_threshold <= 0 or not key:
+            return None
+        # 유사도 단계: 2-gram 자카드 유사도가 가장 높은 유효 항목
+        grams = _bigrams(key)
+        best_key, best_score = None, self.similarity_threshold
+        for other_key, (expires_at, other_grams, _) in self._entries.items():
+            if expires_at <= now:
+                continue
+            score = len(grams & other_grams) / len(grams | other_grams)
+            if score >= best_score:
+                best_key, best_score = other_key, score
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        self._counters["similar_hits"] += 1
+        return self._entries[best_key][2]
+
+    def get(self, question: str):
+        """Returns the cached reply for `question`, or None."""
+        key = normalize_question(question)
+        with self._lock:
+            reply = self._lookup(key, self._clock())
+            if reply is None:
+                self._counters["misses"] += 1
+            return reply
+
+    def put(self, question: str, reply: str):
+        key = normalize_question(question)
+        if not key or not reply:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + self.ttl_seconds, _bigrams(key), reply)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["similar_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["similar_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def _cache_from_env():
+    try:
+        max_entries = int(os.getenv("KIOSK_FAQ_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+        ttl_seconds = float(os.getenv("KIOSK_FAQ_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        similarity = float(os.getenv("KIOSK_FAQ_CACHE_SIMILARITY", "0"))
+    except ValueError:
+        max_entries, ttl_seconds, similarity = DEFAULT_MAX_ENTRIES, DEFAULT_TTL_SECONDS, 0.0
+    if max_entries <= 0:
+        return None
+    return ResponseCache(max_entries, ttl_seconds, similarity)
+
+
+def get_response_cache():
+    """Returns the process-wide ResponseCache, or None if caching is disabled."""
+    global _cache, _cache_configured
+    if not _cache_configured:
+        with _cache_lock:
+            if not _cache_configured:
+                _cache = _cache_from_env()
+                _cache_configured = True
+    return _cache
+
+
+def set_response_cache(cache):
+    """Replaces the process-wide cache (None disables caching). Mainly for tests."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = cache
+        _cache_configured = True
@@ -0,0 +1,117 @@
+"""
+진료과별 대기번호 발급기
+
+대기번호 = 진료과 코드 + 그날의 일련번호 (예: 내과 → "A-001", "A-002", ...).
+진료과마다 고유한 코드를 쓰므로 첫 글자가 같은 진료과(내과/내분비내과)도 섞이지
+않고, 번호는 날짜가 바뀌면 1 부터 다시 시작합니다. 표에 없는 진료과는 "X" 코드를
+함께 씁니다.
+
+카운터는 작은 JSON 파일(진료과 수만큼의 항목)에 저장하며, 여러 gunicorn 워커가
+동시에 발급해도 <파일>.lock 파일 잠금 안에서 읽고 → 1 증가 → 원자적으로
+교체(os.replace)하므로 같은 번호가 두 번 나오지 않습니다. 발급 비용은 예약 수와
+무관하게 일정합니다.
+
+  • KIOSK_TICKET_STATE  카운터 파일 위치 (기본 data/ticket_counters.json)
+"""
+import json
+import os
+import secrets
+import threading
+from datetime import datetime
+
+from app.utils.file_lock import FileLock
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_STATE_PATH = os.path.join(BASE_DIR, "data", "ticket_counters.json")
+LOCK_SUFFIX = ".lock"
+UNKNOWN_CODE = "X"
+
+DEPARTMENT_CODES = {
+    "내과": "A",
+    "외과": "B",
+    "정형외과": "C",
+    "소아과": "D",
+    "이비인후과": "E",
+    "피부과": "F",
+    "산부인과": "G",
+    "치과": "H",
+    "가정의학과": "J",
+    "감염내과": "K",
+    "비뇨의학과": "L",
+    "소화기내과": "M",
+    "신경과": "N",
+    "호흡기내과": "P",
+    "내분비내과": "Q",
+}
+
+
+def department_code(department: str) -> str:
+    return DEPARTMENT_CODES.get((department or "").strip(), UNKNOWN_CODE)
+
+
+class TicketSequencer:
+    """
+    Daily per-department ticket counters persisted in a JSON file.
+
+        sequencer.issue("내과")  -> "A-001"
+        sequencer.counters()     -> {"A": 1}   # today's last numbers
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH, clock=datetime.now):
+        self.path = path
+        self._clock = clock
+        self._file_lock = FileLock(path + LOCK_SUFFIX)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _read(self, today: str) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:  # 손상된 파일 - os.replace 로 쓰므로 보통은 생기지 않음
+            return {}
+        return state.get("counters", {}) if state.get("date") == today else {}
+
+    def _write(self, today: str, counters: dict):
+        tmp_path = f"{self.path}.{secrets.token_hex(4)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"date": today, "counters": counters}, f)
+            f.flush()
+            os.fsync(f.fileno())  # 재시작 후 같은 번호를 다시 주지 않도록
+        os.replace(tmp_path, self.path)
+
+    def issue(self, department: str) -> str:
+        code = department_code(department)
+        today = self._clock().strftime("%Y-%m-%d")
+        with self._file_lock:
+            counters = self._read(today)
+            number = counters.get(code, 0) + 1
+            counters[code] = number
+            self._write(today, counters)
+        return f"{code}-{number:03d}"
+
+    def counters(self) -> dict:
+        with self._file_lock:
+            return self._read(self._clock().strftime("%Y-%m-%d"))
+
+
+_sequencer = None
+_sequencer_lock = threading.Lock()
+
+
+def get_ticket_sequencer() -> TicketSequencer:
+    """Returns the process-wide sequencer (KIOSK_TICKET_STATE)."""
+    global _sequencer
+    if _sequencer is None:
+        with _sequencer_lock:
+            if _sequencer is None:
+                _sequencer = TicketSequencer(os.getenv("KIOSK_TICKET_STATE") or DEFAULT_STATE_PATH)
+    return _sequencer
+
+
+def set_ticket_sequencer(sequencer: TicketSequencer | None) -> None:
+    """Replaces the process-wide sequencer (None → recreate from the environment on next use)."""
+    global _sequencer
+    with _sequencer_lock:
+        _sequencer = sequencer
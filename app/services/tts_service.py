@@ -0,0 +1,342 @@
+"""
+음성 안내(TTS) 서비스
+
+키오스크 화면의 playTTS() 가 GET /tts?text=... 로 요청하는 음성을 서버에서
+오프라인 합성 엔진(기본 espeak-ng)으로 만들어 돌려줍니다. 안내 문장은 거의 항상
+반복되므로 결과를 내용 주소(content-addressed) 키로 메모리 LRU + 디스크에
+저장해 두고, 같은 문장이 동시에 여러 번 요청되면 합성은 한 번만 합니다.
+
+키 = sha256(엔진 이름, 문장, 언어, 목소리, 속도)
+
+  • KIOSK_TTS_ENGINE     합성 엔진: "espeak" (기본) 또는 "패키지.모듈:팩토리"
+  • KIOSK_TTS_LANG       기본 언어 (기본 ko)
+  • KIOSK_TTS_RATE       기본 속도(분당 단어 수, 기본 160)
+  • KIOSK_TTS_MAX_CHARS  문장 최대 길이 (기본 300)
+  • KIOSK_TTS_CACHE_DIR  디스크 캐시 위치 (기본 data/tts_cache)
+  • KIOSK_TTS_CACHE_MB   디스크 용량 한도(MB, 기본 64). 0 이면 캐시를 쓰지 않습니다.
+
+엔진은 synthesize(text, lang, voice, rate) -> bytes 와 name / mimetype 속성만
+있으면 되며, set_tts_engine() 으로 바꿀 수 있습니다. 디스크 파일은 오래 읽히지
+않은 것부터(mtime 기준) 지우며, 여러 워커 프로세스가 같은 디렉터리를 공유해도 됩니다.
+"""
+import hashlib
+import importlib
+import json
+import os
+import re
+import secrets
+import shutil
+import subprocess
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from app.utils.metrics import TTS_REQUESTS, TTS_SYNTHESIS_SECONDS
+
+DEFAULT_LANG = "ko"
+DEFAULT_RATE = 160
+MIN_RATE, MAX_RATE = 80, 400
+DEFAULT_MAX_CHARS = 300
+DEFAULT_DISK_MB = 64
+DEFAULT_MEMORY_BYTES = 16 * 1024 * 1024
+ENGINE_TIMEOUT_SECONDS = 10
+FILE_SUFFIX = ".audio"
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, "data", "tts_cache")
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,24}$")
+
+
+class TtsEngineError(Exception):
+    """The synthesis engine is missing or failed."""
+
+
+class EspeakEngine:
+    """espeak-ng (or classic espeak) command-line engine; returns WAV bytes."""
+
+    name = "espeak"
+    mimetype = "audio/wav"
+
+    def __init__(self, executable=None, timeout=ENGINE_TIMEOUT_SECONDS):
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak")
+        self.timeout = timeout
+
+    def synthesize(self, text: str, lang: str, voice: str, rate: int) -> bytes:
+        if not self.executable:
+            raise TtsEngineError("espeak-ng is not installed")
+        espeak_voice = f"{lang}+{voice}" if voice else lang
+        # 문장은 stdin 으로 넘김 - '-' 로 시작하는 문장도 옵션으로 해석되지 않음
+        try:
+            result = subprocess.run(
+                [self.executable, "--stdin", "--stdout", "-v", espeak_voice, "-s", str(rate)],
+                input=text.encode("utf-8"), capture_output=True, timeout=self.timeout, check=True,
+            )
+        except subprocess.TimeoutExpired as e:
+            raise TtsEngineError("espeak timed out") from e
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise TtsEngineError(f"espeak failed: {e}") from e
+        if not result.stdout:
+            raise TtsEngineError("espeak produced no audio")
+        return result.stdout
+
+
+def normalize_text(text: str) -> str:
+    """'접수가  완료되었습니다. ' and '접수가 완료되었습니다.' share one key."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def speech_key(engine_name: str, text: str, lang: str, voice: str, rate: int) -> str:
+    payload = json.dumps([engine_name, text, lang, voice, rate], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TtsAudioCache:
+    """
+    Size-bounded two-level cache of synthesized audio.
+
+        cache.get(key)        -> bytes | None
+        cache.put(key, data)
+    """
+
+    def __init__(self, directory=None, max_disk_bytes=DEFAULT_DISK_MB * 1024 * 1024,
+                 max_memory_bytes=DEFAULT_MEMORY_BYTES):
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key → bytes, 오래된 것부터
+        self._memory_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}{FILE_SUFFIX}")
+
+    def _remember(self, key, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get(self, key: str):
+        """Returns the cached audio for `key`, or None."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # 디스크 LRU: 최근 사용 시각 갱신
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        self._remember(key, data)
+        if not self.directory or len(data) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        try:
+            scanned = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for entry in scanned:
+            if not entry.name.endswith(FILE_SUFFIX):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+# ── 엔진 / 캐시 싱글턴 ─────────────────────────────────────
+_engine = None
+_cache = None
+_cache_configured = False
+_config_lock = threading.Lock()
+
+
+def _engine_from_env():
+    spec = os.getenv("KIOSK_TTS_ENGINE", "espeak").strip()
+    if spec in ("", "espeak"):
+        return EspeakEngine()
+    module_name, _, attr = spec.partition(":")
+    factory = getattr(importlib.import_module(module_name), attr or "Engine")
+    return factory()
+
+
+def get_tts_engine():
+    """Returns the process-wide synthesis engine (KIOSK_TTS_ENGINE)."""
+    global _engine
+    if _engine is None:
+        with _config_lock:
+            if _engine is None:
+                _engine = _engine_from_env()
+    return _engine
+
+
+def set_tts_engine(engine):
+    """Replaces the process-wide engine (None → recreate from the environment on next use)."""
+    global _engine
+    with _config_lock:
+        _engine = engine
+
+
+def _cache_from_env():
+    try:
+        disk_mb = int(os.getenv("KIOSK_TTS_CACHE_MB", DEFAULT_DISK_MB))
+    except ValueError:
+        disk_mb = DEFAULT_DISK_MB
+    if disk_mb <= 0:
+        return None
+    return TtsAudioCache(os.getenv("KIOSK_TTS_CACHE_DIR") or DEFAULT_CACHE_DIR, disk_mb * 1024 * 1024)
+
+
+def get_tts_cache():
+    """Returns the process-wide TtsAudioCache, or None if caching is disabled."""
+    global _cache, _cache_configured
+    if not _cache_configured:
+        with _config_lock:
+            if not _cache_configured:
+                _cache = _cache_from_env()
+                _cache_configured = True
+    return _cache
+
+
+def set_tts_cache(cache):
+    """Replaces the process-wide cache (None disables caching). Mainly for tests."""
+    global _cache, _cache_configured
+    with _config_lock:
+        _cache = cache
+        _cache_configured = True
+
+
+# ── 동일 문장 동시 요청 합치기 ──────────────────────────────
+class _Flight:
+    __slots__ = ("done", "audio", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.audio = None
+        self.error = None
+
+
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def _synthesize_once(engine, key, text, lang, voice, rate):
+    """Runs the engine once per key; concurrent callers wait for the first one. Returns (audio, source)."""
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _in_flight[key] = _Flight()
+    if not leader:
+        if not flight.done.wait(ENGINE_TIMEOUT_SECONDS * 2):
+            raise TtsEngineError("speech synthesis timed out")
+        if flight.error is not None:
+            raise flight.error
+        return flight.audio, "coalesced"
+    started = time.perf_counter()
+    try:
+        flight.audio = engine.synthesize(text, lang, voice, rate)
+        TTS_SYNTHESIS_SECONDS.labels(engine=engine.name).observe(time.perf_counter() - started)
+        cache = get_tts_cache()
+        if cache is not None:
+            cache.put(key, flight.audio)
+        return flight.audio, "engine"
+    except TtsEngineError as e:
+        flight.error = e
+        raise
+    except Exception as e:  # 엔진 플러그인의 예상 못 한 오류도 대기 중인 요청에 전달
+        flight.error = TtsEngineError(f"{type(e).__name__}: {e}")
+        raise flight.error from e
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+        flight.done.set()
+
+
+def _parse_rate(rate):
+    if rate in (None, ""):
+        return int(os.getenv("KIOSK_TTS_RATE", DEFAULT_RATE))
+    return min(MAX_RATE, max(MIN_RATE, int(rate)))
+
+
+def get_speech(text: str, lang: str = None, voice: str = None, rate=None) -> dict:
+    """
+    Returns {"key", "audio", "mimetype"} for `text`, or an error dict
+    ({"error", "details", "status_code"}).
+    """
+    text = normalize_text(text)
+    if not text:
+        return {"error": "No text provided", "details": "Pass the sentence as ?text=...", "status_code": 400}
+    max_chars = int(os.getenv("KIOSK_TTS_MAX_CHARS", DEFAULT_MAX_CHARS))
+    if len(text) > max_chars:
+        return {"error": "Text too long", "details": f"At most {max_chars} characters", "status_code": 400}
+    lang = lang or os.getenv("KIOSK_TTS_LANG", DEFAULT_LANG)
+    voice = voice or ""
+    if not _NAME_RE.match(lang) or (voice and not _NAME_RE.match(voice)):
+        return {"error": "Invalid lang or voice", "details": "Use letters, digits, '-' or '_'", "status_code": 400}
+    try:
+        rate = _parse_rate(rate)
+    except ValueError:
+        return {"error": "Invalid rate", "details": "rate must be an integer (words per minute)", "status_code": 400}
+
+    engine = get_tts_engine()
+    key = speech_key(engine.name, text, lang, voice, rate)
+    cache = get_tts_cache()
+    audio = cache.get(key) if cache is not None else None
+    if audio is not None:
+        TTS_REQUESTS.labels(source="cache").inc()
+        return {"key": key, "audio": audio, "mimetype": engine.mimetype}
+    try:
+        audio, source = _synthesize_once(engine, key, text, lang, voice, rate)
+    except TtsEngineError as e:
+        TTS_REQUESTS.labels(source="error").inc()
+        return {"error": "Speech synthesis unavailable", "details": str(e), "status_code": 503}
+    TTS_REQUESTS.labels(source=source).inc()
+    return {"key": key, "audio": audio, "mimetype": engine.mimetype}
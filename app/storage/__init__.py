@@ -0,0 +1,63 @@
+"""
+저장소 백엔드 선택
+
+환경 변수 KIOSK_STORAGE 로 백엔드를 고릅니다.
+  • csv    (기본) data/reservations.csv, data/treatment_fees.csv
+  • sqlite KIOSK_SQLITE_PATH (기본 data/kiosk.db), WAL 모드 - 다중 워커 배포용
+"""
+import os
+import threading
+
+from app.storage.base import Storage, RESERVATION_FIELDNAMES, VersionConflictError
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+RESERVATIONS_CSV = os.path.join(DATA_DIR, "reservations.csv")
+TREATMENT_FEES_CSV = os.path.join(DATA_DIR, "treatment_fees.csv")
+SQLITE_DB = os.path.join(DATA_DIR, "kiosk.db")
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def create_storage(backend: str | None = None) -> Storage:
+    """
+    Builds a storage backend by name ('csv' or 'sqlite').
+    Defaults to the KIOSK_STORAGE environment variable, then 'csv'.
+    """
+    backend = (backend or os.getenv("KIOSK_STORAGE") or "csv").lower()
+    if backend == "csv":
+        from app.storage.csv_storage import CsvStorage
+        return CsvStorage(RESERVATIONS_CSV, TREATMENT_FEES_CSV)
+    if backend == "sqlite":
+        from app.storage.sqlite_storage import SqliteStorage
+        return SqliteStorage(os.getenv("KIOSK_SQLITE_PATH") or SQLITE_DB)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_storage() -> Storage:
+    """
+    Returns the process-wide storage backend (created on first use).
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+    return _storage
+
+
+def set_storage(storage: Storage | None) -> None:
+    """
+    Replaces the process-wide storage backend (None → recreate on next use).
+    """
+    global _storage
+    with _storage_lock:
+        _storage = storage
+
+
+__all__ = [
+    "Storage", "RESERVATION_FIELDNAMES", "VersionConflictError",
+    "create_storage", "get_storage", "set_storage",
+    "RESERVATIONS_CSV", "TREATMENT_FEES_CSV", "SQLITE_DB",
+]
@@ -0,0 +1,95 @@
+"""
+저장소 인터페이스
+
+예약(reservations), 진료비(treatment fees), 결제(payments) 데이터를
+서비스 계층에서 백엔드(CSV, SQLite)와 무관하게 다루기 위한 추상 클래스입니다.
+"""
+from abc import ABC, abstractmethod
+
+from app.services.fee_catalog import FeeCatalog
+
+# 예약 테이블의 기본 컬럼 (새 파일/테이블 생성 시 사용)
+RESERVATION_FIELDNAMES = [
+    "name", "rrn", "time", "department", "ticket_number",
+    "location", "doctor", "status", "prescription_names", "total_fee", "version"
+]
+
+
+class VersionConflictError(Exception):
+    """
+    Raised when a reservation changed since the caller read it
+    (optimistic concurrency check on the `version` column).
+    """
+
+    def __init__(self, rrn: str, expected_version, current_version):
+        super().__init__(
+            f"Reservation {rrn} is at version {current_version}, expected {expected_version}"
+        )
+        self.rrn = rrn
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+
+class Storage(ABC):
+    """
+    Backend-agnostic access to reservations, treatment fees and payments.
+
+    Reservation rows are plain dicts with string values, exactly like the rows
+    `csv.DictReader` yields for reservations.csv. The `version` column is
+    managed by the backend and cannot be set through update_reservation(). Methods raise
+    FileNotFoundError when the backing data source does not exist.
+    """
+
+    # ── 예약 ─────────────────────────────────────────────────
+    @abstractmethod
+    def reservation_fieldnames(self) -> list:
+        """Returns the column names of the reservation table."""
+
+    @abstractmethod
+    def get_reservation(self, rrn: str) -> dict | None:
+        """Returns the reservation for `rrn`, or None."""
+
+    @abstractmethod
+    def find_reservation(self, name: str, rrn: str) -> dict | None:
+        """Returns the reservation matching both `name` and `rrn`, or None."""
+
+    @abstractmethod
+    def list_reservations(self) -> list:
+        """Returns every reservation row."""
+
+    @abstractmethod
+    def update_reservation(self, rrn: str, fields: dict, expected_version=None) -> bool:
+        """
+        Updates known columns of the reservation for `rrn` and bumps its version.
+        False if not found. Raises VersionConflictError if `expected_version` is
+        given and no longer matches the stored version.
+        """
+
+    @abstractmethod
+    def insert_reservation(self, row: dict) -> None:
+        """Adds a new reservation row."""
+
+    # ── 진료비 ───────────────────────────────────────────────
+    @abstractmethod
+    def fee_catalog(self) -> FeeCatalog:
+        """Returns the (cached, immutable) treatment fee catalog."""
+
+    def fees_for_department(self, department: str) -> list:
+        """
+        Returns [{"name": ..., "fee": int}, ...] for `department` (case-insensitive).
+        Raises ValueError if a fee in the data source is not an integer.
+        """
+        return [{"name": item.name, "fee": item.fee} for item in self.fee_catalog().for_department(department)]
+
+    def fee_map(self) -> dict:
+        """Returns {prescription_name: fee} for every known prescription."""
+        return dict(self.fee_catalog().by_name)
+
+    # ── 결제 ─────────────────────────────────────────────────
+    @abstractmethod
+    def save_payment(self, record: dict) -> None:
+        """Persists a payment record (no-op for backends without durable payments)."""
+
+    @abstractmethod
+    def get_payment(self, payment_id: str) -> dict | None:
+        """Returns a persisted payment record, or None."""
@@ -0,0 +1,52 @@
+"""
+CSV 파일 기반 저장소 (기본 백엔드)
+
+예약은 ReservationStore(인메모리 인덱스 + 저널)를 통해, 진료비는
+treatment_fees.csv 로 만든 FeeCatalog(파일이 바뀔 때만 다시 읽음)에서 읽습니다.
+결제 내역은 CSV 로 남기지 않습니다.
+"""
+from app.services.fee_catalog import FeeCatalog, get_fee_catalog
+from app.services.reservation_store import get_reservation_store
+from app.storage.base import Storage, RESERVATION_FIELDNAMES
+
+
+class CsvStorage(Storage):
+
+    def __init__(self, reservations_csv: str, treatment_fees_csv: str):
+        self.reservations_csv = reservations_csv
+        self.treatment_fees_csv = treatment_fees_csv
+
+    @property
+    def _reservations(self):
+        return get_reservation_store(self.reservations_csv)
+
+    # ── 예약 ─────────────────────────────────────────────────
+    def reservation_fieldnames(self) -> list:
+        return self._reservations.fieldnames
+
+    def get_reservation(self, rrn: str) -> dict | None:
+        return self._reservations.get_by_rrn(rrn)
+
+    def find_reservation(self, name: str, rrn: str) -> dict | None:
+        return self._reservations.find(name, rrn)
+
+    def list_reservations(self) -> list:
+        return self._reservations.rows()
+
+    def update_reservation(self, rrn: str, fields: dict, expected_version=None) -> bool:
+        return self._reservations.update(rrn, fields, expected_version=expected_version)
+
+    def insert_reservation(self, row: dict) -> None:
+        self._reservations.append(row, RESERVATION_FIELDNAMES)
+
+    # ── 진료비 ───────────────────────────────────────────────
+    def fee_catalog(self) -> FeeCatalog:
+        return get_fee_catalog(self.treatment_fees_csv)
+
+    # ── 결제 ─────────────────────────────────────────────────
+    def save_payment(self, record: dict) -> None:
+        # CSV 백엔드는 결제 내역을 프로세스 메모리(payment_service)에만 보관
+        return None
+
+    def get_payment(self, payment_id: str) -> dict | None:
+        return None
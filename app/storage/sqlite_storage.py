@@ -0,0 +1,239 @@
+"""
+SQLite 기반 저장소
+
+여러 gunicorn 워커가 같은 DB 파일을 공유할 수 있도록 WAL 모드로 엽니다.
+예약은 `rrn`, `department` 에 인덱스를 두고, 진료비는 `department` 와
+`prescription` 에 인덱스를 둡니다. 기존 CSV 데이터는 import_csv() 로 옮깁니다.
+진료비는 테이블이 바뀔 때만 FeeCatalog 로 다시 읽어 캐시합니다.
+
+예약 변경은 BEGIN IMMEDIATE 트랜잭션에서 `version` 을 1씩 올리며,
+expected_version 이 주어지면 같은 트랜잭션 안에서 현재 버전과 비교합니다.
+"""
+import contextlib
+import csv
+import sqlite3
+import threading
+
+from app.services.fee_catalog import FeeCatalog, FeeItem
+from app.services.reservation_store import ReservationStore
+from app.storage.base import Storage, RESERVATION_FIELDNAMES, VersionConflictError
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservations (
+    id                 INTEGER PRIMARY KEY AUTOINCREMENT,
+    name               TEXT NOT NULL DEFAULT '',
+    rrn                TEXT NOT NULL,
+    time               TEXT NOT NULL DEFAULT '',
+    department         TEXT NOT NULL DEFAULT '',
+    ticket_number      TEXT NOT NULL DEFAULT '',
+    location           TEXT NOT NULL DEFAULT '',
+    doctor             TEXT NOT NULL DEFAULT '',
+    status             TEXT NOT NULL DEFAULT '',
+    prescription_names TEXT NOT NULL DEFAULT '',
+    total_fee          TEXT NOT NULL DEFAULT '0',
+    version            INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_reservations_rrn ON reservations (rrn);
+CREATE INDEX IF NOT EXISTS idx_reservations_department ON reservations (department);
+
+CREATE TABLE IF NOT EXISTS treatment_fees (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    department   TEXT NOT NULL,
+    prescription TEXT NOT NULL,
+    fee          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_treatment_fees_department ON treatment_fees (department);
+CREATE INDEX IF NOT EXISTS idx_treatment_fees_prescription ON treatment_fees (prescription);
+
+CREATE TABLE IF NOT EXISTS payments (
+    payment_id TEXT PRIMARY KEY,
+    patient_id TEXT NOT NULL,
+    amount     INTEGER NOT NULL,
+    method     TEXT NOT NULL,
+    status     TEXT NOT NULL,
+    timestamp  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_payments_patient_id ON payments (patient_id);
+"""
+
+PAYMENT_FIELDNAMES = ["payment_id", "patient_id", "amount", "method", "status", "timestamp"]
+# 값이 그대로 저장되는 예약 컬럼 (version 은 DB 가 관리)
+DATA_FIELDNAMES = [key for key in RESERVATION_FIELDNAMES if key != "version"]
+
+
+class SqliteStorage(Storage):
+
+    def __init__(self, db_path: str, timeout: float = 5.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._fee_catalog = None  # (signature, FeeCatalog)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(reservations)")}
+            if "version" not in columns:
+                # version 컬럼 이전에 만들어진 DB
+                conn.execute("ALTER TABLE reservations ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    # ── 연결 관리 (스레드별 커넥션) ──────────────────────────
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _reservation_dict(row) -> dict | None:
+        if row is None:
+            return None
+        data = {key: row[key] for key in DATA_FIELDNAMES}
+        data["version"] = str(row["version"])
+        return data
+
+    @contextlib.contextmanager
+    def _write_transaction(self):
+        """BEGIN IMMEDIATE: takes the write lock up front so read-then-write is atomic."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    # ── 예약 ─────────────────────────────────────────────────
+    def reservation_fieldnames(self) -> list:
+        return list(RESERVATION_FIELDNAMES)
+
+    def get_reservation(self, rrn: str) -> dict | None:
+        row = self._connect().execute(
+            "SELECT * FROM reservations WHERE rrn = ? ORDER BY id LIMIT 1", (rrn,)
+        ).fetchone()
+        return self._reservation_dict(row)
+
+    def find_reservation(self, name: str, rrn: str) -> dict | None:
+        row = self._connect().execute(
+            "SELECT * FROM reservations WHERE rrn = ? AND name = ? ORDER BY id LIMIT 1", (rrn, name)
+        ).fetchone()
+        return self._reservation_dict(row)
+
+    def list_reservations(self) -> list:
+        rows = self._connect().execute("SELECT * FROM reservations ORDER BY id").fetchall()
+        return [self._reservation_dict(row) for row in rows]
+
+    def update_reservation(self, rrn: str, fields: dict, expected_version=None) -> bool:
+        changes = {key: str(value) for key, value in fields.items() if key in DATA_FIELDNAMES}
+        with self._write_transaction() as conn:
+            target = conn.execute(
+                "SELECT id, version FROM reservations WHERE rrn = ? ORDER BY id LIMIT 1", (rrn,)
+            ).fetchone()
+            if target is None:
+                return False
+            if expected_version is not None and int(expected_version) != target["version"]:
+                raise VersionConflictError(rrn, expected_version, target["version"])
+            assignments = "".join(f"{key} = ?, " for key in changes)
+            conn.execute(
+                f"UPDATE reservations SET {assignments}version = version + 1 WHERE id = ?",
+                (*changes.values(), target["id"]),
+            )
+        return True
+
+    def insert_reservation(self, row: dict) -> None:
+        values = [str(row.get(key, "")) for key in DATA_FIELDNAMES]
+        placeholders = ", ".join("?" for _ in DATA_FIELDNAMES)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                f"INSERT INTO reservations ({', '.join(DATA_FIELDNAMES)}) VALUES ({placeholders})",
+                values,
+            )
+
+    # ── 진료비 ───────────────────────────────────────────────
+    def fee_catalog(self) -> FeeCatalog:
+        # 진료비는 import_csv() 로만 바뀌고 id 는 AUTOINCREMENT 이므로
+        # (최소 id, 최대 id) 가 같으면 내용도 같음 - 인덱스로 O(log n) 확인
+        signature = tuple(self._connect().execute(
+            "SELECT (SELECT MIN(id) FROM treatment_fees), (SELECT MAX(id) FROM treatment_fees)"
+        ).fetchone())
+        cached = self._fee_catalog
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        rows = self._connect().execute(
+            "SELECT department, prescription, fee FROM treatment_fees ORDER BY id"
+        ).fetchall()
+        catalog = FeeCatalog(
+            FeeItem(row["department"], row["prescription"].strip(), int(row["fee"])) for row in rows
+        )
+        self._fee_catalog = (signature, catalog)
+        return catalog
+
+    # ── 결제 ─────────────────────────────────────────────────
+    def save_payment(self, record: dict) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO payments ({', '.join(PAYMENT_FIELDNAMES)}) VALUES (?, ?, ?, ?, ?, ?)",
+                [record.get(key) for key in PAYMENT_FIELDNAMES],
+            )
+
+    def get_payment(self, payment_id: str) -> dict | None:
+        row = self._connect().execute(
+            "SELECT * FROM payments WHERE payment_id = ?", (payment_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {key: row[key] for key in PAYMENT_FIELDNAMES}
+
+    # ── CSV 가져오기 ─────────────────────────────────────────
+    def import_csv(self, reservations_csv: str | None = None, treatment_fees_csv: str | None = None,
+                   replace: bool = True) -> dict:
+        """
+        Imports the existing CSV files. With `replace`, tables are emptied first
+        so the import can be re-run safely. Returns the number of imported rows.
+        """
+        counts = {"reservations": 0, "treatment_fees": 0}
+        conn = self._connect()
+        with conn:
+            if reservations_csv:
+                if replace:
+                    conn.execute("DELETE FROM reservations")
+                # 저널까지 반영된 최신 상태를 가져옴
+                source = ReservationStore(reservations_csv)
+                rows = (
+                    [str(row.get(key) or "") for key in DATA_FIELDNAMES] + [int(row.get("version") or 0)]
+                    for row in source.rows()
+                )
+                cursor = conn.executemany(
+                    f"INSERT INTO reservations ({', '.join(RESERVATION_FIELDNAMES)}) "
+                    f"VALUES ({', '.join('?' for _ in RESERVATION_FIELDNAMES)})",
+                    rows,
+                )
+                counts["reservations"] = cursor.rowcount
+
+            if treatment_fees_csv:
+                if replace:
+                    conn.execute("DELETE FROM treatment_fees")
+                with open(treatment_fees_csv, newline="", encoding="utf-8-sig") as f:
+                    rows = (
+                        (row["Department"].strip(), row["Prescription"].strip(), int(row["Fee"]))
+                        for row in csv.DictReader(f)
+                    )
+                    cursor = conn.executemany(
+                        "INSERT INTO treatment_fees (department, prescription, fee) VALUES (?, ?, ?)",
+                        rows,
+                    )
+                    counts["treatment_fees"] = cursor.rowcount
+        self._fee_catalog = None
+        return counts
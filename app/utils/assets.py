@@ -0,0 +1,203 @@
+"""
+정적 파일 빌드 (내용 해시 파일명 + 미리 압축 + immutable 캐시)
+
+키오스크는 매일 재부팅되지만 CSS/JS/이미지는 거의 바뀌지 않습니다. 배포할 때
+
+    flask --app run build-assets
+
+를 실행하면 static/ 의 파일을 static/dist/ 에 내용 해시가 붙은 이름
+(css/style.3f2a9c01d4.css)으로 복사하고, 텍스트 파일은 .gz(와 brotli 패키지가
+있으면 .br)도 미리 만들어 둡니다. static/dist/manifest.json 이 원래 경로 → 해시 경로를
+담으며, 템플릿의 asset_url('css/style.css') 가 이를 보고 URL 을 만듭니다 (빌드 전에는
+원래 파일 URL). CSS 안의 url(...) 도 해시 경로로 바꿉니다.
+
+해시 파일명은 내용이 바뀌면 이름도 바뀌므로 "Cache-Control: immutable" 로 1년간
+캐시하게 하고, Accept-Encoding 에 맞춰 .br/.gz 파일을 그대로 보냅니다. 음성 팩
+(static/audio/pack)의 오디오 파일도 내용 주소 이름이라 같은 헤더를 붙입니다.
+직전 빌드의 파일은 남겨 두므로 예전 페이지를 띄운 키오스크도 깨지지 않습니다.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import secrets
+import threading
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성 - 없으면 .gz 만 만듭니다
+    brotli = None
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+DIST_NAME = "dist"
+MANIFEST_NAME = "manifest.json"
+SKIPPED_DIRS = (DIST_NAME, os.path.join("audio", "pack"))  # 빌드 결과물 / 이미 내용 주소인 음성 팩
+COMPRESSIBLE = {".css", ".js", ".json", ".svg", ".html", ".txt"}
+MIN_COMPRESS_BYTES = 512
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _source_files(static_dir):
+    for root, dirs, files in os.walk(static_dir):
+        relative_root = os.path.relpath(root, static_dir)
+        dirs[:] = sorted(d for d in dirs if os.path.normpath(os.path.join(relative_root, d)) not in SKIPPED_DIRS)
+        for name in sorted(files):
+            if not name.startswith("."):
+                yield os.path.normpath(os.path.join(relative_root, name)).replace(os.sep, "/")
+
+
+def _rewrite_css_urls(css: str, logical_path: str, manifest: dict) -> str:
+    base = os.path.dirname(logical_path)
+
+    def replace(match):
+        quote, url = match.groups()
+        if re.match(r"^(data:|https?:|//|/|#)", url):
+            return match.group(0)
+        path, sep, suffix = url.partition("?")
+        target = os.path.normpath(os.path.join(base, path)).replace(os.sep, "/")
+        if target not in manifest:
+            return match.group(0)
+        hashed = os.path.relpath(manifest[target], base or ".").replace(os.sep, "/")
+        return f"url({quote}{hashed}{sep}{suffix}{quote})"
+
+    return _CSS_URL_RE.sub(replace, css)
+
+
+def build_assets(static_dir: str = STATIC_DIR) -> dict:
+    """
+    Fingerprints every static file into <static_dir>/dist and writes the
+    manifest. Returns {"files", "compressed", "brotli", "removed"}.
+    """
+    dist_dir = os.path.join(static_dir, DIST_NAME)
+    manifest_path = os.path.join(dist_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f).get("assets", {})
+    except (OSError, ValueError):
+        previous = {}
+
+    # CSS 는 참조하는 이미지의 해시 이름이 정해진 뒤에 처리
+    sources = sorted(_source_files(static_dir), key=lambda path: path.endswith(".css"))
+    manifest = {}
+    compressed = 0
+    for logical_path in sources:
+        with open(os.path.join(static_dir, logical_path), "rb") as f:
+            data = f.read()
+        if logical_path.endswith(".css"):
+            data = _rewrite_css_urls(data.decode("utf-8"), logical_path, manifest).encode("utf-8")
+        stem, ext = os.path.splitext(logical_path)
+        hashed_path = f"{stem}.{_digest(data)}{ext}"
+        manifest[logical_path] = hashed_path
+        target = os.path.join(dist_dir, hashed_path)
+        if not os.path.exists(target):
+            _write_atomic(target, data)
+        if ext.lower() in COMPRESSIBLE and len(data) >= MIN_COMPRESS_BYTES:
+            if not os.path.exists(target + ".gz"):
+                _write_atomic(target + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None and not os.path.exists(target + ".br"):
+                _write_atomic(target + ".br", brotli.compress(data, quality=11))
+            compressed += 1
+
+    _write_atomic(manifest_path, json.dumps({"assets": manifest}, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    # 이번과 직전 빌드가 가리키는 파일만 남김
+    keep = {MANIFEST_NAME}
+    for hashed_path in list(manifest.values()) + list(previous.values()):
+        keep.update({hashed_path, hashed_path + ".gz", hashed_path + ".br"})
+    removed = 0
+    for root, _, files in os.walk(dist_dir):
+        for name in files:
+            relative = os.path.relpath(os.path.join(root, name), dist_dir).replace(os.sep, "/")
+            if relative not in keep:
+                os.remove(os.path.join(root, name))
+                removed += 1
+    return {"files": len(manifest), "compressed": compressed, "brotli": brotli is not None, "removed": removed}
+
+
+# ── 실행 중 manifest 읽기 (파일이 바뀌면 다시 읽음) ─────────────
+_manifest_cache = {}  # static_dir → (mtime_ns, assets)
+_manifest_lock = threading.Lock()
+
+
+def load_asset_manifest(static_dir: str = STATIC_DIR) -> dict:
+    """Returns {logical path: hashed path}; empty until build-assets has run."""
+    path = os.path.join(static_dir, DIST_NAME, MANIFEST_NAME)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    with _manifest_lock:
+        cached = _manifest_cache.get(static_dir)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+    try:
+        with open(path, encoding="utf-8") as f:
+            assets = json.load(f).get("assets", {})
+    except (OSError, ValueError):
+        return {}
+    with _manifest_lock:
+        _manifest_cache[static_dir] = (mtime_ns, assets)
+    return assets
+
+
+def asset_path(filename: str, static_dir: str = STATIC_DIR) -> str:
+    """Path under static/ to link for `filename`: the fingerprinted copy if built."""
+    hashed = load_asset_manifest(static_dir).get(filename)
+    return f"{DIST_NAME}/{hashed}" if hashed else filename
+
+
+def is_immutable(filename: str) -> bool:
+    """True for files whose name changes whenever their content does."""
+    if filename.startswith(f"{DIST_NAME}/"):
+        return not filename.endswith(MANIFEST_NAME)
+    return filename.startswith("audio/pack/") and not filename.endswith(MANIFEST_NAME)
+
+
+def register_assets(app):
+    """Adds asset_url() to templates and serves fingerprinted files precompressed and immutable."""
+    from flask import request, send_from_directory, url_for
+    from werkzeug.security import safe_join
+
+    static_dir = app.static_folder
+    serve_static = app.view_functions["static"]
+
+    def asset_url(filename):
+        return url_for("static", filename=asset_path(filename, static_dir))
+
+    def static(filename):
+        if not is_immutable(filename):
+            return serve_static(filename=filename)
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        response = None
+        for encoding, suffix in ENCODINGS:
+            path = safe_join(static_dir, filename + suffix)
+            if path and encoding in request.accept_encodings and os.path.isfile(path):
+                response = send_from_directory(static_dir, filename + suffix, mimetype=mimetype)
+                response.headers["Content-Encoding"] = encoding
+                break
+        if response is None:
+            response = serve_static(filename=filename)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.vary.add("Accept-Encoding")
+        return response
+
+    app.view_functions["static"] = static
+    app.jinja_env.globals["asset_url"] = asset_url
@@ -0,0 +1,113 @@
+"""
+동시 실행 제한기 (챗봇 → Gemini 호출용)
+
+진행 중인 호출 수를 max_in_flight 로 묶고, 그 이상은 최대 max_waiting 개까지
+max_wait 초 동안 줄을 세웁니다. 대기열이 가득 찼거나 기다리다 시간이 지나면
+LimiterSaturated 를 던지고, 라우트는 503 + Retry-After 로 응답합니다.
+
+  • ThreadLimiter  WSGI(동기 Flask) 워커용 - 접수/수납 화면이 쓸 스레드를 남겨 둡니다.
+  • AsyncLimiter   ASGI(asyncio) 이벤트 루프용 - 대기 중인 요청은 스레드를 차지하지 않습니다.
+"""
+import asyncio
+import contextlib
+import math
+import threading
+
+
+class LimiterSaturated(Exception):
+    """Raised when no slot frees up in time; `retry_after` is a hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Too many concurrent requests; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class _LimiterBase:
+
+    def __init__(self, max_in_flight: int, max_waiting: int, max_wait: float):
+        self.max_in_flight = max_in_flight
+        self.max_waiting = max_waiting
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.waiting = 0
+
+    def _saturated(self):
+        return LimiterSaturated(max(1, math.ceil(self.max_wait)))
+
+
+class ThreadLimiter(_LimiterBase):
+    """
+        with limiter.slot():    # LimiterSaturated if the queue is full or max_wait passes
+            call_model()
+
+    acquire()/release() are for slots held across a streamed response.
+    """
+
+    def __init__(self, max_in_flight: int, max_waiting: int, max_wait: float):
+        super().__init__(max_in_flight, max_waiting, max_wait)
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Takes a slot (raises LimiterSaturated). Pair with release()."""
+        with self._cond:
+            if self.in_flight >= self.max_in_flight:
+                if self.waiting >= self.max_waiting:
+                    raise self._saturated()
+                self.waiting += 1
+                try:
+                    if not self._cond.wait_for(lambda: self.in_flight < self.max_in_flight, timeout=self.max_wait):
+                        raise self._saturated()
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    @contextlib.contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class AsyncLimiter(_LimiterBase):
+    """
+        async with limiter.slot():
+            await call_model()
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, max_in_flight: int, max_waiting: int, max_wait: float):
+        super().__init__(max_in_flight, max_waiting, max_wait)
+        self._cond = None  # 이벤트 루프 안에서 처음 쓸 때 만듭니다.
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            if self.in_flight >= self.max_in_flight:
+                if self.waiting >= self.max_waiting:
+                    raise self._saturated()
+                self.waiting += 1
+                try:
+                    await asyncio.wait_for(
+                        self._cond.wait_for(lambda: self.in_flight < self.max_in_flight), self.max_wait
+                    )
+                except asyncio.TimeoutError:
+                    raise self._saturated() from None
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self._cond.notify()
@@ -0,0 +1,119 @@
+"""
+Prometheus 지표 (/metrics)
+
+키오스크 흐름별 지표를 프로세스 안의 레지스트리에 모으고 GET /metrics 로
+Prometheus 텍스트 형식으로 내보냅니다.
+  • kiosk_http_request_duration_seconds   Blueprint 경로별 응답 시간 (SSE 는 헤더까지)
+  • kiosk_chatbot_intents_total           챗봇이 처리한 의도별 횟수
+  • kiosk_prescription_data_total         get_prescription_data_for_pdf 상태 코드별 횟수
+  • kiosk_csv_io_duration_seconds         예약/진료비 CSV 와 저널 읽기·쓰기 시간
+  • kiosk_pdf_render_duration_seconds     증명서 PDF 생성 시간 (캐시 적중은 제외)
+  • kiosk_pdf_size_bytes                  생성된 PDF 크기
+  • kiosk_gemini_request_duration_seconds Gemini 호출 시간 (스트리밍은 마지막 청크까지)
+  • kiosk_gemini_tokens_total             Gemini 입력/출력 토큰 수
+
+gunicorn 처럼 워커 프로세스가 여럿이면 PROMETHEUS_MULTIPROC_DIR 에 빈 디렉터리를
+지정합니다 (서버 시작 전에 비우기). 각 워커가 그 디렉터리의 파일에 값을 기록하고
+/metrics 는 어느 워커가 받든 모든 워커의 값을 합쳐 보여줍니다. 종료된 워커는
+gunicorn 설정의 child_exit 훅에서 mark_process_dead(worker.pid) 로 정리합니다.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+METRICS_PATH = "/metrics"
+
+_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_IO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+_BYTES_BUCKETS = (8_000, 16_000, 32_000, 64_000, 128_000, 256_000, 512_000, 1_000_000, 4_000_000, 16_000_000)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "kiosk_http_request_duration_seconds", "Time to answer an HTTP request, per blueprint route.",
+    ["blueprint", "endpoint", "method", "status"], buckets=_SECONDS_BUCKETS,
+)
+CHATBOT_INTENTS = Counter(
+    "kiosk_chatbot_intents", "Chatbot turns by resolved intent.", ["intent"],
+)
+PRESCRIPTION_DATA_STATUS = Counter(
+    "kiosk_prescription_data", "get_prescription_data_for_pdf results by status code.", ["status"],
+)
+CSV_IO_SECONDS = Histogram(
+    "kiosk_csv_io_duration_seconds", "CSV and journal file reads/writes.",
+    ["file", "operation"], buckets=_IO_BUCKETS,
+)
+PDF_RENDER_SECONDS = Histogram(
+    "kiosk_pdf_render_duration_seconds", "Certificate PDF rendering time.", ["kind"], buckets=_SECONDS_BUCKETS,
+)
+PDF_BYTES = Histogram(
+    "kiosk_pdf_size_bytes", "Size of rendered certificate PDFs.", ["kind"], buckets=_BYTES_BUCKETS,
+)
+GEMINI_REQUEST_SECONDS = Histogram(
+    "kiosk_gemini_request_duration_seconds", "Gemini API call latency.",
+    ["mode", "outcome"], buckets=_SECONDS_BUCKETS,
+)
+GEMINI_TOKENS = Counter(
+    "kiosk_gemini_tokens", "Gemini token usage reported by the API.", ["kind"],
+)
+TTS_REQUESTS = Counter(
+    "kiosk_tts_requests", "Speech requests by where the audio came from (cache/engine/coalesced/error).", ["source"],
+)
+TTS_SYNTHESIS_SECONDS = Histogram(
+    "kiosk_tts_synthesis_duration_seconds", "Speech synthesis engine time.", ["engine"], buckets=_SECONDS_BUCKETS,
+)
+
+
+def observe_pdf(kind: str, started: float, pdf_bytes: bytes):
+    """Records one rendered PDF; `started` is the time.perf_counter() before rendering."""
+    PDF_RENDER_SECONDS.labels(kind=kind).observe(time.perf_counter() - started)
+    PDF_BYTES.labels(kind=kind).observe(len(pdf_bytes))
+
+
+def observe_request(blueprint: str, endpoint: str, method: str, status_code: int, seconds: float):
+    HTTP_REQUEST_SECONDS.labels(
+        blueprint=blueprint, endpoint=endpoint, method=method, status=str(status_code)
+    ).observe(seconds)
+
+
+def render_metrics():
+    """Returns (body, content_type) with every metric of this process, or of all workers in multiprocess mode."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """gunicorn child_exit hook: drops the live values of a finished worker."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+def register_metrics(app):
+    """Times every request of `app` and serves GET /metrics."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe(response):
+        started = g.pop("metrics_started", None)
+        if started is not None and request.path != METRICS_PATH:
+            # 경로 대신 endpoint 이름을 레이블로 - /certificate/download/<token> 도 하나로 모임
+            observe_request(
+                request.blueprint or "app", request.endpoint or "unmatched",
+                request.method, response.status_code, time.perf_counter() - started,
+            )
+        return response
+
+    def metrics():
+        body, content_type = render_metrics()
+        return app.response_class(body, mimetype=None, content_type=content_type)
+
+    app.add_url_rule(METRICS_PATH, "metrics", metrics, methods=["GET"])
@@ -1,7 +1,14 @@
 from fpdf import FPDF
+from fontTools import ttLib
+import copy
+import io
 import os
+import threading
+import time
 from datetime import datetime
 
+from app.utils.metrics import observe_pdf
+
 
 class MissingKoreanFontError(FileNotFoundError):
     """Raised when the required Korean font file is not available."""
@@ -37,24 +44,48 @@ def _add_korean_font(pdf_instance):
         )
     )
 
-def create_prescription_pdf_bytes(patient_name, patient_rrn, department, prescriptions, total_fee, doctor_name, issue_date):
-    pdf = FPDF()
-    pdf.add_page()
-    _add_korean_font(pdf)
 
+# ── 폰트 / 페이지 골격 캐시 ──────────────────────────────────
+# 한글 TTF(약 2MB)를 문서마다 다시 파싱하지 않도록, 폰트 메트릭을 파싱한
+# "골격(skeleton)" 문서를 종류별로 한 번만 만들어 두고 문서마다 복사합니다.
+# 골격에는 제목, 기관명, 표 머리글처럼 고정된 내용이 미리 그려져 있고
+# (해당 글리프의 서브셋 코드도 이미 배정됨), 문서별로는 환자 정보만
+# 정해진 위치에 채웁니다.
+#
+# fpdf 는 출력 시 그 문서에 쓰인 글리프로 fontTools 폰트 객체를 직접 서브셋(변경)하므로
+# 서브셋 결과는 문서 사이에 재사용할 수 없습니다. 복사본에는 메모리에 캐시된 폰트
+# 파일로 만든 새 lazy 객체를 붙입니다 (필요한 테이블만 읽음). 출력 시의 서브셋이
+# 여전히 문서 하나 렌더링 시간의 대부분입니다.
+#
+# TTFFont.ttfont / subset 을 다루므로 requirements.txt 의 fpdf2 버전 범위(2.7.6 ~ 2.8.x)
+# 에서 확인했습니다.
+_cache_lock = threading.Lock()
+_font_bytes = None
+_skeletons = {}  # kind → (FPDF, positions)
+
+
+def _read_font_bytes():
+    global _font_bytes
+    if _font_bytes is None:
+        with open(KOREAN_FONT_PATH, "rb") as f:
+            _font_bytes = f.read()
+    return _font_bytes
+
+
+def _build_prescription_skeleton(pdf):
+    positions = {}
     # Title
     pdf.set_font_size(20)
     pdf.cell(0, 15, txt="처방전 (Prescription)", ln=True, align="C")
     pdf.ln(5)
 
-    # Header Information
+    # Header Information: 발행일(7) / 기관명 / 환자 성명, 주민등록번호, 진료과(7 x 3)
+    positions["issue_date"] = pdf.get_y()
+    pdf.set_y(positions["issue_date"] + 7)
     pdf.set_font_size(12)
-    # current_date = datetime.now().strftime("%Y-%m-%d") # Removed
-    pdf.cell(0, 7, txt=f"발행일: {issue_date}", ln=True, align="R") # Use issue_date parameter
     pdf.cell(0, 7, txt="기관명: 중앙대 보건소", ln=True)
-    pdf.cell(0, 7, txt=f"환자 성명: {patient_name}", ln=True)
-    pdf.cell(0, 7, txt=f"주민등록번호: {patient_rrn}", ln=True)
-    pdf.cell(0, 7, txt=f"진료과: {department}", ln=True)
+    positions["patient"] = pdf.get_y()
+    pdf.set_y(positions["patient"] + 7 * 3)
     pdf.ln(5)
 
     # Prescriptions Table Header
@@ -63,8 +94,95 @@ def create_prescription_pdf_bytes(patient_name, patient_rrn, department, prescri
     pdf.set_font_size(11) # Slightly smaller for table content
     pdf.cell(130, 10, txt="처방명 (항목)", border=1)
     pdf.cell(50, 10, txt="금액 (원)", border=1, ln=True, align="R")
+    positions["rows"] = pdf.get_y()
+    return positions
+
+
+def _build_confirmation_skeleton(pdf):
+    positions = {}
+    # Title
+    pdf.set_font_size(20)
+    pdf.cell(0, 15, txt="진료확인서 (Medical Confirmation)", ln=True, align="C")
+    pdf.ln(5)
+
+    # Information: 발행일(7) / 기관명 / 환자 성명, 주민등록번호, 진단명(7 x 3)
+    positions["issue_date"] = pdf.get_y()
+    pdf.set_y(positions["issue_date"] + 7)
+    pdf.set_font_size(12)
+    pdf.cell(0, 7, txt="기관명: 중앙대 보건소", ln=True)
+    positions["patient"] = pdf.get_y()
+    return positions
+
+
+_SKELETON_BUILDERS = {
+    "prescription": _build_prescription_skeleton,
+    "confirmation": _build_confirmation_skeleton,
+}
+
+
+def _get_skeleton(kind):
+    skeleton = _skeletons.get(kind)
+    if skeleton is None:
+        with _cache_lock:
+            skeleton = _skeletons.get(kind)
+            if skeleton is None:
+                pdf = FPDF()
+                pdf.add_page()
+                _add_korean_font(pdf)
+                positions = _SKELETON_BUILDERS[kind](pdf)
+                skeleton = (pdf, positions)
+                _skeletons[kind] = skeleton
+    return skeleton
+
+
+def _new_document(kind):
+    """
+    Returns (pdf, positions): a private copy of the cached skeleton for `kind`,
+    with the static parts already drawn and the Korean font already loaded.
+    """
+    skeleton, positions = _get_skeleton(kind)
+    memo = {}
+    for font in skeleton.fonts.values():
+        fresh = copy.copy(font)
+        fresh.ttfont = ttLib.TTFont(io.BytesIO(_read_font_bytes()), recalcTimestamp=False, lazy=True)
+        fresh.missing_glyphs = list(font.missing_glyphs)
+        memo[id(font)] = fresh
+        # 서브셋 코드 배정은 그대로 복사 (memo 로 복사본의 font 가 fresh 를 가리킴)
+        fresh.subset = copy.deepcopy(font.subset, memo)
+    return copy.deepcopy(skeleton, memo), positions
+
+
+def warm_up():
+    """Parses the Korean font and builds every page skeleton (call at startup)."""
+    for kind in _SKELETON_BUILDERS:
+        _get_skeleton(kind)
+    _read_font_bytes()
+
+
+def _output_bytes(pdf, kind, started):
+    """Serializes `pdf` and records its render time (since `started`) and size."""
+    pdf_bytes = pdf.output(dest="S")
+    if isinstance(pdf_bytes, str):
+        pdf_bytes = pdf_bytes.encode("latin-1")
+    else:
+        pdf_bytes = bytes(pdf_bytes)
+    observe_pdf(kind, started, pdf_bytes)
+    return pdf_bytes
+
+
+def _fill_prescription(pdf, positions, patient_name, patient_rrn, department, prescriptions, total_fee, doctor_name, issue_date):
+    # Header Information
+    pdf.set_font_size(12)
+    pdf.set_y(positions["issue_date"])
+    pdf.cell(0, 7, txt=f"발행일: {issue_date}", ln=True, align="R") # Use issue_date parameter
+    pdf.set_y(positions["patient"])
+    pdf.cell(0, 7, txt=f"환자 성명: {patient_name}", ln=True)
+    pdf.cell(0, 7, txt=f"주민등록번호: {patient_rrn}", ln=True)
+    pdf.cell(0, 7, txt=f"진료과: {department}", ln=True)
 
     # Prescriptions Table Rows
+    pdf.set_font_size(11)
+    pdf.set_y(positions["rows"])
     if prescriptions:
         for item in prescriptions:
             # Ensure text fits, potentially use multi_cell if names are very long
@@ -86,32 +204,12 @@ def create_prescription_pdf_bytes(patient_name, patient_rrn, department, prescri
     pdf.cell(0, 7, txt="* 이 처방전은 발행일로부터 7일간 유효합니다.", ln=True)
 
 
-    pdf_bytes = pdf.output(dest="S")
-    if isinstance(pdf_bytes, str):
-        return pdf_bytes.encode("latin-1")
-    return bytes(pdf_bytes)
-
-def create_confirmation_pdf_bytes(
-    patient_name,
-    patient_rrn,
-    disease_name,
-    date_of_diagnosis,
-    date_of_issue,
-):
-    """Create a medical confirmation PDF and return its bytes."""
-    pdf = FPDF()
-    pdf.add_page()
-    _add_korean_font(pdf)
-
-    # Title
-    pdf.set_font_size(20)
-    pdf.cell(0, 15, txt="진료확인서 (Medical Confirmation)", ln=True, align="C")
-    pdf.ln(5)
-
+def _fill_confirmation(pdf, positions, patient_name, patient_rrn, disease_name, date_of_diagnosis, date_of_issue):
     # Information
     pdf.set_font_size(12)
+    pdf.set_y(positions["issue_date"])
     pdf.cell(0, 7, txt=f"발행일: {date_of_issue}", ln=True, align="R")
-    pdf.cell(0, 7, txt="기관명: 중앙대 보건소", ln=True)
+    pdf.set_y(positions["patient"])
     pdf.cell(0, 7, txt=f"환자 성명: {patient_name}", ln=True)
     pdf.cell(0, 7, txt=f"주민등록번호: {patient_rrn}", ln=True)
     pdf.cell(0, 7, txt=f"진단명 (병명): {disease_name}", ln=True)
@@ -138,7 +236,54 @@ def create_confirmation_pdf_bytes(
     # pdf.image("path/to/stamp.png", x=pdf.get_x() + 120, y=pdf.get_y() -10, w=30)
 
 
-    pdf_bytes = pdf.output(dest="S")
-    if isinstance(pdf_bytes, str):
-        return pdf_bytes.encode("latin-1")
-    return bytes(pdf_bytes)
+_FILLERS = {
+    "prescription": _fill_prescription,
+    "confirmation": _fill_confirmation,
+}
+
+
+def create_prescription_pdf_bytes(patient_name, patient_rrn, department, prescriptions, total_fee, doctor_name, issue_date):
+    started = time.perf_counter()
+    pdf, positions = _new_document("prescription")
+    _fill_prescription(pdf, positions, patient_name, patient_rrn, department, prescriptions, total_fee, doctor_name, issue_date)
+    return _output_bytes(pdf, "prescription", started)
+
+
+def create_confirmation_pdf_bytes(
+    patient_name,
+    patient_rrn,
+    disease_name,
+    date_of_diagnosis,
+    date_of_issue,
+):
+    """Create a medical confirmation PDF and return its bytes."""
+    started = time.perf_counter()
+    pdf, positions = _new_document("confirmation")
+    _fill_confirmation(pdf, positions, patient_name, patient_rrn, disease_name, date_of_diagnosis, date_of_issue)
+    return _output_bytes(pdf, "confirmation", started)
+
+
+def create_pdf_bytes(kind, fields):
+    """Renders one document of `kind` ('prescription' / 'confirmation') from keyword `fields`."""
+    started = time.perf_counter()
+    pdf, positions = _new_document(kind)
+    _FILLERS[kind](pdf, positions, **fields)
+    return _output_bytes(pdf, kind, started)
+
+
+def create_merged_pdf_bytes(kind, documents):
+    """
+    Renders every entry of `documents` (keyword dicts, as for create_pdf_bytes)
+    as consecutive pages of a single PDF. The font subset is embedded only once.
+    Returns None if `documents` is empty.
+    """
+    started = time.perf_counter()
+    pdf = None
+    for fields in documents:
+        if pdf is None:
+            pdf, positions = _new_document(kind)
+        else:
+            pdf.add_page()
+            positions = _SKELETON_BUILDERS[kind](pdf)
+        _FILLERS[kind](pdf, positions, **fields)
+    return _output_bytes(pdf, f"{kind}_merged", started) if pdf is not None else None
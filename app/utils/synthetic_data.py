@@ -0,0 +1,277 @@
+"""
+합성 예약/진료비 데이터 생성기 (규모 테스트용)
+
+data/reservations.csv, data/treatment_fees.csv 와 같은 형식의 파일을 원하는
+행 수만큼 만듭니다. 행마다 (seed, 행 번호)의 해시에서 값을 뽑으므로
+  • 행을 하나씩 바로 써서 수천만 행도 메모리 사용량이 일정하고
+  • 같은 seed 면 언제나 같은 파일이 나오며
+  • reservation_row(i) 로 i 번째 환자를 파일을 읽지 않고 알 수 있습니다 (벤치마크용).
+
+이름은 실제 성씨 분포를 따르고, 주민등록번호는 생년월일/성별 자리/검증 숫자가
+맞는 형식이며 파일 안에서 중복되지 않습니다. 진료과 비율과 상태(Pending /
+Registered / Paid) 비율은 "내과=3,외과=1" 형태로 지정합니다. 진료비 파일의
+앞부분은 기준 진료비 표(기본 data/treatment_fees.csv)의 처방을 그대로 쓰고,
+Paid 예약의 처방 내역과 금액은 그 처방에서 고릅니다.
+
+    flask --app run generate-data --reservations 10000000 --fees 100000 --output-dir /tmp/scale
+"""
+import csv
+import functools
+import os
+from datetime import date, timedelta
+
+RESERVATION_COLUMNS = [
+    "name", "rrn", "time", "department", "location", "doctor", "status", "prescription_names", "total_fee",
+]
+FEE_COLUMNS = ["Department", "Prescription", "Fee"]
+DEFAULT_STATUS_MIX = {"Pending": 0.6, "Registered": 0.25, "Paid": 0.15}
+
+# 성씨 비율 (%) - 통계청 인구주택총조사 상위 성씨 기준 근사값
+SURNAME_WEIGHTS = {
+    "김": 21.5, "이": 14.7, "박": 8.4, "최": 4.7, "정": 4.3, "강": 2.4, "조": 2.1, "윤": 2.1, "장": 2.0, "임": 1.7,
+    "한": 1.5, "오": 1.5, "서": 1.5, "신": 1.4, "권": 1.4, "황": 1.4, "안": 1.3, "송": 1.3, "류": 1.1, "전": 1.1,
+    "홍": 1.1, "고": 0.9, "문": 0.9, "양": 0.9, "손": 0.9, "배": 0.8, "백": 0.8, "허": 0.6, "유": 0.6, "남": 0.6,
+    "심": 0.5, "노": 0.5, "하": 0.5, "곽": 0.4, "성": 0.4, "차": 0.4, "주": 0.4, "우": 0.4, "구": 0.4, "민": 0.3,
+}
+GIVEN_SYLLABLES = "민서준지현우예도하윤수아진영성호은재연유정희경승태동혜주원소나채시건선상미기훈빈율"
+_GIVEN_NAMES = [first + second for first in GIVEN_SYLLABLES for second in GIVEN_SYLLABLES]
+_SLOTS = [f" {hour:02d}:{minute:02d}" for hour in range(9, 18) for minute in range(0, 60, 10)]  # 09:00 ~ 17:50
+_LOCATIONS = [f"{floor}층 {wing}-{room}" for floor in range(2, 6) for wing in "ABC" for room in range(1, 7)]
+DOSAGES = ("저용량", "고용량", "서방형", "소아용", "3일분", "7일분", "14일분", "30일분")
+
+# 주민등록번호 공간: 1940-01-01 ~ 2020-12-31 생, 성별 2가지, 뒷자리 5자리
+BIRTH_START = date(1940, 1, 1)
+BIRTH_DAYS = (date(2020, 12, 31) - BIRTH_START).days + 1
+RRN_SPACE = BIRTH_DAYS * 2 * 100_000
+_RRN_STRIDE = 2654435761  # RRN_SPACE 와 서로소 → 행 번호 ↔ 번호가 일대일
+_RRN_WEIGHTS = (2, 3, 4, 5, 6, 7, 8, 9, 2, 3, 4, 5)
+
+_MASK64 = (1 << 64) - 1
+_TABLE_BITS = 12
+
+
+def _mix(x: int) -> int:
+    """splitmix64 finalizer: a well-spread 64-bit hash of x."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class WeightedTable:
+    """Maps 12 hash bits to a value with the given relative weights (1/4096 resolution)."""
+
+    def __init__(self, weights: dict):
+        weights = {key: float(value) for key, value in weights.items() if float(value) > 0}
+        if not weights:
+            raise ValueError("At least one positive weight is required.")
+        slots = 1 << _TABLE_BITS
+        total = sum(weights.values())
+        exact = {key: value / total * slots for key, value in weights.items()}
+        counts = {key: int(value) for key, value in exact.items()}
+        # 남는 칸은 소수점 이하가 큰 순서로 (최대 잉여 방식)
+        for key in sorted(exact, key=lambda k: exact[k] - counts[k], reverse=True)[:slots - sum(counts.values())]:
+            counts[key] += 1
+        self.values = tuple(weights)
+        self._table = [key for key in weights for _ in range(counts[key])]
+
+    def pick(self, bits: int):
+        return self._table[bits & ((1 << _TABLE_BITS) - 1)]
+
+
+def parse_weights(text: str) -> dict:
+    """'내과=3,외과=1' → {'내과': 3.0, '외과': 1.0}; a bare name counts as weight 1."""
+    weights = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        key, _, value = item.partition("=")
+        try:
+            weights[key.strip()] = float(value) if value.strip() else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight: {item.strip()}") from None
+    if not weights:
+        raise ValueError("No weights given.")
+    return weights
+
+
+def load_base_fees(csv_path: str) -> dict:
+    """{department: [(prescription, fee), ...]} from a treatment_fees.csv style file."""
+    base = {}
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            try:
+                fee = int(row["Fee"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            base.setdefault(row["Department"].strip(), []).append((row["Prescription"].strip(), fee))
+    return base
+
+
+def _weighted_digit_sum(digits: str, weights) -> int:
+    return sum(int(d) * w for d, w in zip(digits, weights))
+
+
+@functools.lru_cache(maxsize=None)
+def _rrn_tables():
+    """
+    Precomputed parts of the check digit sum: per birth day (YYMMDD, sum,
+    first gender digit) and per 3/2 serial digits, so _rrn() does no date math.
+    """
+    births = []
+    for offset in range(BIRTH_DAYS):
+        birth = BIRTH_START + timedelta(days=offset)
+        yymmdd = f"{birth:%y%m%d}"
+        births.append((yymmdd, _weighted_digit_sum(yymmdd, _RRN_WEIGHTS[:6]), 3 if birth.year >= 2000 else 1))
+    serial_high = [_weighted_digit_sum(f"{n:03d}", _RRN_WEIGHTS[7:10]) for n in range(1000)]
+    serial_low = [_weighted_digit_sum(f"{n:02d}", _RRN_WEIGHTS[10:12]) for n in range(100)]
+    return births, serial_high, serial_low
+
+
+def _rrn(index: int, offset: int) -> str:
+    if index >= RRN_SPACE:
+        raise ValueError(f"At most {RRN_SPACE} unique RRNs can be generated.")
+    births, serial_high, serial_low = _rrn_tables()
+    x = (index * _RRN_STRIDE + offset) % RRN_SPACE
+    x, day = divmod(x, BIRTH_DAYS)
+    serial, male = divmod(x, 2)
+    yymmdd, birth_sum, first_gender = births[day]
+    gender = first_gender + male
+    total = birth_sum + gender * _RRN_WEIGHTS[6] + serial_high[serial // 100] + serial_low[serial % 100]
+    return f"{yymmdd}-{gender}{serial:05d}{(11 - total % 11) % 10}"
+
+
+def is_valid_rrn(rrn: str) -> bool:
+    """Format, birth date and check digit of a resident registration number."""
+    digits = rrn.replace("-", "")
+    if len(digits) != 13 or not digits.isdigit() or digits[6] not in "1234":
+        return False
+    century = 1900 if digits[6] in "12" else 2000
+    try:
+        date(century + int(digits[:2]), int(digits[2:4]), int(digits[4:6]))
+    except ValueError:
+        return False
+    check = (11 - _weighted_digit_sum(digits, _RRN_WEIGHTS) % 11) % 10
+    return check == int(digits[12])
+
+
+class SyntheticDataset:
+    """
+    Row factory for one (seed, departments, status mix, base fees) setting.
+
+        dataset = SyntheticDataset(seed=7, base_fees=load_base_fees(TREATMENT_FEES_CSV))
+        dataset.write_reservations("reservations.csv", 1_000_000)
+        dataset.reservation_row(42)   # same row as line 43 of the file
+    """
+
+    def __init__(self, seed: int = 0, departments: dict | None = None, status_mix: dict | None = None,
+                 base_fees: dict | None = None, first_day: date = date(2025, 6, 1), days: int = 30):
+        self.seed = seed
+        self.base_fees = {department: list(items) for department, items in (base_fees or {}).items() if items}
+        if departments is None:
+            departments = {department: 1.0 for department in self.base_fees}
+        if not departments:
+            raise ValueError("No departments: pass departments or base fees.")
+        self.departments = WeightedTable(departments)
+        self.statuses = WeightedTable(status_mix or DEFAULT_STATUS_MIX)
+        self.surnames = WeightedTable(SURNAME_WEIGHTS)
+        self._days = [f"{first_day + timedelta(days=offset):%Y-%m-%d}" for offset in range(days)]
+        self._stream = {name: _mix(seed * 3 + i) for i, name in enumerate(("reservation", "fee", "rrn"))}
+        # 기준 진료비 표에 없는 진료과는 전체 기준 처방에서 고름
+        pool = [item for items in self.base_fees.values() for item in items]
+        self._common = {department: self.base_fees.get(department, pool) for department in self.departments.values}
+        self._fee_head = [(department, name, fee) for department in self.departments.values
+                          for name, fee in self._common[department]]
+
+    # ── 예약 ─────────────────────────────────────────────────
+    def _person(self, bits: int) -> str:
+        """Name from 24 hash bits: 12 for the surname, 12 for the given name."""
+        return self.surnames.pick(bits) + _GIVEN_NAMES[(bits >> 12 & 0xFFF) % len(_GIVEN_NAMES)]
+
+    def reservation_row(self, index: int) -> list:
+        """The index-th reservation (0-based) as a list in RESERVATION_COLUMNS order."""
+        h1 = _mix(self._stream["reservation"] ^ (index * 2))
+        h2 = _mix(self._stream["reservation"] ^ (index * 2 + 1))
+        department = self.departments.pick(h1 >> 40)
+        status = self.statuses.pick(h2 >> 24)
+        prescription_names, total_fee = "", 0
+        common = self._common[department]
+        if status == "Paid" and common:
+            count = min(len(common), 2 + (h2 >> 36) % 2)
+            start = (h2 >> 40) % len(common)
+            chosen = [common[(start + i) % len(common)] for i in range(count)]
+            prescription_names = ",".join(name for name, _ in chosen)
+            total_fee = sum(fee for _, fee in chosen)
+        return [
+            self._person(h1),
+            _rrn(index, self._stream["rrn"] % RRN_SPACE),
+            self._days[(h1 >> 24 & 0xFF) % len(self._days)] + _SLOTS[(h1 >> 32 & 0xFF) % len(_SLOTS)],
+            department,
+            _LOCATIONS[(h2 & 0xFF) % len(_LOCATIONS)],
+            self._person(h2 >> 8) + " 전문의",
+            status,
+            prescription_names,
+            str(total_fee),
+        ]
+
+    def iter_reservations(self, count: int, start: int = 0):
+        for index in range(start, start + count):
+            yield self.reservation_row(index)
+
+    # ── 진료비 ───────────────────────────────────────────────
+    def fee_row(self, index: int) -> list:
+        """
+        The index-th fee row: first every base prescription of the chosen
+        departments (so Paid reservations reference real rows), then dosage
+        variants spread by the department weights.
+        """
+        common = self._fee_head
+        if index < len(common):
+            department, name, fee = common[index]
+            return [department, name, str(fee)]
+        h = _mix(self._stream["fee"] ^ index)
+        department = self.departments.pick(h)
+        pool = self._common[department]
+        if pool:
+            base_name, base_fee = pool[(h >> 12) % len(pool)]
+        else:
+            base_name, base_fee = "처방", 10_000
+        variant = index - len(common)
+        name = f"{base_name} {DOSAGES[variant % len(DOSAGES)]} #{variant // len(DOSAGES) + 1}"
+        # 기준 금액의 50%~200%, 10원 단위
+        fee = max(10, int(base_fee * (0.5 + (h >> 24) % 1500 / 1000)) // 10 * 10)
+        return [department, name, str(fee)]
+
+    def iter_fees(self, count: int):
+        for index in range(count):
+            yield self.fee_row(index)
+
+    # ── 파일 쓰기 ─────────────────────────────────────────────
+    @staticmethod
+    def _write(path_or_file, header, rows, batch_size=10_000):
+        """Streams rows to a path or an open text file in batches; returns the row count."""
+        own = isinstance(path_or_file, (str, os.PathLike))
+        f = open(path_or_file, "w", newline="", encoding="utf-8") if own else path_or_file
+        try:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            written = 0
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    writer.writerows(batch)
+                    written += len(batch)
+                    batch.clear()
+            writer.writerows(batch)
+            return written + len(batch)
+        finally:
+            if own:
+                f.close()
+
+    def write_reservations(self, path_or_file, count: int) -> int:
+        return self._write(path_or_file, RESERVATION_COLUMNS, self.iter_reservations(count))
+
+    def write_fees(self, path_or_file, count: int) -> int:
+        return self._write(path_or_file, FEE_COLUMNS, self.iter_fees(count))
+
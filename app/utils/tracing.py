@@ -0,0 +1,189 @@
+"""
+함수 호출 추적 (@traced)
+
+예전에는 거의 모든 함수가 locals()/sys.modules 조회와 print("ENTERING: ...")를
+매번 실행했습니다. @traced 는 추적이 꺼져 있으면 함수를 그대로 돌려주므로
+호출 비용이 전혀 없습니다. 켜져 있으면 호출이 끝날 때 한 줄짜리 JSON 레코드
+(함수, 인자, 소요 시간, 예외)를 "kiosk.trace" 로거로 남깁니다. 요청 스레드는
+레코드를 큐에 넣기만 하고, JSON 변환과 출력(기본 stderr)은 별도 스레드가 하므로
+출력 I/O 를 기다리지 않습니다.
+
+  • KIOSK_TRACE          1 이면 켬 (기본 꺼짐). 모듈을 import 할 때 결정됩니다.
+  • KIOSK_TRACE_SAMPLE   기록할 호출 비율 0~1 (기본 1.0)
+
+이름, 주민등록번호, 질문 문장, 챗봇 대화 상태 같은 개인정보 인자는 값 대신 "***" 로 남기고,
+나머지 값 안의 주민등록번호 형태 문자열도 가립니다.
+"""
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+
+TRACE_ENABLED = os.getenv("KIOSK_TRACE", "0").lower() in ("1", "true", "yes", "on")
+try:
+    TRACE_SAMPLE_RATE = float(os.getenv("KIOSK_TRACE_SAMPLE", "1.0"))
+except ValueError:
+    TRACE_SAMPLE_RATE = 1.0
+
+# 값을 남기지 않는 인자/키 이름
+PII_FIELDS = frozenset({
+    "name", "patient_name", "rrn", "patient_rrn", "patient_id",
+    "user_question", "user_query", "message", "base64_image_data", "parameters",
+    # 챗봇 대화 상태 - 확인된 환자와 대화 기록(이름이 그대로 들어 있음)
+    "conversation", "history",
+})
+MAX_VALUE_CHARS = 80
+
+_RRN_RE = re.compile(r"\d{6}\s*-?\s*[1-4]\d{6}")
+
+logger = logging.getLogger("kiosk.trace")
+logger.propagate = False
+
+_records = queue.SimpleQueue()
+_writer = None
+_writer_lock = threading.Lock()
+# 서비스 코드가 random.seed() 를 호출해도 표본 추출이 영향을 받지 않도록 별도 생성기
+_sampler = random.Random()
+
+
+def _write_records():
+    while True:
+        record = _records.get()
+        if record is None:
+            return
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+def _start_writer():
+    """Starts the background writer thread (once, until flush_traces())."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            return
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+        _writer = threading.Thread(target=_write_records, name="kiosk-trace", daemon=True)
+        _writer.start()
+        atexit.register(flush_traces)
+
+
+def flush_traces(timeout: float = 1.0):
+    """Writes out every queued record and stops the writer (at exit, in tests)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            return
+        _records.put(None)
+        _writer.join(timeout)
+        _writer = None
+
+
+def redact(value, key=None):
+    """JSON-friendly, size-limited copy of `value` with personal data removed."""
+    if key in PII_FIELDS:
+        return "***" if value not in (None, "") else value
+    if isinstance(value, dict):
+        return {str(k): redact(v, k) for k, v in list(value.items())[:20]}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value[:20]]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    text = value if isinstance(value, str) else repr(value)
+    return _RRN_RE.sub("******-*******", text[:MAX_VALUE_CHARS])
+
+
+def _emit(qualname, signature, args, kwargs, started, error):
+    try:
+        bound = signature.bind_partial(*args, **kwargs).arguments if signature else {}
+    except TypeError:
+        bound = {}
+    record = {
+        "event": "call",
+        "fn": qualname,
+        "args": {key: redact(value, key) for key, value in bound.items()},
+        "ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+    if error is not None:
+        record["error"] = type(error).__name__
+    if _writer is None:
+        _start_writer()
+    _records.put(record)
+
+
+def traced(func=None, *, enabled=None, sample_rate=None):
+    """
+    Decorator:  @traced  or  traced(func, enabled=True, sample_rate=0.1)
+
+    When tracing is disabled the function itself is returned (no wrapper).
+    """
+    if func is None:
+        return functools.partial(traced, enabled=enabled, sample_rate=sample_rate)
+    if not (TRACE_ENABLED if enabled is None else enabled):
+        return func
+
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    qualname = f"{func.__module__}.{func.__qualname__}"
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        signature = None
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if rate < 1.0 and _sampler.random() >= rate:
+                return await func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                _emit(qualname, signature, args, kwargs, started, e)
+                raise
+            _emit(qualname, signature, args, kwargs, started, None)
+            return result
+        return async_wrapper
+
+    if inspect.isgeneratorfunction(func):
+        # 스트리밍 응답: 마지막 항목까지 걸린 시간을 기록
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            if rate < 1.0 and _sampler.random() >= rate:
+                return (yield from func(*args, **kwargs))
+            started = time.perf_counter()
+            try:
+                result = yield from func(*args, **kwargs)
+            except GeneratorExit:
+                _emit(qualname, signature, args, kwargs, started, None)
+                raise
+            except BaseException as e:
+                _emit(qualname, signature, args, kwargs, started, e)
+                raise
+            _emit(qualname, signature, args, kwargs, started, None)
+            return result
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if rate < 1.0 and _sampler.random() >= rate:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            _emit(qualname, signature, args, kwargs, started, e)
+            raise
+        _emit(qualname, signature, args, kwargs, started, None)
+        return result
+    return wrapper
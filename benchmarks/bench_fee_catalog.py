@@ -0,0 +1,72 @@
+"""
+진료비 조회 벤치마크
+
+treatment_fees.csv 크기를 100 → 100,000 항목으로 늘리며
+  • scan    : 호출마다 CSV 전체를 읽던 기존 방식
+  • catalog : get_fee_catalog() (파일이 바뀌지 않으면 캐시된 인덱스 사용)
+의 호출당 비용을 비교합니다. catalog 는 크기와 무관하게 거의 일정해야 합니다.
+
+    python benchmarks/bench_fee_catalog.py
+"""
+import csv
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from app.services.fee_catalog import get_fee_catalog
+
+SIZES = (100, 1_000, 10_000, 100_000)
+DEPARTMENTS = ("내과", "외과", "정형외과", "피부과", "안과", "이비인후과", "소아과", "치과")
+
+
+def write_fees_csv(path, size):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Department", "Prescription", "Fee"])
+        for i in range(size):
+            writer.writerow([DEPARTMENTS[i % len(DEPARTMENTS)], f"처방 {i}", 1000 + i % 50 * 100])
+
+
+def scan_department(path, department):
+    """The pre-catalog lookup: stream the whole file on every call."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [
+            {"name": row["Prescription"], "fee": int(row["Fee"])}
+            for row in csv.DictReader(f)
+            if row["Department"].strip().lower() == department.lower()
+        ]
+
+
+def catalog_department(path, department):
+    catalog = get_fee_catalog(path)
+    items = [{"name": item.name, "fee": item.fee} for item in catalog.for_department(department)]
+    return items, catalog.by_name.get("처방 0")
+
+
+def per_call_us(func, *args):
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number * 1e6
+
+
+def main():
+    print(f"{'items':>8} {'scan (us/call)':>16} {'catalog (us/call)':>18}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in SIZES:
+            path = os.path.join(tmp_dir, f"treatment_fees_{size}.csv")
+            write_fees_csv(path, size)
+            # 조회 결과는 모든 크기에서 2건으로 고정 - 카탈로그 크기의 영향만 측정
+            department = f"벤치{size}"
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows([[department, "감기약 처방", 5000], [department, "소화제 처방", 6000]])
+            get_fee_catalog(path)  # 최초 1회 빌드 (서버 시작 시점에 해당)
+            scan = per_call_us(scan_department, path, department)
+            cached = per_call_us(catalog_department, path, department)
+            print(f"{size:>8} {scan:>16.1f} {cached:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
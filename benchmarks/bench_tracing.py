@@ -0,0 +1,64 @@
+"""
+함수 추적 비용 벤치마크
+
+서비스 함수 하나(인자 3개)를 호출할 때의 비용을 비교합니다.
+  • print    : 예전 방식 (locals() + sys.modules 조회 + print("ENTERING: ..."))
+  • off      : @traced, KIOSK_TRACE 꺼짐 (함수를 그대로 호출)
+  • sampled  : @traced, 켜짐, 1% 표본 추출
+  • on       : @traced, 켜짐, 모든 호출 기록 (요청 스레드는 큐에 넣기까지만 부담)
+
+한 요청은 보통 라우트 1개 + 서비스 함수 3~5개를 거치므로 print 대비
+줄어드는 요청당 비용은 대략 (print - off) × 5 입니다.
+
+    python benchmarks/bench_tracing.py
+"""
+import contextlib
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from app.utils import tracing
+from app.utils.tracing import traced
+
+CALLS_PER_REQUEST = 5
+
+
+def with_print(name, rrn, department):
+    _func_args = locals()
+    _module_path = sys.modules[__name__].__name__ if __name__ in sys.modules else __file__
+    print(f"ENTERING: {_module_path}.with_print(args={{_func_args}})")
+    return department
+
+
+def plain(name, rrn, department):
+    return department
+
+
+def per_call_us(func):
+    timer = timeit.Timer(lambda: func("홍길동", "900101-1234567", "내과"))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number * 1e6
+
+
+def main():
+    # 출력 대상은 /dev/null 과 NullHandler - 실제 터미널/로그 파일보다 낙관적인 수치
+    tracing.logger.addHandler(logging.NullHandler())
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = {
+            "print": per_call_us(with_print),
+            "off": per_call_us(traced(plain, enabled=False)),
+            "sampled": per_call_us(traced(plain, enabled=True, sample_rate=0.01)),
+            "on": per_call_us(traced(plain, enabled=True, sample_rate=1.0)),
+        }
+    print(f"{'mode':>8} {'us/call':>10} {'us/request':>11}")
+    for mode, us in results.items():
+        print(f"{mode:>8} {us:>10.2f} {us * CALLS_PER_REQUEST:>11.2f}")
+    saved = (results["print"] - results["off"]) * CALLS_PER_REQUEST
+    print(f"removed per request (tracing off): {saved:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
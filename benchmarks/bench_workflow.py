@@ -0,0 +1,65 @@
+"""
+키오스크 흐름 벤치마크 (pytest-benchmark)
+
+데이터 크기(KIOSK_BENCH_SIZES, 기본 1k/100k/1m 행)마다 접수, 수납, 처방전 발급,
+챗봇 질문(Gemini 스텁), 전체 흐름의 요청 시간을 잽니다. 일반 테스트 실행에는
+포함되지 않도록 파일 이름이 test_ 로 시작하지 않습니다.
+
+    pip install -r benchmarks/requirements.txt
+    python -m pytest benchmarks/bench_workflow.py --benchmark-autosave
+    python -m pytest benchmarks/bench_workflow.py --benchmark-compare --benchmark-compare-fail=mean:15%
+
+  • KIOSK_BENCH_ROUNDS  단계별 반복 횟수 (기본 20)
+"""
+import os
+
+import pytest
+
+from workflow import KioskBench, bench_sizes
+
+ROUNDS = int(os.getenv("KIOSK_BENCH_ROUNDS", "20"))
+
+
+@pytest.fixture(scope="module", params=bench_sizes(), ids=lambda size: f"{size}rows")
+def kiosk(request):
+    with KioskBench(request.param) as bench:
+        yield bench
+
+
+def _run(benchmark, kiosk, step, setup=None):
+    benchmark.extra_info.update(
+        rows=kiosk.size, dataset_seconds=round(kiosk.dataset_seconds, 3), warmup_seconds=round(kiosk.warmup_seconds, 3)
+    )
+
+    def prepare():
+        client = kiosk.client()
+        if setup is not None:
+            setup(client)
+        return (client,), {}
+
+    benchmark.pedantic(step, setup=prepare, rounds=ROUNDS, iterations=1)
+
+
+def test_reception(benchmark, kiosk):
+    _run(benchmark, kiosk, lambda client: kiosk.reception(client, *kiosk.next_patient()))
+
+
+def test_payment(benchmark, kiosk):
+    _run(benchmark, kiosk, kiosk.payment,
+         setup=lambda client: kiosk.reception(client, *kiosk.next_patient()))
+
+
+def test_certificate(benchmark, kiosk):
+    def paid_patient(client):
+        kiosk.reception(client, *kiosk.next_patient())
+        kiosk.payment(client)
+
+    _run(benchmark, kiosk, kiosk.certificate, setup=paid_patient)
+
+
+def test_chatbot(benchmark, kiosk):
+    _run(benchmark, kiosk, kiosk.chatbot)
+
+
+def test_full_flow(benchmark, kiosk):
+    _run(benchmark, kiosk, kiosk.full_flow)
@@ -0,0 +1,176 @@
+"""
+키오스크 부하 생성기
+
+여러 대의 키오스크(스레드, 각자 Flask 테스트 클라이언트)가 정해진 시간 동안
+접수 → 수납 → 처방전 흐름을 반복하고, 일부 환자는 챗봇에 질문도 합니다
+(Gemini 는 --gemini-ms 만큼 기다리는 스텁). 데이터 크기별로 단계별 지연 시간
+분포(p50/p95/p99)와 처리량을 JSON 보고서로 남기며, --baseline 으로 이전 버전의
+보고서를 주면 p95 가 --max-regression 이상 나빠진 단계를 보고하고 1 로 종료합니다.
+
+    python benchmarks/load_workflow.py --sizes 1k,100k --duration 30 --output report.json
+    python benchmarks/load_workflow.py --sizes 1k,100k --baseline report.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from workflow import KioskBench, StepError, bench_sizes, parse_size
+
+STEPS = ("reception", "payment", "certificate", "chatbot", "flow")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples):
+    values = sorted(samples)
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+def kiosk_loop(bench, deadline, chat_ratio, seed, samples, errors, lock):
+    """One kiosk: runs flows until `deadline`, appending per-step durations to `samples`."""
+    rng = random.Random(seed)
+    client = bench.client()
+    local = {step: [] for step in STEPS}
+    local_errors = []
+    while time.perf_counter() < deadline:
+        name, rrn = bench.next_patient()
+        steps = [("reception", lambda: bench.reception(client, name, rrn)),
+                 ("payment", lambda: bench.payment(client)),
+                 ("certificate", lambda: bench.certificate(client))]
+        if rng.random() < chat_ratio:
+            steps.insert(1, ("chatbot", lambda: bench.chatbot(client)))
+        flow_started = time.perf_counter()
+        try:
+            for step, run in steps:
+                started = time.perf_counter()
+                run()
+                local[step].append(time.perf_counter() - started)
+        except Exception as e:  # 한 흐름의 실패는 기록만 하고 계속
+            local_errors.append(str(e) if isinstance(e, StepError) else f"{type(e).__name__}: {e}")
+            continue
+        local["flow"].append(time.perf_counter() - flow_started)
+    with lock:
+        for step, values in local.items():
+            samples[step].extend(values)
+        errors.extend(local_errors)
+
+
+def run_size(size, args):
+    with KioskBench(size, gemini_latency=args.gemini_ms / 1000, seed=args.seed) as bench:
+        samples = {step: [] for step in STEPS}
+        errors = []
+        lock = threading.Lock()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        threads = [
+            threading.Thread(target=kiosk_loop, args=(bench, deadline, args.chat_ratio, args.seed + i, samples, errors, lock))
+            for i in range(args.kiosks)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": size,
+            "dataset_seconds": round(bench.dataset_seconds, 3),
+            "warmup_seconds": round(bench.warmup_seconds, 3),
+            "flows": len(samples["flow"]),
+            "flows_per_second": round(len(samples["flow"]) / elapsed, 3),
+            "errors": len(errors),
+            "error_samples": sorted(set(errors))[:5],
+            "steps": {step: summarize(values) for step, values in samples.items()},
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, max_regression):
+    """Returns a list of (rows, step, old_p95, new_p95) whose p95 got worse than allowed."""
+    regressions = []
+    for rows, result in report["results"].items():
+        old = baseline.get("results", {}).get(rows)
+        if not old:
+            continue
+        for step, stats in result["steps"].items():
+            old_p95 = old["steps"].get(step, {}).get("p95_ms")
+            if old_p95 and stats["count"] and stats["p95_ms"] > old_p95 * (1 + max_regression):
+                regressions.append((rows, step, old_p95, stats["p95_ms"]))
+    return regressions
+
+
+def print_report(report):
+    print(f"{'rows':>9} {'step':>12} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for rows, result in report["results"].items():
+        for step, stats in result["steps"].items():
+            print(f"{rows:>9} {step:>12} {stats['count']:>7} {stats['p50_ms']:>9.1f} "
+                  f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+        print(f"{rows:>9} {'flows/s':>12} {result['flows_per_second']:>7.2f}   errors: {result['errors']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kiosk workflow load generator")
+    parser.add_argument("--sizes", default=None, help="dataset sizes, e.g. 1k,100k,1m (default KIOSK_BENCH_SIZES)")
+    parser.add_argument("--kiosks", type=int, default=4, help="concurrent kiosks (threads)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per dataset size")
+    parser.add_argument("--chat-ratio", type=float, default=0.5, help="share of patients who also ask the chatbot")
+    parser.add_argument("--gemini-ms", type=float, default=300.0, help="stubbed Gemini latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report of a previous version to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="allowed p95 slowdown (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")] if args.sizes else bench_sizes()
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "results": {},
+    }
+    for size in sizes:
+        report["results"][str(size)] = run_size(size, args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for rows, step, old_p95, new_p95 in regressions:
+            print(f"REGRESSION rows={rows} step={step}: p95 {old_p95:.1f} ms → {new_p95:.1f} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+키오스크 전체 흐름 벤치마크 공용 모듈
+
+bench_workflow.py (pytest-benchmark) 와 load_workflow.py (부하 생성기)가 함께 씁니다.
+  • write_dataset   예약/진료비 CSV 를 N 행으로 만들어 임시 디렉터리에 저장
+                    (app/utils/synthetic_data.py 생성기, 기준 진료비는 data/treatment_fees.csv)
+  • KioskBench      그 데이터로 Flask 앱을 띄우고 (Gemini 는 스텁) 단계별 요청을 보냄
+
+한 환자의 흐름은 Flask 테스트 클라이언트로
+  접수(POST /reception/) → 처방 조회(GET /payment/load_prescriptions)
+  → 수납(POST /payment/) → 처방전(GET /certificate/prescription/ → 다운로드)
+순서로 진행합니다. 챗봇은 POST /api/chatbot 에 일반 질문을 보냅니다.
+
+데이터 크기는 KIOSK_BENCH_SIZES (기본 "1k,100k,1m") 로 고릅니다.
+"""
+import contextlib
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from app import create_app
+from app.services import chatbot_service
+from app.services.certificate_cache import set_certificate_cache
+from app.services.response_cache import set_response_cache
+from app.services.ticket_sequencer import TicketSequencer, set_ticket_sequencer
+from app.storage import TREATMENT_FEES_CSV, set_storage
+from app.storage.csv_storage import CsvStorage
+from app.utils.synthetic_data import SyntheticDataset, load_base_fees
+
+DEFAULT_SIZES = "1k,100k,1m"
+STUB_REPLY = {"intent": "general", "reply": "화장실은 1층 엘리베이터 옆에 있습니다."}
+
+
+def parse_size(text: str) -> int:
+    """'1k' → 1000, '1m' → 1000000, '2500' → 2500."""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def bench_sizes() -> list:
+    return [parse_size(size) for size in os.getenv("KIOSK_BENCH_SIZES", DEFAULT_SIZES).split(",") if size.strip()]
+
+
+def synthetic_dataset(seed: int = 0) -> SyntheticDataset:
+    return SyntheticDataset(seed=seed, base_fees=load_base_fees(TREATMENT_FEES_CSV))
+
+
+def write_dataset(directory: str, size: int, seed: int = 0) -> tuple:
+    """
+    Writes `size` reservations and `size` treatment fees under `directory`.
+    Returns (reservations_csv, treatment_fees_csv).
+    """
+    dataset = synthetic_dataset(seed)
+    reservations_csv = os.path.join(directory, "reservations.csv")
+    fees_csv = os.path.join(directory, "treatment_fees.csv")
+    dataset.write_reservations(reservations_csv, size)
+    dataset.write_fees(fees_csv, size)
+    return reservations_csv, fees_csv
+
+
+class StubGeminiModel:
+    """Stands in for GenerativeModel: answers every prompt with STUB_REPLY after `latency` seconds."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def generate_content(self, prompt_parts, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        text = json.dumps(STUB_REPLY, ensure_ascii=False)
+        part = SimpleNamespace(text=text)
+        return SimpleNamespace(
+            candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))],
+            usage_metadata=SimpleNamespace(prompt_token_count=len(prompt_parts[-1]), candidates_token_count=len(text)),
+        )
+
+
+class StepError(AssertionError):
+    pass
+
+
+class KioskBench:
+    """
+    A kiosk app on a synthetic dataset of `size` reservations and fees.
+    Use as a context manager; call client() once per simulated kiosk.
+    """
+
+    def __init__(self, size: int, gemini_latency: float = 0.0, seed: int = 0):
+        self.size = size
+        self.gemini_latency = gemini_latency
+        self.seed = seed
+        self.dataset = synthetic_dataset(seed)
+        self._patients = None
+        self._patients_lock = threading.Lock()
+
+    def __enter__(self):
+        self._stack = contextlib.ExitStack()
+        tmp_dir = self._stack.enter_context(tempfile.TemporaryDirectory(prefix="kiosk_bench_"))
+        started = time.perf_counter()
+        reservations_csv, fees_csv = write_dataset(tmp_dir, self.size, self.seed)
+        self.dataset_seconds = time.perf_counter() - started
+
+        self._stack.enter_context(patch.dict(os.environ, {
+            "GEMINI_API_KEY": "bench",
+            "KIOSK_DOWNLOAD_DIR": os.path.join(tmp_dir, "downloads"),
+        }))
+        self._stack.enter_context(patch.object(
+            chatbot_service, "_get_gemini_model", return_value=(StubGeminiModel(self.gemini_latency), None)
+        ))
+        # 캐시는 끄고 매번 실제 경로(모델 호출, PDF 생성)를 측정
+        set_storage(CsvStorage(reservations_csv, fees_csv))
+        set_ticket_sequencer(TicketSequencer(os.path.join(tmp_dir, "ticket_counters.json")))
+        self._stack.callback(set_ticket_sequencer, None)
+        set_certificate_cache(None)
+        set_response_cache(None)
+        self._stack.callback(set_storage, None)
+
+        self._patients = itertools.cycle(random.Random(self.seed).sample(range(self.size), min(self.size, 10_000)))
+        started = time.perf_counter()
+        self.app = create_app()  # 진료비 카탈로그 로드 포함
+        # 예약 인덱스, 템플릿, 폰트를 한 번 읽어 둠 (서버 시작 직후 첫 요청에 해당)
+        self.full_flow(self.client())
+        self.warmup_seconds = time.perf_counter() - started
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def client(self):
+        return self.app.test_client()
+
+    def next_patient(self) -> tuple:
+        with self._patients_lock:
+            index = next(self._patients)
+        return tuple(self.dataset.reservation_row(index)[:2])
+
+    # ── 단계 ─────────────────────────────────────────────────
+    @staticmethod
+    def _expect(response, status, step):
+        if response.status_code != status:
+            raise StepError(f"{step}: HTTP {response.status_code}")
+        return response
+
+    def reception(self, client, name, rrn):
+        response = client.post("/reception/", data={"action": "manual", "name": name, "rrn": rrn})
+        self._expect(response, 200, "reception")
+        if "예약이 확인되었습니다" not in response.get_data(as_text=True):
+            raise StepError("reception: reservation not found")
+
+    def payment(self, client):
+        response = self._expect(client.get("/payment/load_prescriptions"), 200, "load_prescriptions")
+        total_fee = response.get_json()["total_fee"]
+        self._expect(client.post("/payment/", data={"amount": str(total_fee), "method": "card"}), 302, "payment")
+
+    def certificate(self, client):
+        response = self._expect(client.get("/certificate/prescription/"), 302, "certificate")
+        download = self._expect(client.get(response.headers["Location"]), 200, "download")
+        if not download.data.startswith(b"%PDF"):
+            raise StepError("download: not a PDF")
+
+    def chatbot(self, client, question="화장실 어디예요?"):
+        response = self._expect(client.post("/api/chatbot", json={"message": question}), 200, "chatbot")
+        if "reply" not in response.get_json():
+            raise StepError("chatbot: no reply")
+
+    def full_flow(self, client, name=None, rrn=None):
+        if name is None:
+            name, rrn = self.next_patient()
+        self.reception(client, name, rrn)
+        self.payment(client)
+        self.certificate(client)
@@ -0,0 +1,21 @@
+"""
+gunicorn 설정 (gunicorn 은 현재 디렉터리의 이 파일을 자동으로 읽습니다)
+
+    PROMETHEUS_MULTIPROC_DIR=/tmp/kiosk-metrics gunicorn -w 4 run:app
+
+여러 워커의 지표를 합치는 multiprocess 모드에서는 종료된 워커의 값을 지워야
+/metrics 에 죽은 워커의 게이지가 남지 않습니다.
+
+  • KIOSK_BIND     바인드 주소 (기본 127.0.0.1:5001)
+  • KIOSK_WORKERS  워커 수 (기본 2)
+"""
+import os
+
+from app.utils.metrics import mark_process_dead
+
+bind = os.getenv("KIOSK_BIND", "127.0.0.1:5001")
+workers = int(os.getenv("KIOSK_WORKERS", "2"))
+
+
+def child_exit(server, worker):
+    mark_process_dead(worker.pid)
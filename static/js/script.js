@@ -7,18 +7,62 @@ document.addEventListener('click', () => {
   timer = setTimeout(() => { window.location.href = '/home'; }, 120000);
 });
 
+// Prerendered prompt audio (flask build-audio-pack): spoken text → file URL
+const audioPackIndex = new Map();
+
+function loadAudioPack() {
+  const manifestUrl = document.body && document.body.dataset.audioPack;
+  if (!manifestUrl) return;
+  fetch(manifestUrl)
+    .then((res) => (res.ok ? res.json() : null))
+    .then((manifest) => {
+      if (!manifest) return;
+      const base = manifestUrl.slice(0, manifestUrl.lastIndexOf('/') + 1);
+      const lang = document.documentElement.lang || 'ko';
+      const versionKey = `audioPackVersion:${lang}`;
+      const prefetched = localStorage.getItem(versionKey) === manifest.version;
+      Object.entries(manifest.prompts).forEach(([promptLang, prompts]) => {
+        Object.values(prompts).forEach((prompt) => {
+          const url = base + prompt.file;
+          audioPackIndex.set(prompt.text, url);
+          // Download this language's prompts once per pack version
+          if (!prefetched && promptLang === lang) fetch(url).catch(() => {});
+        });
+      });
+      localStorage.setItem(versionKey, manifest.version);
+    })
+    .catch(() => {});
+}
+
+document.addEventListener('DOMContentLoaded', loadAudioPack);
+
 function playTTS(text) {
+  const prerendered = audioPackIndex.get(text.trim().replace(/\s+/g, ' '));
+  if (prerendered) {
+    new Audio(prerendered).play();
+    return;
+  }
   fetch(`/tts?text=${encodeURIComponent(text)}`)
-    .then((res) => res.blob())
+    .then((res) => {
+      if (!res.ok) throw new Error(`TTS ${res.status}`);
+      return res.blob();
+    })
     .then((blob) => {
       const url = URL.createObjectURL(blob);
       const audio = new Audio(url);
+      audio.addEventListener('ended', () => URL.revokeObjectURL(url));
       audio.play();
+    })
+    .catch(() => {
+      // Server engine unavailable: fall back to the browser voice
+      if (window.speechSynthesis) {
+        window.speechSynthesis.speak(new SpeechSynthesisUtterance(text));
+      }
     });
 }
 
 function openMap() {
-  window.open('/static/images/map/clinic_map.png', '_blank');
+  window.open(document.body.dataset.mapUrl || '/static/images/map/clinic_map.png', '_blank');
 }
 
 // --------------------------------------------------------
@@ -36,6 +80,7 @@ let chatbotStream; // For webcam/mic stream
 let speechRecognition;
 let isChatbotOpen = false;
 const backendApiUrl = '/api/chatbot'; // ADAPTED
+const backendStreamUrl = '/api/chatbot/stream'; // Server-Sent Events version of backendApiUrl
 
 const synth = window.speechSynthesis;
 let chatbotVoice = null;
@@ -141,28 +186,106 @@ function addMessageToChatbot(text, sender) {
     }
 }
 
+// Server-side conversation (remembers the confirmed patient between turns).
+// null asks the server to start one; expired ids are replaced by the server.
+let chatConversationId = null;
+
+// Posts `payload` to the SSE endpoint. onToken(text) receives the reply as it is
+// generated; resolves with the final result (same fields as /api/chatbot plus `status`).
+async function streamChatbotReply(payload, onToken, url = backendStreamUrl) {
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ...payload, conversation_id: chatConversationId })
+    });
+    if (!response.ok) {
+        // Validation errors and 503 (busy) come back as plain JSON
+        const errorData = await response.json().catch(() => ({}));
+        return { ...errorData, status: response.status };
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result = null;
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            let eventName = 'message';
+            let data = '';
+            for (const line of block.split('\n')) {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            }
+            if (!data) continue;
+            const parsed = JSON.parse(data);
+            if (eventName === 'token') onToken(parsed.text);
+            else if (eventName === 'result') result = parsed;
+            if (parsed.conversation_id) chatConversationId = parsed.conversation_id;
+        }
+    }
+    return result || { error: '챗봇 응답이 중간에 끊겼습니다.', status: 502 };
+}
+
+// Collects streamed text and passes each finished sentence to speakFn,
+// so speech starts with the first sentence instead of the whole reply.
+function createSentenceSpeaker(speakFn) {
+    let pending = '';
+    return {
+        push(text) {
+            pending += text;
+            const match = pending.match(/^[\s\S]*[.!?。\n]/);
+            if (match) {
+                if (match[0].trim()) speakFn(match[0]);
+                pending = pending.slice(match[0].length);
+            }
+        },
+        flush() {
+            if (pending.trim()) speakFn(pending);
+            pending = '';
+        }
+    };
+}
+
 async function askAiChatbot(query) {
     if (!query || !query.trim()) return;
 
     addMessageToChatbot(query, 'user');
     if(aiChatbotInput) aiChatbotInput.value = '';
 
+    let streamedElement = null;
+    const speaker = createSentenceSpeaker((sentence) => chatbotSpeak(sentence, false));
+
     try {
-        const response = await fetch(backendApiUrl, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ message: query })
+        const result = await streamChatbotReply({ message: query }, (text) => {
+            if (!streamedElement) {
+                streamedElement = document.createElement('div');
+                streamedElement.classList.add('ai-chatbot-message', 'ai-bot-message');
+                aiChatbotChatbox.appendChild(streamedElement);
+            }
+            streamedElement.textContent += text;
+            aiChatbotChatbox.scrollTop = aiChatbotChatbox.scrollHeight;
+            speaker.push(text);
         });
 
-        if (!response.ok) {
-            const errorData = await response.json().catch(() => null);
-            const errorMessage = errorData?.error || `서버 응답 오류: ${response.status}`;
+        if (result.status !== 200) {
+            const errorMessage = result.reply || result.error || `서버 응답 오류: ${result.status}`;
             addMessageToChatbot(errorMessage, 'bot');
             return;
         }
 
-        const data = await response.json();
-        addMessageToChatbot(data.reply, 'bot');
+        if (streamedElement) {
+            // The streamed text is already on screen and being spoken
+            if (result.reply) streamedElement.textContent = result.reply;
+            speaker.flush();
+        } else {
+            addMessageToChatbot(result.reply, 'bot');
+        }
 
     } catch (error) {
         console.error('Error calling chatbot API:', error);
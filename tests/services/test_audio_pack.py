@@ -0,0 +1,84 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.audio_pack import build_audio_pack, collect_prompts, load_audio_pack, prompt_audio_file
+from app.utils.i18n import TRANSLATIONS
+
+
+class FakeEngine:
+    name = "fake"
+    mimetype = "audio/wav"
+
+    def __init__(self):
+        self.calls = []
+
+    def synthesize(self, text, lang, voice, rate):
+        self.calls.append((text, lang, voice, rate))
+        return f"RIFF:{lang}:{voice}:{text}".encode("utf-8")
+
+
+class TestAudioPack(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pack_dir = os.path.join(self.tmp_dir.name, "pack")
+        self.templates_dir = os.path.join(self.tmp_dir.name, "templates")
+        os.makedirs(self.templates_dir)
+        self.write_template("home.html", "{% block title %}{{ locale.get('home_title', '홈') }}{% endblock %}"
+                                         "{{ locale.get('btn_help', '도움말') }}")
+        self.write_template("payment.html", "{% block title %}수납{% endblock %}")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_template(self, name, source):
+        with open(os.path.join(self.templates_dir, name), "w", encoding="utf-8") as f:
+            f.write(source)
+
+    def test_collects_translations_fallbacks_and_titles(self):
+        prompts = collect_prompts(self.templates_dir)
+        self.assertEqual(set(prompts), set(TRANSLATIONS))
+        self.assertEqual(prompts["en"]["home_title"], TRANSLATIONS["en"]["home_title"])
+        self.assertEqual(prompts["en"]["btn_help"], "도움말")  # key missing in TRANSLATIONS → template fallback
+        self.assertEqual(prompts["ko"]["title:payment"], "수납")
+        self.assertNotIn("title:home", prompts["ko"])  # dynamic title comes from TRANSLATIONS
+
+    def test_build_is_incremental_and_versioned(self):
+        engine = FakeEngine()
+        manifest = build_audio_pack(self.pack_dir, engine=engine, voices={"ko": "f3"},
+                                    templates_dir=self.templates_dir)
+        prompt_count = sum(len(table) for table in manifest["prompts"].values())
+        self.assertEqual(manifest["synthesized"], prompt_count)
+        self.assertEqual(load_audio_pack(self.pack_dir)["version"], manifest["version"])
+        relative = prompt_audio_file("title:payment", "ko", self.pack_dir)
+        with open(os.path.join(self.pack_dir, relative), "rb") as f:
+            self.assertEqual(f.read(), "RIFF:ko:f3:수납".encode("utf-8"))
+        self.assertIsNone(prompt_audio_file("missing", "ko", self.pack_dir))
+
+        again = build_audio_pack(self.pack_dir, engine=engine, voices={"ko": "f3"}, templates_dir=self.templates_dir)
+        self.assertEqual(again["synthesized"], 0)
+        self.assertEqual(again["version"], manifest["version"])
+
+        # Changing one prompt re-synthesizes only that file and drops the old one
+        self.write_template("payment.html", "{% block title %}수납 창구{% endblock %}")
+        changed = build_audio_pack(self.pack_dir, engine=engine, voices={"ko": "f3"}, templates_dir=self.templates_dir)
+        self.assertEqual(changed["synthesized"], 1)
+        self.assertNotEqual(changed["version"], manifest["version"])
+        self.assertFalse(os.path.exists(os.path.join(self.pack_dir, relative)))
+        with open(os.path.join(self.pack_dir, "manifest.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["prompts"]["ko"]["title:payment"]["text"], "수납 창구")
+        self.assertEqual(load_audio_pack(self.pack_dir)["version"], changed["version"])
+
+    def test_missing_pack(self):
+        self.assertIsNone(load_audio_pack(self.pack_dir))
+        self.assertIsNone(prompt_audio_file("home_title", "ko", self.pack_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
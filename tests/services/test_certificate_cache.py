@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.certificate_cache import CertificateCache, certificate_key, set_certificate_cache
+from app.services.certificate_service import prepare_prescription_pdf, prepare_medical_confirmation_pdf
+from app.services.payment_service import update_reservation_with_payment_details
+from app.storage import set_storage
+from app.storage.csv_storage import CsvStorage
+
+RRN = "850101-1234567"
+
+RESERVATIONS_CSV_DATA = """name,rrn,time,department,location,doctor,status,prescription_names,total_fee
+김예약,850101-1234567,2025-06-19 08:20,내과,본관1층,닥터김,Paid,감기약 처방,5000
+"""
+
+TREATMENT_FEES_CSV_DATA = """Department,Prescription,Fee
+내과,감기약 처방,5000
+내과,소화제 처방,6000
+"""
+
+PRESCRIPTION_DETAILS = {
+    "doctor_name": "닥터김",
+    "department": "내과",
+    "prescriptions": [{"name": "감기약 처방", "fee": 5000}],
+    "total_fee": 5000,
+    "issue_date": "2025-06-19",
+}
+
+
+class TestCertificateCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cert_cache")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_key_depends_on_versions_and_inputs(self):
+        key = certificate_key("prescription", RRN, "0", "abc", total_fee=5000)
+        self.assertEqual(key, certificate_key("prescription", RRN, "0", "abc", total_fee=5000))
+        self.assertNotEqual(key, certificate_key("prescription", RRN, "1", "abc", total_fee=5000))
+        self.assertNotEqual(key, certificate_key("prescription", RRN, "0", "abd", total_fee=5000))
+        self.assertNotEqual(key, certificate_key("confirmation", RRN, "0", "abc", total_fee=5000))
+        self.assertNotEqual(key, certificate_key("prescription", RRN, "0", "abc", total_fee=6000))
+
+    def test_memory_and_disk_are_size_bounded(self):
+        cache = CertificateCache(self.cache_dir, max_disk_bytes=250, max_memory_bytes=250)
+        for i in range(5):
+            cache.put(f"k{i}", RRN, bytes([i]) * 100)
+            os.utime(cache._path(f"k{i}", cache._memory[f"k{i}"][0]), ns=(i * 10 ** 9, i * 10 ** 9))
+        cache._evict_disk()
+        self.assertEqual(list(cache._memory), ["k3", "k4"])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+        # A fresh process sees the surviving disk entries only
+        reopened = CertificateCache(self.cache_dir)
+        self.assertIsNone(reopened.get("k0", RRN))
+        self.assertEqual(reopened.get("k4", RRN), b"\x04" * 100)
+        # The RRN itself never appears in file names
+        self.assertFalse(any(RRN in name for name in os.listdir(self.cache_dir)))
+
+    def test_invalidate_drops_one_patient(self):
+        cache = CertificateCache(self.cache_dir)
+        cache.put("a", RRN, b"first")
+        cache.put("b", "920202-2345678", b"other")
+        self.assertEqual(cache.invalidate(RRN), 2)  # memory + disk
+        self.assertIsNone(cache.get("a", RRN))
+        self.assertEqual(cache.get("b", "920202-2345678"), b"other")
+
+
+class TestCertificateCaching(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        resv_csv = os.path.join(self.tmp_dir.name, "reservations.csv")
+        fees_csv = os.path.join(self.tmp_dir.name, "treatment_fees.csv")
+        with open(resv_csv, "w", encoding="utf-8") as f:
+            f.write(RESERVATIONS_CSV_DATA)
+        with open(fees_csv, "w", encoding="utf-8") as f:
+            f.write(TREATMENT_FEES_CSV_DATA)
+        set_storage(CsvStorage(resv_csv, fees_csv))
+        set_certificate_cache(CertificateCache(os.path.join(self.tmp_dir.name, "cert_cache")))
+
+    def tearDown(self):
+        set_storage(None)
+        set_certificate_cache(None)
+        self.tmp_dir.cleanup()
+
+    @patch('app.services.certificate_service.create_prescription_pdf_bytes', side_effect=[b"%PDF v1", b"%PDF v2"])
+    def test_reprint_is_a_cache_read_until_payment_changes(self, mock_create_pdf):
+        first, _ = prepare_prescription_pdf("김예약", RRN, "내과", PRESCRIPTION_DETAILS)
+        again, _ = prepare_prescription_pdf("김예약", RRN, "내과", PRESCRIPTION_DETAILS)
+        self.assertEqual((first, again), (b"%PDF v1", b"%PDF v1"))
+        self.assertEqual(mock_create_pdf.call_count, 1)
+
+        self.assertTrue(update_reservation_with_payment_details(RRN, ["감기약 처방"], 5000))
+        after, _ = prepare_prescription_pdf("김예약", RRN, "내과", PRESCRIPTION_DETAILS)
+        self.assertEqual(after, b"%PDF v2")
+        self.assertEqual(mock_create_pdf.call_count, 2)
+
+    @patch('app.services.certificate_service.create_confirmation_pdf_bytes', return_value=b"%PDF confirmation")
+    def test_confirmation_reprint_is_a_cache_read(self, mock_create_pdf):
+        first, _ = prepare_medical_confirmation_pdf("김예약", RRN, "내과")
+        again, _ = prepare_medical_confirmation_pdf("김예약", RRN, "내과")
+        self.assertEqual(first, again)
+        mock_create_pdf.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
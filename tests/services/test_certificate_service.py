@@ -15,8 +15,14 @@ from app.services.certificate_service import (
     get_prescription_data_for_pdf,
     prepare_prescription_pdf,
     prepare_medical_confirmation_pdf,
+    render_batch,
     MissingKoreanFontError # Assuming this is also in certificate_service or utils
 )
+from app.storage import set_storage
+from app.storage.csv_storage import CsvStorage
+from app.utils.pdf_generator import KOREAN_FONT_PATH
+import tempfile
+import zipfile
 # If MissingKoreanFontError is in utils, the import path needs to be correct.
 # For now, assuming it's accessible or defined in certificate_service for simplicity of this example.
 
@@ -44,6 +50,10 @@ class TestCertificateService(unittest.TestCase):
         self.patient_name = "홍길동"
         self.patient_rrn = "900101-1234567"
         self.department = "내과"
+        # Rendering is mocked here; the certificate cache has its own tests
+        cache_patcher = patch('app.services.certificate_service.get_certificate_cache', return_value=None)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
 
     @patch('app.services.certificate_service.os.path.exists')
     @patch('builtins.open', new_callable=mock_open)
@@ -174,5 +184,71 @@ class TestCertificateService(unittest.TestCase):
         self.assertEqual(kwargs["date_of_issue"], datetime.now().strftime("%Y-%m-%d"))
 
 
+BATCH_RESERVATIONS_CSV_DATA = """name,rrn,time,department,location,doctor,status,prescription_names,total_fee
+김예약,850101-1234567,2025-06-19 08:20,내과,본관1층,닥터김,Paid,"감기약 처방,소화제 처방",11000
+박테스트,920202-2345678,2025-06-19 09:00,외과,별관2층,닥터박,Paid,드레싱,8000
+이대기,930303-1345678,2025-06-19 09:30,내과,본관1층,닥터김,Pending,,0
+"""
+
+BATCH_TREATMENT_FEES_CSV_DATA = """Department,Prescription,Fee
+내과,감기약 처방,5000
+내과,소화제 처방,6000
+외과,드레싱,8000
+"""
+
+
+@unittest.skipUnless(os.path.exists(KOREAN_FONT_PATH), "Korean font not available")
+class TestRenderBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        resv_csv = os.path.join(self.tmp_dir.name, "reservations.csv")
+        fees_csv = os.path.join(self.tmp_dir.name, "treatment_fees.csv")
+        with open(resv_csv, "w", encoding="utf-8") as f:
+            f.write(BATCH_RESERVATIONS_CSV_DATA)
+        with open(fees_csv, "w", encoding="utf-8") as f:
+            f.write(BATCH_TREATMENT_FEES_CSV_DATA)
+        set_storage(CsvStorage(resv_csv, fees_csv))
+
+    def tearDown(self):
+        set_storage(None)
+        self.tmp_dir.cleanup()
+
+    def _zip(self, rrns, kind, workers):
+        chunks, rendered, skipped = render_batch(rrns, kind, fmt="zip", workers=workers)
+        return zipfile.ZipFile(BytesIO(b"".join(chunks))), rendered, skipped
+
+    def test_zip_of_prescriptions_skips_unpaid(self):
+        archive, rendered, skipped = self._zip(None, "prescription", workers=1)
+        self.assertEqual(rendered, 2)
+        self.assertEqual([rrn for rrn, _ in skipped], ["930303-1345678"])
+        names = archive.namelist()
+        self.assertEqual(names, ["0001_prescription_김예약.pdf", "0002_prescription_박테스트.pdf", "skipped.csv"])
+        self.assertTrue(archive.read(names[0]).startswith(b"%PDF"))
+        self.assertIn("930303-1345678", archive.read("skipped.csv").decode("utf-8"))
+
+    def test_process_pool_matches_single_process(self):
+        rrns = ["850101-1234567", "920202-2345678", "000000-0000000"]
+        archive, rendered, skipped = self._zip(rrns, "prescription", workers=2)
+        self.assertEqual(rendered, 2)
+        self.assertEqual([rrn for rrn, _ in skipped], ["000000-0000000"])
+        single, _, _ = self._zip(rrns, "prescription", workers=1)
+        for name in ("0001_prescription_김예약.pdf", "0002_prescription_박테스트.pdf"):
+            # Same layout and glyphs; only the creation timestamp may differ
+            self.assertEqual(len(archive.read(name)), len(single.read(name)))
+
+    def test_merged_pdf_has_one_page_per_patient(self):
+        chunks, rendered, skipped = render_batch(None, "confirmation", fmt="pdf")
+        merged = b"".join(chunks)
+        self.assertEqual(rendered, 3)
+        self.assertEqual(skipped, [])
+        self.assertTrue(merged.startswith(b"%PDF"))
+        self.assertEqual(merged.count(b"/Type /Page\n"), 3)
+
+    def test_unknown_kind_raises(self):
+        with self.assertRaises(ValueError):
+            render_batch(None, "invoice")
+
+
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -7,7 +7,7 @@ import sys
 # Ensure the app package is importable during test collection
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from app.services.chatbot_service import generate_chatbot_response, SYSTEM_INSTRUCTION_PROMPT
+from app.services.chatbot_service import generate_chatbot_response, reset_gemini_client, SYSTEM_INSTRUCTION_PROMPT
 
 class TestChatbotService(unittest.TestCase):
 
@@ -15,6 +15,13 @@ class TestChatbotService(unittest.TestCase):
         self.user_question = "오늘 날씨 어때요?"
         self.api_key = "test_api_key"
         self.mock_model_response_text = "저는 날씨 정보는 드릴 수 없어요. 저는 늘봄이입니다."
+        # The Gemini model is a per-process singleton; start every test without one
+        reset_gemini_client()
+        self.addCleanup(reset_gemini_client)
+        # Every test talks to the (mocked) model, not the FAQ cache
+        cache_patcher = patch('app.services.chatbot_service.get_response_cache', return_value=None)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
 
     @patch('app.services.chatbot_service.os.getenv')
     @patch('app.services.chatbot_service.genai.configure')
@@ -40,11 +47,29 @@ class TestChatbotService(unittest.TestCase):
         self.assertEqual(result["reply"], self.mock_model_response_text)
         mock_os_getenv.assert_called_once_with("GEMINI_API_KEY")
         mock_genai_configure.assert_called_once_with(api_key=self.api_key)
-        mock_generative_model.assert_called_once_with("gemini-1.5-flash-latest")
+        mock_generative_model.assert_called_once_with("gemini-1.5-flash-latest", system_instruction=SYSTEM_INSTRUCTION_PROMPT)
 
-        # Check prompt parts passed to generate_content
-        expected_prompt_parts = [SYSTEM_INSTRUCTION_PROMPT, self.user_question]
-        mock_model_instance.generate_content.assert_called_once_with(expected_prompt_parts)
+        # Check prompt parts passed to generate_content (the system prompt is on the model)
+        expected_prompt_parts = [self.user_question]
+        mock_model_instance.generate_content.assert_called_once_with(expected_prompt_parts, request_options=ANY)
+
+    @patch('app.services.chatbot_service.os.getenv', return_value="test_key")
+    @patch('app.services.chatbot_service.genai.configure')
+    @patch('app.services.chatbot_service.genai.GenerativeModel')
+    def test_gemini_model_is_created_once(self, mock_generative_model, mock_genai_configure, mock_os_getenv):
+        mock_model_instance = mock_generative_model.return_value
+        mock_model_instance.generate_content.side_effect = Exception("API call failed")
+
+        for _ in range(3):
+            generate_chatbot_response(self.user_question)
+
+        mock_genai_configure.assert_called_once_with(api_key="test_key")
+        mock_generative_model.assert_called_once_with(ANY, system_instruction=SYSTEM_INSTRUCTION_PROMPT)
+        self.assertEqual(mock_model_instance.generate_content.call_count, 3)
+        for call in mock_model_instance.generate_content.call_args_list:
+            self.assertNotIn(SYSTEM_INSTRUCTION_PROMPT, call.args[0])
+            self.assertIn("timeout", call.kwargs["request_options"])
+            self.assertIn("retry", call.kwargs["request_options"])
 
     @patch('app.services.chatbot_service.os.getenv')
     @patch('app.services.chatbot_service.genai.configure')
@@ -74,12 +99,11 @@ class TestChatbotService(unittest.TestCase):
         args, _ = mock_model_instance.generate_content.call_args
         prompt_parts_sent = args[0]
 
-        self.assertEqual(len(prompt_parts_sent), 3) # System prompt, image, user question
-        self.assertEqual(prompt_parts_sent[0], SYSTEM_INSTRUCTION_PROMPT)
-        self.assertIsInstance(prompt_parts_sent[1], dict) # Image blob
-        self.assertEqual(prompt_parts_sent[1]["mime_type"], "image/png")
-        self.assertEqual(prompt_parts_sent[1]["data"], raw_image_data)
-        self.assertEqual(prompt_parts_sent[2], self.user_question)
+        self.assertEqual(len(prompt_parts_sent), 2) # Image, user question (system prompt is on the model)
+        self.assertIsInstance(prompt_parts_sent[0], dict) # Image blob
+        self.assertEqual(prompt_parts_sent[0]["mime_type"], "image/png")
+        self.assertEqual(prompt_parts_sent[0]["data"], raw_image_data)
+        self.assertEqual(prompt_parts_sent[1], self.user_question)
 
 
     def test_generate_chatbot_response_no_api_key(self):
@@ -234,7 +258,11 @@ class TestChatbotServiceHandlers(unittest.TestCase):
         # Mock the model instance and its generate_content method by default
         self.mock_model_instance = MagicMock()
         self.mock_generative_model.return_value = self.mock_model_instance
-
+        reset_gemini_client()
+        self.addCleanup(reset_gemini_client)
+        cache_patcher = patch('app.services.chatbot_service.get_response_cache', return_value=None)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
 
     def tearDown(self):
         self.getenv_patcher.stop()
@@ -421,24 +449,25 @@ class TestChatbotServiceHandlers(unittest.TestCase):
         self.assertEqual(result, {"reply": expected_reply})
 
     # --- Tests for handle_certificate_request ---
-    @patch('app.services.chatbot_service.base64.b64encode')
-    @patch('app.services.chatbot_service.certificate_service.prepare_medical_confirmation_pdf')
-    @patch('app.services.chatbot_service.reception_service.lookup_reservation')
-    def test_handle_certificate_confirmation_success(self, mock_lookup, mock_prepare_pdf, mock_b64encode):
+    @patch('app.services.chatbot_service.download_service.publish')
+    @patch('app.services.chatbot_service.prepare_medical_confirmation_pdf')
+    @patch('app.services.chatbot_service.lookup_reservation')
+    def test_handle_certificate_confirmation_success(self, mock_lookup, mock_prepare_pdf, mock_publish):
         mock_lookup.return_value = {"name": "박민지", "rrn": "950101-2000000", "status": "Paid", "department": "정형외과"}
         mock_prepare_pdf.return_value = (b"pdf_bytes_data", "confirmation_950101-2000000.pdf")
-        mock_b64encode.return_value = b"base64_encoded_data"
+        mock_publish.return_value = "download_token"
 
         params = {"name": "박민지", "rrn": "950101-2000000", "certificate_type": "confirmation"}
         result = handle_certificate_request(params, "some query")
 
         expected_result = {
-            "reply": "박민지님의 진료확인서 발급이 완료되었습니다. 파일명: confirmation_950101-2000000.pdf",
+            "reply": "박민지님의 진료확인서 발급이 완료되었습니다. 새 창에서 확인해주세요.",
             "pdf_filename": "confirmation_950101-2000000.pdf",
-            "pdf_data_base64": "base64_encoded_data"
+            "pdf_token": "download_token"
         }
         self.assertEqual(result, expected_result)
-        mock_b64encode.assert_called_once_with(b"pdf_bytes_data")
+        # The PDF bytes go to the download spool, never into the JSON reply
+        mock_publish.assert_called_once_with(b"pdf_bytes_data", "confirmation_950101-2000000.pdf")
         mock_prepare_pdf.assert_called_once_with("박민지", "950101-2000000", "정형외과")
 
     @patch('app.services.chatbot_service.certificate_service.get_prescription_data_for_pdf')
@@ -555,3 +584,69 @@ class TestChatbotServiceHandlers(unittest.TestCase):
             ticket_number=mock_new_ticket_num,
             name=mock_patient_name
         )
+
+
+from app.services.chatbot_service import ReplyStreamExtractor, stream_chatbot_response
+
+
+class TestChatbotStreaming(unittest.TestCase):
+    FULL_TEXT = json.dumps({"intent": "general", "reply": "안녕하세요. \"늘봄이\"입니다!"}, ensure_ascii=True)
+
+    def setUp(self):
+        reset_gemini_client()
+        self.addCleanup(reset_gemini_client)
+        patchers = [
+            patch.dict(os.environ, {"GEMINI_API_KEY": "test_key"}),
+            patch('app.services.chatbot_service.genai.configure'),
+            patch('app.services.chatbot_service.genai.GenerativeModel'),
+            patch('app.services.chatbot_service.get_response_cache', return_value=None),
+        ]
+        mocks = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+        self.mock_model_instance = mocks[2].return_value
+
+        # Streamed response: iterating yields chunks, then it holds the merged candidate
+        chunks = []
+        for i in range(0, len(self.FULL_TEXT), 5):
+            chunk = MagicMock()
+            chunk.text = self.FULL_TEXT[i:i + 5]
+            chunks.append(chunk)
+        mock_response = MagicMock()
+        mock_response.__iter__.return_value = iter(chunks)
+        mock_part = MagicMock()
+        mock_part.text = self.FULL_TEXT
+        mock_response.candidates[0].content.parts = [mock_part]
+        mock_response.candidates[0].finish_reason.name = "STOP"
+        self.mock_model_instance.generate_content.return_value = mock_response
+
+    def test_extractor_handles_split_escapes(self):
+        for size in (1, 2, 3, 7):
+            extractor = ReplyStreamExtractor()
+            text = "".join(extractor.feed(self.FULL_TEXT[i:i + size]) for i in range(0, len(self.FULL_TEXT), size))
+            self.assertEqual(text, "안녕하세요. \"늘봄이\"입니다!")
+            self.assertTrue(extractor.done)
+
+    def test_stream_yields_tokens_then_result(self):
+        events = list(stream_chatbot_response("안녕"))
+        tokens = [data for kind, data in events if kind == "token"]
+        self.assertGreater(len(tokens), 1)
+        self.assertEqual("".join(tokens), "안녕하세요. \"늘봄이\"입니다!")
+        self.assertEqual(events[-1], ("result", {"reply": "안녕하세요. \"늘봄이\"입니다!"}))
+        _, kwargs = self.mock_model_instance.generate_content.call_args
+        self.assertTrue(kwargs["stream"])
+
+    def test_sse_endpoint(self):
+        from app import create_app
+        response = create_app().test_client().post('/api/chatbot/stream', json={"message": "안녕"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        blocks = [block for block in response.get_data(as_text=True).split("\n\n") if block]
+        self.assertTrue(blocks[0].startswith("event: token\n"))
+        last_event, last_data = blocks[-1].split("\n")
+        self.assertEqual(last_event, "event: result")
+        self.assertEqual(json.loads(last_data[len("data: "):]),
+                         {"reply": "안녕하세요. \"늘봄이\"입니다!", "status": 200})
+        response.close()
+        from app.routes.chatbot import chat_limiter
+        self.assertEqual(chat_limiter.in_flight, 0)  # slot released when the stream closed
@@ -0,0 +1,184 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import json
+import os
+import sys
+import tempfile
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.conversation_store import (
+    MemoryConversationStore, SqliteConversationStore, set_conversation_store,
+    new_conversation_state, append_history, history_prompt, HISTORY_TURNS,
+)
+from app.services import chatbot_service
+from app.services.response_cache import ResponseCache
+from app.services.chatbot_service import generate_chatbot_response, reset_gemini_client
+from app.storage import set_storage
+from app.storage.csv_storage import CsvStorage
+
+RESERVATIONS_CSV_DATA = """name,rrn,time,department,location,doctor,status,prescription_names,total_fee
+김예약,850101-1234567,2025-06-19 08:20,내과,본관1층,닥터김,Registered,,
+"""
+
+TREATMENT_FEES_CSV_DATA = """Department,Prescription,Fee
+내과,감기약 처방,5000
+내과,소화제 처방,6000
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestConversationStore(unittest.TestCase):
+
+    def test_memory_store_expires_and_copies_state(self):
+        clock = FakeClock()
+        store = MemoryConversationStore(ttl_seconds=10, clock=clock)
+        conversation_id, state = store.open(None)
+        state["patient"] = {"name": "김예약", "rrn": "850101-1234567"}
+        store.save(conversation_id, state)
+        state["patient"] = None  # not saved
+        reopened_id, reopened = store.open(conversation_id)
+        self.assertEqual(reopened_id, conversation_id)
+        self.assertEqual(reopened["patient"], {"name": "김예약", "rrn": "850101-1234567"})
+        clock.now = 11
+        new_id, new_state = store.open(conversation_id)
+        self.assertNotEqual(new_id, conversation_id)
+        self.assertEqual(new_state, new_conversation_state())
+
+    def test_sqlite_store_is_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "conversations.db")
+            conversation_id, state = SqliteConversationStore(db_path).open("")
+            state["quote"] = {"department": "내과", "prescription_info": {"total_fee": 5000}}
+            SqliteConversationStore(db_path).save(conversation_id, state)
+            self.assertEqual(SqliteConversationStore(db_path).load(conversation_id), state)
+
+    def test_history_is_short_and_masks_rrns(self):
+        state = new_conversation_state()
+        for i in range(HISTORY_TURNS + 2):
+            append_history(state, "user", f"질문 {i} 850101-1234567")
+        self.assertEqual(len(state["history"]), HISTORY_TURNS)
+        prompt = history_prompt(state)
+        self.assertNotIn("850101-1234567", prompt)
+        self.assertIn(f"사용자: 질문 {HISTORY_TURNS + 1} ******-*******", prompt)
+        self.assertIsNone(history_prompt(new_conversation_state()))
+
+
+class TestChatbotConversation(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        resv_csv = os.path.join(self.tmp_dir.name, "reservations.csv")
+        fees_csv = os.path.join(self.tmp_dir.name, "treatment_fees.csv")
+        with open(resv_csv, "w", encoding="utf-8") as f:
+            f.write(RESERVATIONS_CSV_DATA)
+        with open(fees_csv, "w", encoding="utf-8") as f:
+            f.write(TREATMENT_FEES_CSV_DATA)
+        set_storage(CsvStorage(resv_csv, fees_csv))
+        self.addCleanup(set_storage, None)
+        set_conversation_store(MemoryConversationStore())
+        self.addCleanup(set_conversation_store, None)
+        reset_gemini_client()
+        self.addCleanup(reset_gemini_client)
+        patchers = [
+            patch.dict(os.environ, {"GEMINI_API_KEY": "test_key"}),
+            patch('app.services.chatbot_service.genai.configure'),
+            patch('app.services.chatbot_service.genai.GenerativeModel'),
+            patch('app.services.chatbot_service.get_response_cache', return_value=None),
+        ]
+        mocks = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+        self.mock_model_instance = mocks[2].return_value
+
+    def _respond_with(self, response_dict):
+        mock_response = MagicMock()
+        mock_part = MagicMock()
+        mock_part.text = json.dumps(response_dict, ensure_ascii=False)
+        mock_response.candidates[0].content.parts = [mock_part]
+        self.mock_model_instance.generate_content.return_value = mock_response
+
+    def test_payment_flow_reads_reservation_and_fees_once(self):
+        lookup = MagicMock(wraps=chatbot_service.lookup_reservation)
+        load_fees = MagicMock(wraps=chatbot_service.load_department_prescriptions)
+        update = MagicMock(wraps=chatbot_service.update_reservation_with_payment_details)
+        with patch('app.services.chatbot_service.lookup_reservation', lookup), \
+                patch('app.services.chatbot_service.load_department_prescriptions', load_fees), \
+                patch('app.services.chatbot_service.update_reservation_with_payment_details', update):
+            first = generate_chatbot_response("김예약 850101-1234567 수납할게요", conversation_id="")
+            self.assertIn("총 금액은", first["reply"])
+            conversation_id = first["conversation_id"]
+
+            # Name and RRN come from the conversation; no model call, no second read
+            second = generate_chatbot_response("카드로 결제할게요", conversation_id=conversation_id)
+
+        self.assertIn("결제가 card로 완료되었습니다", second["reply"])
+        self.assertEqual(second["conversation_id"], conversation_id)
+        lookup.assert_called_once()
+        load_fees.assert_called_once()
+        self.assertEqual(update.call_args.kwargs, {"expected_version": "0"})
+        self.mock_model_instance.generate_content.assert_not_called()
+
+    def test_negated_payment_confirmation_does_not_pay(self):
+        from app.storage import get_storage
+        first = generate_chatbot_response("김예약 850101-1234567 수납할게요", conversation_id="")
+        self._respond_with({"intent": "general", "reply": "다른 결제 수단을 안내해 드릴게요."})
+        second = generate_chatbot_response("현금 없어요", conversation_id=first["conversation_id"])
+        self.assertEqual(second["reply"], "다른 결제 수단을 안내해 드릴게요.")
+        self.mock_model_instance.generate_content.assert_called_once()
+        self.assertEqual(get_storage().get_reservation("850101-1234567")["status"], "Registered")
+
+    def test_stale_cached_reservation_is_read_again(self):
+        first = generate_chatbot_response("김예약 850101-1234567 수납할게요", conversation_id="")
+        # Another kiosk changes the row between the two turns
+        from app.storage import get_storage
+        get_storage().update_reservation("850101-1234567", {"location": "별관"})
+        second = generate_chatbot_response("카드로 결제할게요", conversation_id=first["conversation_id"])
+        self.assertIn("결제가 card로 완료되었습니다", second["reply"])
+        self.assertEqual(get_storage().get_reservation("850101-1234567")["status"], "Paid")
+
+    def test_model_gets_compact_history_without_rrn(self):
+        first = generate_chatbot_response("김예약 850101-1234567 수납할게요", conversation_id="")
+        self._respond_with({"intent": "general", "reply": "네, 도와드릴게요."})
+        generate_chatbot_response("그럼 얼마나 기다려야 하나요?", conversation_id=first["conversation_id"])
+        prompt_parts = self.mock_model_instance.generate_content.call_args.args[0]
+        self.assertEqual(len(prompt_parts), 2)
+        self.assertTrue(prompt_parts[0].startswith("이전 대화"))
+        self.assertNotIn("850101-1234567", prompt_parts[0])
+
+    def test_follow_up_questions_bypass_the_faq_cache(self):
+        cache = ResponseCache(max_entries=8, ttl_seconds=60)
+        follow_up = "그럼 거기는 몇 시까지 해요?"
+        with patch('app.services.chatbot_service.get_response_cache', return_value=cache):
+            self._respond_with({"intent": "general", "reply": "약국은 본관 1층에 있습니다."})
+            pharmacy = generate_chatbot_response("약국은 어디 있어요?", conversation_id="")
+            generate_chatbot_response(follow_up, conversation_id=pharmacy["conversation_id"])
+
+            self._respond_with({"intent": "general", "reply": "편의점은 별관 지하에 있습니다."})
+            store = generate_chatbot_response("편의점은 어디 있어요?", conversation_id="")
+            self._respond_with({"intent": "general", "reply": "편의점은 24시간 운영합니다."})
+            answer = generate_chatbot_response(follow_up, conversation_id=store["conversation_id"])
+
+        self.assertEqual(answer["reply"], "편의점은 24시간 운영합니다.")
+        self.assertEqual(self.mock_model_instance.generate_content.call_count, 4)
+        self.assertIsNone(cache.get(follow_up))
+        # Opening questions do not depend on earlier turns and are still cached
+        self.assertEqual(cache.get("약국은 어디 있어요?"), "약국은 본관 1층에 있습니다.")
+
+    def test_without_conversation_id_turns_stay_stateless(self):
+        result = generate_chatbot_response("카드로 결제할게요")
+        self.assertNotIn("conversation_id", result)
+        self.assertIn("성함과 주민등록번호", result["reply"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import create_app
+from app.services import download_service
+
+PDF_BYTES = b"%PDF-1.3\n" + bytes(range(256)) * 8 + b"\n%%EOF\n"
+
+
+class TestDownloadService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        env = patch.dict(os.environ, {"KIOSK_DOWNLOAD_DIR": self.tmp_dir.name, "KIOSK_DOWNLOAD_TTL": "60"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_publish_and_resolve(self):
+        token = download_service.publish(PDF_BYTES, "처방전.pdf")
+        path, filename, mimetype = download_service.resolve(token)
+        self.assertEqual(filename, "처방전.pdf")
+        self.assertEqual(mimetype, "application/pdf")
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), PDF_BYTES)
+        self.assertIsNone(download_service.resolve("../" + token[3:]))
+        self.assertIsNone(download_service.resolve("A" * 43))
+
+    def test_expired_tokens_are_rejected_and_purged(self):
+        token = download_service.publish(PDF_BYTES, "a.pdf")
+        with patch("app.services.download_service.time.time", return_value=10 ** 12):
+            self.assertIsNone(download_service.resolve(token))
+            self.assertEqual(download_service.purge_expired(), 1)
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def test_pdf_without_metadata_is_removed(self):
+        with patch("app.services.download_service._write_atomic",
+                   side_effect=[None, OSError("disk full")]) as write:
+            with self.assertRaises(OSError):
+                download_service.publish(PDF_BYTES, "a.pdf")
+        removed_path = write.call_args_list[0].args[0]
+        self.assertFalse(os.path.exists(removed_path))
+
+        # Left behind by a crash: kept while a publish could still be in progress, purged after the TTL
+        orphan = os.path.join(self.tmp_dir.name, "A" * 43 + download_service.DATA_SUFFIX)
+        with open(orphan, "wb") as f:
+            f.write(PDF_BYTES)
+        self.assertEqual(download_service.purge_expired(), 0)
+        with patch("app.services.download_service.time.time", return_value=10 ** 12):
+            self.assertEqual(download_service.purge_expired(), 1)
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def test_existing_directory_is_restricted_to_the_owner(self):
+        os.chmod(self.tmp_dir.name, 0o755)
+        self.assertEqual(download_service.download_dir(), self.tmp_dir.name)
+        self.assertEqual(os.stat(self.tmp_dir.name).st_mode & 0o777, 0o700)
+
+    def test_download_route_supports_etag_and_range(self):
+        client = create_app().test_client()
+        url = f"/certificate/download/{download_service.publish(PDF_BYTES, 'a.pdf')}"
+
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, PDF_BYTES)
+        self.assertEqual(response.headers["Content-Length"], str(len(PDF_BYTES)))
+        self.assertEqual(response.headers["Accept-Ranges"], "bytes")
+        etag = response.headers["ETag"]
+
+        self.assertEqual(client.get(url, headers={"If-None-Match": etag}).status_code, 304)
+
+        partial = client.get(url, headers={"Range": "bytes=0-99"})
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.data, PDF_BYTES[:100])
+        self.assertEqual(partial.headers["Content-Range"], f"bytes 0-99/{len(PDF_BYTES)}")
+
+        self.assertEqual(client.get("/certificate/download/" + "A" * 43).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.fee_catalog import FeeCatalog, get_fee_catalog
+
+MOCK_TREATMENT_FEES_CSV_DATA = """Department,Prescription,Fee
+내과,감기약 처방,5000
+내과,소화제 처방,6000
+ 정형외과 ,물리치료,20000
+피부과,피부 연고 처방,abc
+"""
+
+
+class TestFeeCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "treatment_fees.csv")
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write(MOCK_TREATMENT_FEES_CSV_DATA)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_indexes_by_department_and_name(self):
+        catalog = get_fee_catalog(self.csv_path)
+        self.assertEqual([item.name for item in catalog.for_department("내과")], ["감기약 처방", "소화제 처방"])
+        self.assertEqual(catalog.for_department("정형외과")[0].fee, 20000)
+        self.assertEqual(catalog.for_department("안과"), ())
+        self.assertEqual(catalog.by_name["소화제 처방"], 6000)
+        self.assertNotIn("피부 연고 처방", catalog.by_name)
+        with self.assertRaises(ValueError):
+            catalog.for_department("피부과")
+        with self.assertRaises(TypeError):
+            catalog.by_name["감기약 처방"] = 0
+
+    def test_catalog_is_built_once_while_file_unchanged(self):
+        first = get_fee_catalog(self.csv_path)
+        with patch.object(FeeCatalog, "from_csv", wraps=FeeCatalog.from_csv) as mock_from_csv:
+            for _ in range(5):
+                self.assertIs(get_fee_catalog(self.csv_path), first)
+            mock_from_csv.assert_not_called()
+
+    def test_catalog_is_rebuilt_when_file_changes(self):
+        self.assertNotIn("안과", get_fee_catalog(self.csv_path).by_department)
+        with open(self.csv_path, "a", encoding="utf-8") as f:
+            f.write("안과,안약 처방,4000\n")
+        self.assertEqual(get_fee_catalog(self.csv_path).by_name["안약 처방"], 4000)
+
+    def test_missing_file_raises(self):
+        os.remove(self.csv_path)
+        with self.assertRaises(FileNotFoundError):
+            get_fee_catalog(self.csv_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+import base64
+import io
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+from PIL import Image
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services import chatbot_service
+from app.services.image_pipeline import ImageReplyCache, normalize_image, perceptual_hash, set_image_reply_cache
+
+
+def camera_frame(width=3000, height=2000, exif_orientation=None, fmt="JPEG"):
+    image = Image.new("RGB", (width, height), (200, 180, 160))
+    for x in range(0, width, 100):  # some structure for the perceptual hash
+        image.paste((40, 60, 80), (x, 0, x + 50, height // 2))
+    exif = Image.Exif()
+    exif[0x010F] = "KioskCam"  # Make
+    if exif_orientation:
+        exif[0x0112] = exif_orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, exif=exif.tobytes()) if fmt == "JPEG" else image.save(buffer, format=fmt)
+    return f"data:image/{fmt.lower()};base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+class StubModel:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def generate_content(self, prompt_parts, **kwargs):
+        self.calls.append(prompt_parts)
+        text = json.dumps({"intent": "general", "reply": self.reply}, ensure_ascii=False)
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[SimpleNamespace(text=text)]))])
+
+
+class TestImagePipeline(unittest.TestCase):
+
+    def test_downscales_reencodes_and_strips_exif(self):
+        result = normalize_image(camera_frame(exif_orientation=6))  # rotated 90° by the camera
+        self.assertEqual(result["mime_type"], "image/jpeg")
+        self.assertEqual((result["width"], result["height"]), (683, 1024))  # orientation applied
+        image = Image.open(io.BytesIO(result["data"]))
+        self.assertEqual(image.size, (683, 1024))
+        self.assertEqual(len(image.getexif()), 0)
+        with patch.dict(os.environ, {"KIOSK_IMAGE_FORMAT": "webp", "KIOSK_IMAGE_MAX_SIDE": "512"}):
+            webp = normalize_image(camera_frame(fmt="PNG", width=800, height=600))
+        self.assertEqual(webp["mime_type"], "image/webp")
+        self.assertEqual(Image.open(io.BytesIO(webp["data"])).size, (512, 384))
+
+    def test_limits_and_invalid_data(self):
+        with patch.dict(os.environ, {"KIOSK_IMAGE_MAX_BYTES": "1000"}):
+            self.assertEqual(normalize_image(camera_frame())["status_code"], 413)
+        with patch.dict(os.environ, {"KIOSK_IMAGE_MAX_PIXELS": "1000000"}):
+            self.assertEqual(normalize_image(camera_frame())["status_code"], 413)
+        self.assertEqual(normalize_image("data:image/png;base64,not_really_base64")["error"], "Invalid base64 image data.")
+        self.assertEqual(normalize_image(base64.b64encode(b"not an image").decode())["status_code"], 400)
+
+    def test_cache_matches_near_identical_frames(self):
+        image = Image.open(io.BytesIO(base64.b64decode(camera_frame().split(",", 1)[1])))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=40)
+        reencoded = perceptual_hash(Image.open(buffer))
+        different = Image.new("RGB", image.size, (255, 255, 255))
+        different.paste((0, 0, 0), (0, 0, image.width // 3, image.height))
+        self.assertEqual(len(perceptual_hash(image)), 64)
+
+        now = [0.0]
+        cache = ImageReplyCache(max_entries=2, ttl_seconds=60, max_distance=8, clock=lambda: now[0])
+        cache.put(perceptual_hash(image), "이 약 어떻게 먹어요?", "하루 세 번")
+        self.assertEqual(cache.get(reencoded, "이 약 어떻게 먹어요"), "하루 세 번")
+        self.assertIsNone(cache.get(perceptual_hash(different), "이 약 어떻게 먹어요?"))
+        self.assertIsNone(cache.get(reencoded, "이건 무슨 약이에요?"))
+        now[0] = 61
+        self.assertIsNone(cache.get(reencoded, "이 약 어떻게 먹어요?"))
+
+    def test_identical_frames_skip_the_model(self):
+        set_image_reply_cache(ImageReplyCache(max_entries=8, ttl_seconds=60))
+        self.addCleanup(set_image_reply_cache, None)
+        model = StubModel("약 봉투에 하루 세 번 복용이라고 적혀 있습니다.")
+        with patch.dict(os.environ, {"GEMINI_API_KEY": "test"}), \
+             patch.object(chatbot_service, "_get_gemini_model", return_value=(model, None)):
+            first = chatbot_service.generate_chatbot_response("이 약 어떻게 먹어요?", camera_frame())
+            again = chatbot_service.generate_chatbot_response("이 약 어떻게 먹어요?", camera_frame())
+            other_question = chatbot_service.generate_chatbot_response("이건 무슨 약이에요?", camera_frame())
+            other_frame = chatbot_service.generate_chatbot_response("이 약 어떻게 먹어요?", camera_frame(width=2000, height=3000))
+        self.assertEqual(first, again)
+        self.assertEqual(len(model.calls), 3)
+        self.assertEqual(model.calls[0][0]["mime_type"], "image/jpeg")
+        self.assertLess(len(model.calls[0][0]["data"]), 200_000)
+        self.assertIn("reply", other_question)
+        self.assertIn("reply", other_frame)
+
+
+if __name__ == '__main__':
+    unittest.main()
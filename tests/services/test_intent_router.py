@@ -0,0 +1,140 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import csv
+import os
+import sys
+import time
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.intent_router import (
+    route_message, router_stats, reset_router_stats, ROUTER_MIN_CONFIDENCE, ROUTER_FALLBACK_CONFIDENCE
+)
+from app.storage import set_storage, RESERVATIONS_CSV, TREATMENT_FEES_CSV
+from app.storage.csv_storage import CsvStorage
+from app.services.chatbot_service import (
+    generate_chatbot_response, generate_chatbot_response_async, stream_chatbot_response, reset_gemini_client
+)
+
+
+class TestRouteMessage(unittest.TestCase):
+
+    def test_reception_with_name_rrn_and_symptom(self):
+        route = route_message("접수할게요 홍길동 900101-1234567 열이 나요")
+        self.assertEqual(route.intent, "reception")
+        self.assertEqual(route.parameters, {"rrn": "900101-1234567", "name": "홍길동", "symptom": "fever"})
+        self.assertGreaterEqual(route.confidence, ROUTER_MIN_CONFIDENCE)
+
+    def test_name_phrase_and_rrn_without_dash(self):
+        route = route_message("제 이름은 김철수이고 주민번호 8501011234567 수납해주세요")
+        self.assertEqual(route.intent, "payment")
+        self.assertEqual(route.parameters["name"], "김철수")
+        self.assertEqual(route.parameters["rrn"], "850101-1234567")
+        self.assertEqual(route.parameters["payment_stage"], "initial")
+
+    def test_payment_method_and_certificate_type(self):
+        payment = route_message("카드로 결제할게요")
+        self.assertEqual(payment.intent, "payment")
+        self.assertEqual(payment.parameters, {"payment_stage": "confirmation", "payment_method": "card"})
+        certificate = route_message("처방전 뽑아주세요")
+        self.assertEqual(certificate.intent, "certificate")
+        self.assertEqual(certificate.parameters, {"certificate_type": "prescription"})
+
+    def test_questions_and_small_talk_go_to_the_model(self):
+        self.assertIsNone(route_message("오늘 날씨 어때요?").intent)
+        self.assertIsNone(route_message("").intent)
+        self.assertLess(route_message("접수는 어디서 하나요?").confidence, ROUTER_MIN_CONFIDENCE)
+        self.assertLess(route_message("수납하고 처방전도 주세요").confidence, ROUTER_MIN_CONFIDENCE)
+
+    def test_negated_and_cancelling_phrases_go_to_the_model(self):
+        for message in ("현금 없어요", "카드가 안돼요", "카드 말고 다른 방법 있어요",
+                        "접수 취소해주세요", "결제 안 할게요", "처방전 필요 없어요"):
+            # Below the fallback threshold too: never acted on locally, even if the model is down
+            self.assertLess(route_message(message).confidence, ROUTER_FALLBACK_CONFIDENCE, message)
+
+    def test_payment_confirmation_needs_a_method_choice(self):
+        for message, method in (("현금으로 할게요", "cash"), ("카드 결제요", "card"), ("현금이요", "cash")):
+            route = route_message(message)
+            self.assertEqual(route.parameters.get("payment_method"), method, message)
+            self.assertGreaterEqual(route.confidence, ROUTER_MIN_CONFIDENCE)
+        bare = route_message("카드")
+        self.assertNotIn("payment_method", bare.parameters)
+        self.assertLess(bare.confidence, ROUTER_MIN_CONFIDENCE)
+
+    def test_names_in_shipped_reservations_are_recognised(self):
+        set_storage(CsvStorage(RESERVATIONS_CSV, TREATMENT_FEES_CSV))
+        self.addCleanup(set_storage, None)
+        with open(RESERVATIONS_CSV, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:  # includes names like "류열다" that end in a verb-like syllable
+            route = route_message(f"수납할게요 {row['name']} {row['rrn']}")
+            self.assertEqual(route.parameters.get("name"), row["name"])
+            self.assertGreaterEqual(route.confidence, ROUTER_MIN_CONFIDENCE)
+
+    def test_routing_takes_under_a_millisecond(self):
+        message = "접수할게요 홍길동 900101-1234567 머리가 아파요"
+        start = time.perf_counter()
+        for _ in range(1000):
+            route_message(message)
+        self.assertLess((time.perf_counter() - start) / 1000, 0.001)
+
+
+class TestChatbotLocalRouting(unittest.TestCase):
+
+    def setUp(self):
+        reset_router_stats()
+        reset_gemini_client()
+        self.addCleanup(reset_gemini_client)
+        self.addCleanup(reset_router_stats)
+        patchers = [
+            patch.dict(os.environ, {"GEMINI_API_KEY": "test_key"}),
+            patch('app.services.chatbot_service.genai.configure'),
+            patch('app.services.chatbot_service.genai.GenerativeModel'),
+            patch('app.services.chatbot_service.handle_reception_request', return_value={"reply": "접수 완료"}),
+            patch('app.services.chatbot_service.get_response_cache', return_value=None),
+        ]
+        mocks = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+        self.mock_generative_model = mocks[2]
+        self.mock_model_instance = MagicMock()
+        self.mock_generative_model.return_value = self.mock_model_instance
+        self.mock_handle_reception = mocks[3]
+
+    def test_common_request_skips_the_model(self):
+        result = generate_chatbot_response("접수할게요 홍길동 900101-1234567")
+        self.assertEqual(result, {"reply": "접수 완료"})
+        self.mock_generative_model.assert_not_called()
+        self.mock_handle_reception.assert_called_once_with(
+            {"rrn": "900101-1234567", "name": "홍길동"}, "접수할게요 홍길동 900101-1234567"
+        )
+        self.assertEqual(router_stats()["local"], 1)
+        self.assertEqual(router_stats()["hit_rate"], 1.0)
+
+    def test_low_confidence_falls_back_locally_when_the_model_fails(self):
+        self.mock_model_instance.generate_content.side_effect = Exception("Service Unavailable")
+        result = generate_chatbot_response("접수는 어떻게 하나요?")
+        self.assertEqual(result, {"reply": "접수 완료"})
+        self.mock_model_instance.generate_content.assert_called_once()
+        self.assertEqual(router_stats()["fallback"], 1)
+
+    def test_unrouted_message_reports_the_model_error(self):
+        self.mock_model_instance.generate_content.side_effect = Exception("Service Unavailable")
+        result = generate_chatbot_response("오늘 날씨 어때요?")
+        self.assertEqual(result["status_code"], 500)
+        self.mock_handle_reception.assert_not_called()
+        self.assertEqual(router_stats(), {"local": 0, "model": 1, "fallback": 0, "total": 1, "hit_rate": 0.0})
+
+    def test_async_and_streaming_paths_route_locally(self):
+        result = asyncio.run(generate_chatbot_response_async("접수할게요 홍길동 900101-1234567"))
+        self.assertEqual(result, {"reply": "접수 완료"})
+        events = list(stream_chatbot_response("접수할게요 홍길동 900101-1234567"))
+        self.assertEqual(events, [("result", {"reply": "접수 완료"})])
+        self.mock_generative_model.assert_not_called()
+        self.assertEqual(router_stats()["local"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import csv
+import os
+import sys
+import tempfile
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.payment_ledger import PaymentLedger, CsvPaymentArchive
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def payment(payment_id, patient_id="850101-1234567", amount=5000):
+    return {"payment_id": payment_id, "patient_id": patient_id, "amount": amount,
+            "method": "card", "status": "completed", "timestamp": "2026-01-01T09:00:00"}
+
+
+class TestPaymentLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.spilled = []
+        self.ledger = PaymentLedger(retention_seconds=60, max_payments=3,
+                                    archive=self.spilled.extend, clock=self.clock)
+
+    def test_lookup_by_id_and_patient(self):
+        self.ledger.add(payment("a"))
+        self.ledger.add(payment("b", patient_id="900202-2345678"))
+        self.ledger.add(payment("c"))
+        self.assertEqual(self.ledger.get("b")["patient_id"], "900202-2345678")
+        self.assertIsNone(self.ledger.get("missing"))
+        self.assertEqual([p["payment_id"] for p in self.ledger.for_patient("850101-1234567")], ["a", "c"])
+        self.assertEqual(self.ledger.for_patient("unknown"), [])
+
+    def test_expired_payments_are_evicted_and_spilled(self):
+        self.ledger.add(payment("a"))
+        self.clock.now += 30
+        self.ledger.add(payment("b"))
+        self.clock.now += 31
+        self.assertEqual(self.ledger.evict_expired(), 1)
+        self.assertIsNone(self.ledger.get("a"))
+        self.assertEqual([p["payment_id"] for p in self.ledger.for_patient("850101-1234567")], ["b"])
+        self.assertEqual([p["payment_id"] for p in self.spilled], ["a"])
+        self.clock.now += 60
+        self.ledger.add(payment("c"))  # adding also evicts what has expired
+        self.assertEqual(len(self.ledger), 1)
+
+    def test_lookups_do_not_return_expired_payments(self):
+        self.ledger.add(payment("a"))
+        self.ledger.add(payment("b", patient_id="900202-2345678"))
+        self.clock.now += 61  # no add() since - retention must still apply
+        self.assertIsNone(self.ledger.get("b"))
+        self.assertEqual(self.ledger.for_patient("850101-1234567"), [])
+        self.assertEqual(sorted(p["payment_id"] for p in self.spilled), ["a", "b"])
+        self.assertEqual(len(self.ledger), 0)
+
+    def test_size_limit_drops_oldest(self):
+        for payment_id in "abcde":
+            self.ledger.add(payment(payment_id))
+        self.assertEqual(len(self.ledger), 3)
+        self.assertEqual([p["payment_id"] for p in self.spilled], ["a", "b"])
+        self.assertEqual(self.ledger.get("e")["payment_id"], "e")
+
+    def test_csv_archive(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "payments.csv")
+            ledger = PaymentLedger(retention_seconds=60, max_payments=1, archive=CsvPaymentArchive(path))
+            for payment_id in "abc":
+                ledger.add(payment(payment_id))
+            with open(path, encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([row["payment_id"] for row in rows], ["a", "b"])
+        self.assertEqual(rows[0]["amount"], "5000")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 import unittest
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 import os
+import tempfile
 import uuid # For checking payment_id format, though not strictly necessary to mock uuid itself
 import sys
+from datetime import datetime
 
 # Ensure the app package is importable during test collection
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
@@ -11,8 +13,11 @@ from app.services.payment_service import (
     process_new_payment,
     get_payment_details,
     load_department_prescriptions,
-    _payments_db # Import for checking db state, use with caution in tests (implementation detail)
+    get_patient_payments,
 )
+from app.services.payment_ledger import PaymentLedger, get_payment_ledger, set_payment_ledger
+from app.storage import set_storage, RESERVATIONS_CSV
+from app.storage.csv_storage import CsvStorage
 
 # Mock data for TREATMENT_FEES_CSV
 MOCK_TREATMENT_FEES_CSV_DATA = """Department,Prescription,Fee
@@ -26,14 +31,25 @@ MOCK_TREATMENT_FEES_CSV_DATA = """Department,Prescription,Fee
 class TestPaymentService(unittest.TestCase):
 
     def setUp(self):
-        # Clear the in-memory database before each test
-        _payments_db.clear()
+        # Start every test with an empty in-memory payment ledger
+        set_payment_ledger(PaymentLedger())
+        self.addCleanup(set_payment_ledger, None)
         self.patient_id = "test_patient_001"
         self.amount = 10000
         self.method = "card"
+        # Fee data comes from a temporary treatment_fees.csv
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.fees_csv = os.path.join(self.tmp_dir.name, "treatment_fees.csv")
+        with open(self.fees_csv, "w", encoding="utf-8") as f:
+            f.write(MOCK_TREATMENT_FEES_CSV_DATA)
+        set_storage(CsvStorage(RESERVATIONS_CSV, self.fees_csv))
+
+    def tearDown(self):
+        set_storage(None)
+        self.tmp_dir.cleanup()
 
     def test_process_new_payment(self):
-        initial_db_size = len(_payments_db)
+        initial_db_size = len(get_payment_ledger())
         payment_id = process_new_payment(self.patient_id, self.amount, self.method)
 
         self.assertIsNotNone(payment_id)
@@ -44,13 +60,16 @@ class TestPaymentService(unittest.TestCase):
         except ValueError:
             self.fail("payment_id is not a valid UUID v4 string")
 
-        self.assertEqual(len(_payments_db), initial_db_size + 1)
-        new_payment_record = _payments_db[-1]
+        self.assertEqual(len(get_payment_ledger()), initial_db_size + 1)
+        new_payment_record = get_payment_ledger().get(payment_id)
         self.assertEqual(new_payment_record["payment_id"], payment_id)
         self.assertEqual(new_payment_record["patient_id"], self.patient_id)
         self.assertEqual(new_payment_record["amount"], self.amount)
         self.assertEqual(new_payment_record["method"], self.method)
         self.assertEqual(new_payment_record["status"], "completed")
+        # A real ISO timestamp (retention is based on it)
+        datetime.fromisoformat(new_payment_record["timestamp"])
+        self.assertEqual(get_patient_payments(self.patient_id), [new_payment_record])
 
     def test_get_payment_details_existing(self):
         # Add a payment record first
@@ -66,12 +85,7 @@ class TestPaymentService(unittest.TestCase):
         retrieved_details = get_payment_details(non_existing_id)
         self.assertIsNone(retrieved_details)
 
-    @patch('app.services.payment_service.os.path.exists', return_value=True)
-    @patch('builtins.open')
-    def test_load_department_prescriptions_valid_department(self, mock_open_func, mock_path_exists):
-        mock_csv_file = mock_open(read_data=MOCK_TREATMENT_FEES_CSV_DATA)
-        mock_open_func.return_value = mock_csv_file.return_value
-
+    def test_load_department_prescriptions_valid_department(self):
         department = "내과"
         # Patch random.sample to control selection for testing counts and content
         # The service selects min(2, len), min(3, len) items. "내과" has 2 items.
@@ -101,12 +115,7 @@ class TestPaymentService(unittest.TestCase):
             self.assertEqual(result["total_fee"], 11000)
             mock_random_sample.assert_called_once() # Ensure random.sample was called
 
-    @patch('app.services.payment_service.os.path.exists', return_value=True)
-    @patch('builtins.open')
-    def test_load_department_prescriptions_department_not_found(self, mock_open_func, mock_path_exists):
-        mock_csv_file = mock_open(read_data=MOCK_TREATMENT_FEES_CSV_DATA)
-        mock_open_func.return_value = mock_csv_file.return_value
-
+    def test_load_department_prescriptions_department_not_found(self):
         department = "안과" # Not in MOCK_TREATMENT_FEES_CSV_DATA
         result = load_department_prescriptions(department)
 
@@ -115,8 +124,8 @@ class TestPaymentService(unittest.TestCase):
         self.assertEqual(result.get("prescriptions", []), []) # or prescriptions_for_display
         self.assertEqual(result.get("total_fee"), 0)
 
-    @patch('app.services.payment_service.os.path.exists', return_value=False)
-    def test_load_department_prescriptions_csv_not_found(self, mock_path_exists):
+    def test_load_department_prescriptions_csv_not_found(self):
+        os.remove(self.fees_csv)
         department = "내과"
         result = load_department_prescriptions(department)
 
@@ -125,14 +134,10 @@ class TestPaymentService(unittest.TestCase):
         self.assertEqual(result.get("prescriptions", []), [])
         self.assertEqual(result.get("total_fee"), 0)
 
-    @patch('app.services.payment_service.os.path.exists', return_value=True)
-    @patch('builtins.open')
-    def test_load_department_prescriptions_random_selection_logic(self, mock_open_func, mock_path_exists):
+    def test_load_department_prescriptions_random_selection_logic(self):
         # Test with a department that has more than 3 items to check random sampling range
         # For this, we need to modify the mock CSV data or use a different department
         # Let's use '정형외과' which has 2 items, so 2 items should be selected.
-        mock_csv_file = mock_open(read_data=MOCK_TREATMENT_FEES_CSV_DATA)
-        mock_open_func.return_value = mock_csv_file.return_value
         department = "정형외과" # Has 2 items in CSV
 
         # random.sample will be called to select 2 items from 2 available
@@ -154,13 +159,8 @@ class TestPaymentService(unittest.TestCase):
             # For 2 items, num_to_select is random.randint(min(2,2), min(3,2)) -> randint(2,2) -> 2
             mock_random_sample.assert_called_once_with(unittest.mock.ANY, 2)
 
-    @patch('app.services.payment_service.os.path.exists', return_value=True)
-    @patch('builtins.open')
     @patch('app.services.payment_service.random.sample') # Mock random.sample
-    def test_load_department_prescriptions_unexpected_error(self, mock_random_sample, mock_open_func, mock_path_exists):
-        mock_csv_file = mock_open(read_data=MOCK_TREATMENT_FEES_CSV_DATA)
-        mock_open_func.return_value = mock_csv_file.return_value
-
+    def test_load_department_prescriptions_unexpected_error(self, mock_random_sample):
         # Configure random.sample to raise an unexpected error
         mock_random_sample.side_effect = RuntimeError("Simulated unexpected error from random.sample")
 
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch, mock_open, MagicMock
 import os
+import tempfile
 from datetime import datetime
 import sys
 
@@ -17,6 +18,9 @@ from app.services.reception_service import (
     SYMPTOMS, # Import for context if needed
     SYM_TO_DEPT # Import for context if needed
 )
+from app.services.ticket_sequencer import TicketSequencer, set_ticket_sequencer
+from app.storage import set_storage, TREATMENT_FEES_CSV
+from app.storage.csv_storage import CsvStorage
 
 MOCK_RESERVATIONS_CSV_DATA = """name,rrn,department,time,location,doctor,status,transcription,amount
 김예약,850101-1234567,내과,10:00,본관1층,닥터김,Pending,,0
@@ -25,12 +29,19 @@ MOCK_RESERVATIONS_CSV_DATA = """name,rrn,department,time,location,doctor,status,
 
 class TestReceptionService(unittest.TestCase):
 
-    @patch('app.services.reception_service.os.path.exists', return_value=True)
-    @patch('builtins.open')
-    def test_lookup_reservation_existing(self, mock_open_func, mock_path_exists):
-        mock_csv_file = mock_open(read_data=MOCK_RESERVATIONS_CSV_DATA)
-        mock_open_func.return_value = mock_csv_file.return_value
+    def setUp(self):
+        # Reservations are served by the storage backend, so point it at a real temp CSV
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.resv_csv = os.path.join(self.tmp_dir.name, "reservations.csv")
+        with open(self.resv_csv, "w", encoding="utf-8") as f:
+            f.write(MOCK_RESERVATIONS_CSV_DATA)
+        set_storage(CsvStorage(self.resv_csv, TREATMENT_FEES_CSV))
 
+    def tearDown(self):
+        set_storage(None)
+        self.tmp_dir.cleanup()
+
+    def test_lookup_reservation_existing(self):
         name = "김예약"
         rrn = "850101-1234567"
         result = lookup_reservation(name, rrn)
@@ -43,19 +54,14 @@ class TestReceptionService(unittest.TestCase):
         self.assertEqual(result["transcription"], "")
         self.assertEqual(result["amount"], "0") # Values from DictReader are strings
 
-    @patch('app.services.reception_service.os.path.exists', return_value=True)
-    @patch('builtins.open')
-    def test_lookup_reservation_non_existing(self, mock_open_func, mock_path_exists):
-        mock_csv_file = mock_open(read_data=MOCK_RESERVATIONS_CSV_DATA)
-        mock_open_func.return_value = mock_csv_file.return_value
-
+    def test_lookup_reservation_non_existing(self):
         name = "최미예약"
         rrn = "991212-2000000"
         result = lookup_reservation(name, rrn)
         self.assertIsNone(result)
 
-    @patch('app.services.reception_service.os.path.exists', return_value=False)
-    def test_lookup_reservation_csv_not_found(self, mock_path_exists):
+    def test_lookup_reservation_csv_not_found(self):
+        os.remove(self.resv_csv)
         name = "김예약"
         rrn = "850101-1234567"
         result = lookup_reservation(name, rrn)
@@ -152,37 +158,17 @@ class TestReceptionService(unittest.TestCase):
         mock_new_ticket.assert_called_once_with(expected_department)
 
     def test_new_ticket_format(self):
-        # Test the actual new_ticket function's format
-        department = "정형외과"
-        # Mock datetime and random.randint for predictable ticket numbers
-        with patch('app.services.reception_service.datetime') as mock_datetime, \
-             patch('app.services.reception_service.random.randint') as mock_randint:
-
-            mock_now = MagicMock()
-            mock_now.strftime.return_value = "100000" # HHMMSS
-            mock_datetime.now.return_value = mock_now
-            mock_randint.return_value = 50 # Random int part
-
-            ticket = new_ticket(department)
-
-            # Expected format: First letter of department + HHMMSS + random_int
-            # 정형외과 -> 정
-            # For simplicity, using first char '정'. Actual service uses department[0]
-            # If SYM_TO_DEPT values are Korean, department[0] will be Korean.
-            # The service has: dept_code = department[0] if department else "X"
-            # So for "정형외과", dept_code will be "정"
-            expected_ticket_prefix = department[0]
-            self.assertTrue(ticket.startswith(expected_ticket_prefix))
-            self.assertIn("10000050", ticket) # HHMMSS + randint
-            mock_datetime.now.assert_called_once()
-            mock_randint.assert_called_once_with(10,99)
-
-    @patch('app.services.reception_service.os.path.exists', return_value=True)
-    @patch('builtins.open')
-    def test_fake_scan_rrn_reads_from_csv(self, mock_open_func, mock_path_exists):
-        mock_csv_file = mock_open(read_data=MOCK_RESERVATIONS_CSV_DATA)
-        mock_open_func.return_value = mock_csv_file.return_value
-
+        # Department code + that day's sequence number, per department
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            set_ticket_sequencer(TicketSequencer(os.path.join(tmp_dir, "tickets.json")))
+            self.addCleanup(set_ticket_sequencer, None)
+            self.assertEqual(new_ticket("정형외과"), "C-001")
+            self.assertEqual(new_ticket("정형외과"), "C-002")
+            self.assertEqual(new_ticket("내과"), "A-001")
+            self.assertEqual(new_ticket("내분비내과"), "Q-001")  # same first syllable, own code
+            self.assertEqual(new_ticket("없는과"), "X-001")
+
+    def test_fake_scan_rrn_reads_from_csv(self):
         with patch('app.services.reception_service.random.choice') as mock_random_choice:
             # Simulate random.choice returning the first entry from our mock CSV data
             # The data read by csv.DictReader will be a list of dicts
@@ -199,9 +185,9 @@ class TestReceptionService(unittest.TestCase):
             self.assertEqual(rrn, "850101-1234567")
             mock_random_choice.assert_called_once()
 
-    @patch('app.services.reception_service.os.path.exists', return_value=False)
-    def test_fake_scan_rrn_csv_not_found_fallback(self, mock_path_exists):
+    def test_fake_scan_rrn_csv_not_found_fallback(self):
         # Test fallback behavior when CSV is not found
+        os.remove(self.resv_csv)
         name, rrn = fake_scan_rrn()
         # Default fallback from the function
         self.assertEqual(name, "이서연")
@@ -0,0 +1,217 @@
+import unittest
+from unittest.mock import patch
+import csv
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.reservation_store import ReservationStore, get_reservation_store
+from app.storage.base import VersionConflictError
+
+MOCK_RESERVATIONS_CSV_DATA = """name,rrn,time,department,location,doctor,status,prescription_names,total_fee
+김예약,850101-1234567,2025-06-19 08:20,내과,본관1층,닥터김,Pending,,0
+박테스트,920202-2345678,2025-06-19 09:00,외과,별관2층,닥터박,Registered,,0
+"""
+
+SHARED_RRN = "850101-1234567"
+
+
+def _hammer_updates(csv_path, own_rrn, iterations):
+    """Stress worker: read-modify-write on a shared row + blind writes on its own row."""
+    store = ReservationStore(csv_path, compact_threshold=5)
+    try:
+        for i in range(iterations):
+            while True:
+                row = store.get_by_rrn(SHARED_RRN)
+                try:
+                    store.update(SHARED_RRN, {"total_fee": int(row["total_fee"]) + 1},
+                                 expected_version=row["version"])
+                    break
+                except VersionConflictError:
+                    continue
+            store.update(own_rrn, {"total_fee": i + 1})
+    finally:
+        store.close()
+
+
+class TestReservationStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "reservations.csv")
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write(MOCK_RESERVATIONS_CSV_DATA)
+        self.store = ReservationStore(self.csv_path)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def _read_rows(self):
+        with open(self.csv_path, newline="", encoding="utf-8-sig") as f:
+            return list(csv.DictReader(f))
+
+    def test_lookup_by_rrn_and_name_rrn(self):
+        self.assertEqual(self.store.get_by_rrn("920202-2345678")["name"], "박테스트")
+        self.assertEqual(self.store.find("김예약", "850101-1234567")["department"], "내과")
+        self.assertIsNone(self.store.find("박테스트", "850101-1234567"))
+        self.assertIsNone(self.store.get_by_rrn("000000-0000000"))
+
+    def test_csv_is_parsed_once_while_unchanged(self):
+        self.store.get_by_rrn("920202-2345678")
+        with patch.object(self.store, "_load", wraps=self.store._load) as mock_load:
+            for _ in range(5):
+                self.store.find("김예약", "850101-1234567")
+            mock_load.assert_not_called()
+
+    def test_reloads_when_file_changes_on_disk(self):
+        self.assertEqual(len(self.store), 2)
+        with open(self.csv_path, "a", encoding="utf-8") as f:
+            f.write("이신규,990909-1999999,2025-06-19 10:00,피부과,,,Pending,,0\n")
+        self.assertEqual(self.store.get_by_rrn("990909-1999999")["name"], "이신규")
+        self.assertEqual(len(self.store), 3)
+
+    def test_returned_rows_are_copies(self):
+        row = self.store.get_by_rrn("850101-1234567")
+        row["status"] = "Tampered"
+        self.assertEqual(self.store.get_by_rrn("850101-1234567")["status"], "Pending")
+
+    def test_update_is_journaled_not_rewritten(self):
+        self.assertTrue(self.store.update("850101-1234567", {"status": "Registered", "ticket": "X1"}))
+        self.assertEqual(self.store.get_by_rrn("850101-1234567")["status"], "Registered")
+        # The base CSV is untouched; the change lives in the journal
+        self.assertEqual(self._read_rows()[0]["status"], "Pending")
+        self.assertTrue(os.path.exists(self.store.journal_path))
+        # A fresh store (e.g. after a restart) replays the journal on top of the CSV
+        reopened = ReservationStore(self.csv_path)
+        self.assertEqual(reopened.get_by_rrn("850101-1234567")["status"], "Registered")
+        self.assertNotIn("ticket", reopened.get_by_rrn("850101-1234567"))
+        self.assertFalse(self.store.update("000000-0000000", {"status": "Paid"}))
+
+    def test_compact_folds_journal_into_snapshot(self):
+        self.store.update("850101-1234567", {"status": "Registered"})
+        self.store.update("850101-1234567", {"status": "Paid", "total_fee": 12000})
+        self.store.compact()
+        rows = self._read_rows()
+        self.assertEqual(rows[0]["status"], "Paid")
+        self.assertEqual(rows[0]["total_fee"], "12000")
+        self.assertFalse(os.path.exists(self.store.journal_path))
+        self.assertFalse(os.path.exists(self.store.compacting_path))
+        self.assertEqual(self.store.get_by_rrn("850101-1234567")["status"], "Paid")
+
+    def test_interrupted_compaction_is_replayed(self):
+        self.store.update("920202-2345678", {"status": "Paid"})
+        self.store.sync()
+        # Simulate a crash right after the journal was renamed aside
+        os.replace(self.store.journal_path, self.store.compacting_path)
+        reopened = ReservationStore(self.csv_path)
+        self.assertEqual(reopened.get_by_rrn("920202-2345678")["status"], "Paid")
+        reopened.compact()
+        self.assertFalse(os.path.exists(self.store.compacting_path))
+        self.assertEqual(self._read_rows()[1]["status"], "Paid")
+
+    def test_compaction_interrupted_after_snapshot_is_not_replayed_twice(self):
+        new_patient = {"name": "최신규", "rrn": "010101-3000000", "status": "Registered"}
+        self.store.append(new_patient, ["name", "rrn", "status"])
+        # Simulate a crash after the snapshot replaced the CSV but before the journal was removed
+        with patch("app.services.reservation_store.os.remove"):
+            self.store.compact()
+        self.assertTrue(os.path.exists(self.store.compacting_path))
+        reopened = ReservationStore(self.csv_path)
+        self.assertEqual(len(reopened), 3)
+        reopened.compact()
+        self.assertEqual(len(self._read_rows()), 3)
+
+    def test_second_registration_of_same_person_is_kept(self):
+        new_patient = {"name": "김예약", "rrn": "850101-1234567", "status": "Registered"}
+        self.store.append(new_patient, ["name", "rrn", "status"])
+        self.assertEqual(len(self.store), 3)
+        # The index keeps pointing at the first row, as it does for rows loaded from the CSV
+        self.assertEqual(self.store.get_by_rrn("850101-1234567")["status"], "Pending")
+        self.store.compact()
+        self.assertEqual([row["status"] for row in self._read_rows()], ["Pending", "Registered", "Registered"])
+        self.assertEqual(len(ReservationStore(self.csv_path)), 3)
+
+    def test_torn_journal_tail_is_ignored(self):
+        self.store.update("850101-1234567", {"status": "Registered"})
+        with open(self.store.journal_path, "ab") as f:
+            f.write(b'{"op": "update", "rrn": "850101-1234567", "fields": {"sta')
+        reopened = ReservationStore(self.csv_path)
+        self.assertEqual(reopened.get_by_rrn("850101-1234567")["status"], "Registered")
+
+    def test_background_compactor_runs_at_threshold(self):
+        store = ReservationStore(self.csv_path, compact_threshold=3, compact_interval=3600)
+        try:
+            for fee in (1000, 2000, 3000):
+                store.update("850101-1234567", {"total_fee": fee})
+            for _ in range(100):
+                if not os.path.exists(store.journal_path):
+                    break
+                time.sleep(0.02)
+            self.assertEqual(self._read_rows()[0]["total_fee"], "3000")
+        finally:
+            store.close()
+
+    def test_append_uses_existing_header(self):
+        self.store.append({"name": "최신규", "rrn": "010101-3000000", "status": "Registered",
+                           "ticket_number": "A1"}, ["name", "rrn", "ticket_number", "status"])
+        self.assertEqual(self.store.find("최신규", "010101-3000000")["rrn"], "010101-3000000")
+        self.store.compact()
+        rows = self._read_rows()
+        self.assertEqual(rows[-1]["name"], "최신규")
+        self.assertEqual(rows[-1]["status"], "Registered")
+        self.assertEqual(list(rows[-1].keys()), list(rows[0].keys()))
+
+    def test_update_bumps_version_and_checks_expected(self):
+        row = self.store.get_by_rrn("850101-1234567")
+        self.assertEqual(row["version"], "0")
+        self.assertTrue(self.store.update("850101-1234567", {"status": "Registered", "version": 99},
+                                          expected_version=row["version"]))
+        self.assertEqual(self.store.get_by_rrn("850101-1234567")["version"], "1")
+        # A second writer holding the stale version must not overwrite the change
+        with self.assertRaises(VersionConflictError):
+            self.store.update("850101-1234567", {"status": "Paid"}, expected_version=row["version"])
+        self.assertEqual(self.store.get_by_rrn("850101-1234567")["status"], "Registered")
+        self.store.compact()
+        self.assertEqual(self._read_rows()[0]["version"], "1")
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork()")
+    def test_concurrent_processes_do_not_lose_writes(self):
+        processes, iterations = 6, 40
+        own_rrns = [f"000000-{n:07d}" for n in range(processes)]
+        for rrn in own_rrns:
+            self.store.append({"name": "부하", "rrn": rrn, "total_fee": 0}, [])
+        self.store.compact()
+
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=_hammer_updates, args=(self.csv_path, rrn, iterations))
+                   for rrn in own_rrns]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            self.assertEqual(worker.exitcode, 0)
+
+        reopened = ReservationStore(self.csv_path)
+        shared = reopened.get_by_rrn(SHARED_RRN)
+        self.assertEqual(int(shared["total_fee"]), processes * iterations)
+        self.assertEqual(int(shared["version"]), processes * iterations)
+        for rrn in own_rrns:
+            self.assertEqual(reopened.get_by_rrn(rrn)["total_fee"], str(iterations))
+
+    def test_missing_file_raises(self):
+        os.remove(self.csv_path)
+        with self.assertRaises(FileNotFoundError):
+            self.store.get_by_rrn("850101-1234567")
+
+    def test_get_reservation_store_is_shared_per_path(self):
+        self.assertIs(get_reservation_store(self.csv_path), get_reservation_store(self.csv_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
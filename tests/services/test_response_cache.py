@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import json
+import os
+import sys
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.response_cache import ResponseCache, normalize_question
+from app.services.chatbot_service import generate_chatbot_response, stream_chatbot_response, reset_gemini_client
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_normalized_questions_share_a_key(self):
+        self.assertEqual(normalize_question("화장실 어디예요?"), normalize_question(" 화장실어디예요 "))
+        cache = ResponseCache()
+        cache.put("화장실 어디예요?", "1층 복도 끝에 있습니다.")
+        self.assertEqual(cache.get("화장실  어디예요"), "1층 복도 끝에 있습니다.")
+        self.assertIsNone(cache.get("약국 어디예요?"))
+        self.assertEqual(cache.stats(), {"hits": 1, "similar_hits": 0, "misses": 1, "entries": 1, "hit_rate": 0.5})
+
+    def test_ttl_and_lru_eviction(self):
+        clock = FakeClock()
+        cache = ResponseCache(max_entries=2, ttl_seconds=10, clock=clock)
+        cache.put("운영시간", "9시부터 18시까지입니다.")
+        cache.put("화장실", "1층에 있습니다.")
+        cache.get("운영시간")  # 운영시간 becomes most recently used
+        cache.put("주차장", "지하 1층입니다.")
+        self.assertIsNone(cache.get("화장실"))
+        self.assertEqual(cache.get("운영시간"), "9시부터 18시까지입니다.")
+        clock.now = 11
+        self.assertIsNone(cache.get("운영시간"))
+
+    def test_similarity_tier_is_optional(self):
+        exact_only = ResponseCache()
+        similar = ResponseCache(similarity_threshold=0.5)
+        for cache in (exact_only, similar):
+            cache.put("운영시간이 어떻게 돼요?", "9시부터 18시까지입니다.")
+        self.assertIsNone(exact_only.get("운영시간이 어떻게 되나요"))
+        self.assertEqual(similar.get("운영시간이 어떻게 되나요"), "9시부터 18시까지입니다.")
+        self.assertIsNone(similar.get("화장실 어디예요?"))
+        self.assertEqual(similar.stats()["similar_hits"], 1)
+
+
+class TestChatbotFaqCache(unittest.TestCase):
+
+    def setUp(self):
+        reset_gemini_client()
+        self.addCleanup(reset_gemini_client)
+        self.cache = ResponseCache()
+        patchers = [
+            patch.dict(os.environ, {"GEMINI_API_KEY": "test_key"}),
+            patch('app.services.chatbot_service.genai.configure'),
+            patch('app.services.chatbot_service.genai.GenerativeModel'),
+            patch('app.services.chatbot_service.get_response_cache', return_value=self.cache),
+        ]
+        mocks = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+        self.mock_model_instance = mocks[2].return_value
+
+    def _respond_with(self, response_dict):
+        mock_response = MagicMock()
+        mock_part = MagicMock()
+        mock_part.text = json.dumps(response_dict, ensure_ascii=False)
+        mock_response.candidates[0].content.parts = [mock_part]
+        self.mock_model_instance.generate_content.return_value = mock_response
+
+    def test_repeated_general_question_skips_the_model(self):
+        self._respond_with({"intent": "general", "reply": "화장실은 1층 복도 끝에 있습니다."})
+        first = generate_chatbot_response("화장실 어디예요?")
+        again = generate_chatbot_response("화장실 어디예요")
+        self.assertEqual(first, again)
+        self.mock_model_instance.generate_content.assert_called_once()
+        events = list(stream_chatbot_response("화장실 어디예요?"))
+        self.assertEqual(events[-1], ("result", {"reply": "화장실은 1층 복도 끝에 있습니다."}))
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_personal_data_and_service_intents_are_never_cached(self):
+        self._respond_with({"intent": "general", "reply": "홍길동님, 안녕하세요."})
+        generate_chatbot_response("제 이름은 홍길동이고 900101-1234567 이에요 안녕하세요")
+        with patch('app.services.chatbot_service.handle_certificate_request', return_value={"reply": "발급"}):
+            self._respond_with({"intent": "certificate", "parameters": {}, "user_query": "서류 하나 떼고 싶어요"})
+            generate_chatbot_response("서류 하나 떼고 싶어요")
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
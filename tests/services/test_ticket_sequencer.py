@@ -0,0 +1,62 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.ticket_sequencer import TicketSequencer, DEPARTMENT_CODES
+
+
+class TestTicketSequencer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "tickets.json")
+        self.now = datetime(2025, 6, 19, 9, 0)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def sequencer(self):
+        return TicketSequencer(self.path, clock=lambda: self.now)
+
+    def test_codes_are_unique(self):
+        self.assertEqual(len(set(DEPARTMENT_CODES.values())), len(DEPARTMENT_CODES))
+
+    def test_counters_persist_and_reset_daily(self):
+        self.assertEqual(self.sequencer().issue("내과"), "A-001")
+        # A restarted worker continues from the saved counter
+        self.assertEqual(self.sequencer().issue("내과"), "A-002")
+        self.assertEqual(self.sequencer().counters(), {"A": 2})
+        self.now = datetime(2025, 6, 20, 8, 30)
+        self.assertEqual(self.sequencer().issue("내과"), "A-001")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["date"], "2025-06-20")
+
+    def test_concurrent_workers_never_share_a_number(self):
+        # Separate instances hold separate lock file descriptors, like separate worker processes
+        workers = [self.sequencer() for _ in range(4)]
+        tickets = []
+        lock = threading.Lock()
+
+        def issue_many(sequencer):
+            issued = [sequencer.issue("소아과") for _ in range(50)]
+            with lock:
+                tickets.extend(issued)
+
+        threads = [threading.Thread(target=issue_many, args=(worker,)) for worker in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(tickets)), 200)
+        self.assertEqual(max(tickets), "D-200")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import create_app
+from app.services.tts_service import (
+    EspeakEngine, TtsAudioCache, TtsEngineError, get_speech, set_tts_cache, set_tts_engine,
+)
+
+
+class FakeEngine:
+    name = "fake"
+    mimetype = "audio/wav"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, lang, voice, rate):
+        with self._lock:
+            self.calls.append((text, lang, voice, rate))
+        time.sleep(self.delay)
+        return f"RIFF:{lang}:{voice}:{rate}:{text}".encode("utf-8")
+
+
+class FailingEngine(FakeEngine):
+    def synthesize(self, text, lang, voice, rate):
+        raise TtsEngineError("engine offline")
+
+
+class TestTtsService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, "tts_cache")
+        self.engine = FakeEngine()
+        set_tts_engine(self.engine)
+        set_tts_cache(TtsAudioCache(self.cache_dir))
+
+    def tearDown(self):
+        set_tts_engine(None)
+        set_tts_cache(None)
+        self.tmp_dir.cleanup()
+
+    def test_repeated_text_is_served_from_cache(self):
+        first = get_speech("접수가  완료되었습니다.", lang="ko")
+        second = get_speech(" 접수가 완료되었습니다. ", lang="ko")
+        self.assertEqual(first["audio"], second["audio"])
+        self.assertEqual(first["key"], second["key"])
+        self.assertEqual(len(self.engine.calls), 1)
+        # A new worker with an empty memory cache reads the disk copy
+        set_tts_cache(TtsAudioCache(self.cache_dir))
+        self.assertEqual(get_speech("접수가 완료되었습니다.", lang="ko")["audio"], first["audio"])
+        self.assertEqual(len(self.engine.calls), 1)
+        # Different rate → different audio
+        get_speech("접수가 완료되었습니다.", lang="ko", rate="200")
+        self.assertEqual(len(self.engine.calls), 2)
+
+    def test_concurrent_identical_requests_synthesize_once(self):
+        self.engine.delay = 0.2
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get_speech("수납 창구로 가세요", lang="ko")))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.engine.calls), 1)
+        self.assertEqual(len({result["audio"] for result in results}), 1)
+
+    def test_invalid_input_and_engine_errors(self):
+        self.assertEqual(get_speech("   ")["status_code"], 400)
+        self.assertEqual(get_speech("x" * 1000)["status_code"], 400)
+        self.assertEqual(get_speech("안녕", lang="ko; rm -rf")["status_code"], 400)
+        self.assertEqual(get_speech("안녕", rate="fast")["status_code"], 400)
+        set_tts_engine(FailingEngine())
+        self.assertEqual(get_speech("안녕")["status_code"], 503)
+        with self.assertRaises(TtsEngineError):
+            EspeakEngine(executable="/nonexistent/espeak-ng").synthesize("안녕", "ko", "", 160)
+
+    def test_disk_cache_is_size_bounded(self):
+        cache = TtsAudioCache(self.cache_dir, max_disk_bytes=250, max_memory_bytes=0)
+        for i in range(5):
+            cache.put(f"key{i}", b"x" * 100)
+            time.sleep(0.01)
+        self.assertIsNone(cache.get("key0"))
+        self.assertEqual(cache.get("key4"), b"x" * 100)
+
+    def test_route_supports_etag_and_range(self):
+        client = create_app().test_client()
+        response = client.get("/tts", query_string={"text": "안녕하세요", "lang": "ko"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "audio/wav")
+        etag = response.headers["ETag"]
+        self.assertEqual(client.get("/tts", query_string={"text": "안녕하세요", "lang": "ko"},
+                                    headers={"If-None-Match": etag}).status_code, 304)
+        partial = client.get("/tts", query_string={"text": "안녕하세요", "lang": "ko"},
+                             headers={"Range": "bytes=0-3"})
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.data, b"RIFF")
+        self.assertEqual(client.get("/tts").status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
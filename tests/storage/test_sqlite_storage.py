@@ -0,0 +1,113 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.storage import set_storage
+from app.storage.sqlite_storage import SqliteStorage
+from app.services.reception_service import lookup_reservation, update_reservation_status
+from app.services.payment_service import (
+    process_new_payment,
+    get_payment_details,
+    load_department_prescriptions,
+    update_reservation_with_payment_details,
+)
+from app.services.payment_ledger import PaymentLedger, set_payment_ledger
+from app.services.certificate_service import get_prescription_data_for_pdf
+
+MOCK_RESERVATIONS_CSV_DATA = """name,rrn,time,department,location,doctor,status,prescription_names,total_fee
+김예약,850101-1234567,2025-06-19 08:20,내과,본관1층,닥터김,Registered,,0
+박테스트,920202-2345678,2025-06-19 09:00,외과,별관2층,닥터박,Pending,,0
+"""
+
+MOCK_TREATMENT_FEES_CSV_DATA = """Department,Prescription,Fee
+내과,감기약 처방,5000
+내과,소화제 처방,6000
+외과,드레싱,8000
+"""
+
+
+class TestSqliteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.resv_csv = os.path.join(self.tmp_dir.name, "reservations.csv")
+        self.fees_csv = os.path.join(self.tmp_dir.name, "treatment_fees.csv")
+        with open(self.resv_csv, "w", encoding="utf-8") as f:
+            f.write(MOCK_RESERVATIONS_CSV_DATA)
+        with open(self.fees_csv, "w", encoding="utf-8") as f:
+            f.write(MOCK_TREATMENT_FEES_CSV_DATA)
+        self.storage = SqliteStorage(os.path.join(self.tmp_dir.name, "kiosk.db"))
+        self.counts = self.storage.import_csv(self.resv_csv, self.fees_csv)
+        set_storage(self.storage)
+        set_payment_ledger(PaymentLedger())
+
+    def tearDown(self):
+        set_storage(None)
+        set_payment_ledger(None)
+        self.storage.close()
+        self.tmp_dir.cleanup()
+
+    def test_import_csv_counts_and_wal_mode(self):
+        self.assertEqual(self.counts, {"reservations": 2, "treatment_fees": 3})
+        mode = self.storage._connect().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+        # Re-running the import replaces rather than duplicates
+        self.storage.import_csv(self.resv_csv, self.fees_csv)
+        self.assertEqual(len(self.storage.list_reservations()), 2)
+
+    def test_indexes_exist(self):
+        names = {row["name"] for row in self.storage._connect().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_reservations_rrn", names)
+        self.assertIn("idx_reservations_department", names)
+        self.assertIn("idx_treatment_fees_department", names)
+
+    def test_reception_service_uses_sqlite(self):
+        row = lookup_reservation("박테스트", "920202-2345678")
+        self.assertEqual(row["department"], "외과")
+        self.assertEqual(row["ticket_number"], "")
+        self.assertTrue(update_reservation_status("920202-2345678", "Registered", ticket_number="외1"))
+        row = self.storage.get_reservation("920202-2345678")
+        self.assertEqual(row["status"], "Registered")
+        self.assertEqual(row["ticket_number"], "외1")
+        self.assertFalse(update_reservation_status("000000-0000000", "Registered"))
+
+    def test_payment_flow_uses_sqlite(self):
+        result = load_department_prescriptions("내과")
+        self.assertNotIn("error", result)
+        self.assertTrue(set(result["prescription_names"]) <= {"감기약 처방", "소화제 처방"})
+
+        self.assertTrue(update_reservation_with_payment_details(
+            "850101-1234567", result["prescription_names"], result["total_fee"]))
+        status, data = get_prescription_data_for_pdf("850101-1234567", "내과")
+        self.assertEqual(status, "OK")
+        self.assertEqual(data["total_fee"], result["total_fee"])
+        self.assertEqual(sum(item["fee"] for item in data["prescriptions"]), result["total_fee"])
+
+    def test_version_column_guards_concurrent_updates(self):
+        row = self.storage.get_reservation("850101-1234567")
+        self.assertEqual(row["version"], "0")
+        self.assertTrue(update_reservation_with_payment_details(
+            "850101-1234567", ["감기약 처방"], 5000, expected_version=row["version"]))
+        self.assertEqual(self.storage.get_reservation("850101-1234567")["version"], "1")
+        # Stale version: rejected, nothing is overwritten
+        self.assertFalse(update_reservation_status(
+            "850101-1234567", "Registered", expected_version=row["version"]))
+        self.assertEqual(self.storage.get_reservation("850101-1234567")["status"], "Paid")
+
+    def test_payments_are_shared_through_storage(self):
+        payment_id = process_new_payment("850101-1234567", 11000, "card")
+        # Another worker has an empty in-memory ledger but the same database
+        set_payment_ledger(PaymentLedger())
+        record = get_payment_details(payment_id)
+        self.assertIsNotNone(record)
+        self.assertEqual(record["amount"], 11000)
+        self.assertEqual(record["method"], "card")
+
+
+if __name__ == '__main__':
+    unittest.main()
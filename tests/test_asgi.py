@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import json
+import os
+import sys
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import asgiref  # noqa: F401
+except ImportError:  # pragma: no cover - asgiref is listed in requirements.txt
+    asgiref = None
+
+from app import create_app
+from app.utils.limiter import AsyncLimiter
+
+
+async def _call(app, path, body, method="POST"):
+    """Minimal ASGI client: returns (status, headers, body)."""
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "raw_path": path.encode(), "query_string": b"",
+             "headers": [(b"content-type", b"application/json")], "server": ("test", 80),
+             "scheme": "http", "http_version": "1.1", "root_path": ""}
+    await app(scope, receive, send)
+    start = sent[0]
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in sent[1:])
+
+
+@unittest.skipUnless(asgiref, "asgiref not installed")
+class TestAsgiChatbot(unittest.TestCase):
+
+    def _app(self, limiter):
+        from app.asgi import create_asgi_app
+        return create_asgi_app(create_app(), limiter=limiter)
+
+    def test_hundreds_of_concurrent_chats_on_one_loop(self):
+        app = self._app(AsyncLimiter(max_in_flight=16, max_waiting=1000, max_wait=5))
+        peak = 0
+
+        async def fake_response(question, image=None, conversation_id=None):
+            nonlocal peak
+            peak = max(peak, app.limiter.in_flight)
+            await asyncio.sleep(0.05)  # model round-trip
+            return {"reply": f"answer to {question}"}
+
+        async def main():
+            bodies = [json.dumps({"message": f"q{i}"}).encode() for i in range(300)]
+            return await asyncio.gather(*(_call(app, "/api/chatbot", body) for body in bodies))
+
+        with patch('app.asgi.generate_chatbot_response_async', side_effect=fake_response):
+            results = asyncio.run(main())
+        self.assertTrue(all(status == 200 for status, _, _ in results))
+        self.assertEqual(json.loads(results[7][2]), {"reply": "answer to q7"})
+        self.assertEqual(peak, 16)
+
+    def test_saturated_returns_503_with_retry_after(self):
+        app = self._app(AsyncLimiter(max_in_flight=1, max_waiting=0, max_wait=3))
+
+        async def slow_response(question, image=None, conversation_id=None):
+            await asyncio.sleep(0.1)
+            return {"reply": "ok"}
+
+        async def main():
+            body = json.dumps({"message": "안녕하세요"}).encode()
+            return await asyncio.gather(*(_call(app, "/api/chatbot", body) for _ in range(3)))
+
+        with patch('app.asgi.generate_chatbot_response_async', side_effect=slow_response):
+            results = sorted(asyncio.run(main()), key=lambda result: result[0])
+        self.assertEqual([status for status, _, _ in results], [200, 503, 503])
+        self.assertEqual(results[1][1][b"retry-after"], b"3")
+
+    def test_local_commands_do_not_take_a_model_slot(self):
+        app = self._app(AsyncLimiter(max_in_flight=1, max_waiting=0, max_wait=1))
+
+        async def fake_response(question, image=None, conversation_id=None):
+            await asyncio.sleep(0.1)
+            return {"reply": "ok"}
+
+        async def main():
+            bodies = [json.dumps({"message": message}).encode()
+                      for message in ("안녕하세요", "접수할게요", "수납할게요", "안녕하세요")]
+            return await asyncio.gather(*(_call(app, "/api/chatbot", body) for body in bodies))
+
+        with patch('app.asgi.generate_chatbot_response_async', side_effect=fake_response):
+            results = asyncio.run(main())
+        # Only the second model-bound question finds the single slot taken
+        self.assertEqual([status for status, _, _ in results], [200, 200, 200, 503])
+
+        with patch('app.routes.chatbot.generate_chatbot_response', return_value={"reply": "ok"}), \
+                patch('app.routes.chatbot.chat_limiter.in_flight', 10 ** 6), \
+                patch('app.routes.chatbot.chat_limiter.max_waiting', 0):
+            client = create_app().test_client()
+            self.assertEqual(client.post('/api/chatbot', json={"message": "접수할게요"}).status_code, 200)
+            self.assertEqual(client.post('/api/chatbot', json={"message": "안녕하세요"}).status_code, 503)
+
+    def test_other_paths_are_served_by_flask(self):
+        app = self._app(AsyncLimiter(max_in_flight=1, max_waiting=0, max_wait=1))
+        status, _, _ = asyncio.run(_call(app, "/api/chatbot", b"not json"))
+        self.assertEqual(status, 400)
+        status, _, _ = asyncio.run(_call(app, "/certificate/download/" + "A" * 43, b"", method="GET"))
+        self.assertEqual(status, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
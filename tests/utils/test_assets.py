@@ -0,0 +1,92 @@
+import unittest
+import gzip
+import os
+import sys
+import tempfile
+
+from flask import Flask, render_template_string
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.utils.assets import IMMUTABLE_CACHE_CONTROL, build_assets, load_asset_manifest, register_assets
+
+CSS = 'body { background: url("../images/bg.webp") no-repeat; }\n' + "/* padding */\n" * 60
+
+
+class TestAssets(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.static_dir = os.path.join(self.tmp_dir.name, "static")
+        self.write("css/style.css", CSS.encode("utf-8"))
+        self.write("images/bg.webp", b"RIFF-webp-image")
+        self.write("js/script.js", b"console.log('kiosk');\n" * 40)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, relative, data):
+        path = os.path.join(self.static_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def make_app(self):
+        app = Flask(__name__, static_folder=self.static_dir)
+        register_assets(app)
+        return app
+
+    def test_build_fingerprints_and_rewrites_css(self):
+        result = build_assets(self.static_dir)
+        self.assertEqual(result["files"], 3)
+        self.assertEqual(result["compressed"], 2)  # the image is too small / not compressible
+        manifest = load_asset_manifest(self.static_dir)
+        self.assertRegex(manifest["css/style.css"], r"^css/style\.[0-9a-f]{10}\.css$")
+        dist = os.path.join(self.static_dir, "dist")
+        with open(os.path.join(dist, manifest["css/style.css"]), encoding="utf-8") as f:
+            css = f.read()
+        self.assertIn(f'url("../{manifest["images/bg.webp"].split("/", 1)[0]}/', css)
+        self.assertIn(os.path.basename(manifest["images/bg.webp"]), css)
+        with gzip.open(os.path.join(dist, manifest["js/script.js"] + ".gz")) as f:
+            self.assertEqual(f.read(), b"console.log('kiosk');\n" * 40)
+
+        # Changing a file keeps the previous build's copy, drops older ones
+        old_js = manifest["js/script.js"]
+        self.write("js/script.js", b"console.log('v2');\n" * 40)
+        build_assets(self.static_dir)
+        v2_js = load_asset_manifest(self.static_dir)["js/script.js"]
+        self.assertNotEqual(v2_js, old_js)
+        self.assertTrue(os.path.exists(os.path.join(dist, old_js)))
+        self.write("js/script.js", b"console.log('v3');\n" * 40)
+        result = build_assets(self.static_dir)
+        self.assertFalse(os.path.exists(os.path.join(dist, old_js)))
+        self.assertEqual(result["removed"], 2)  # old .js and its .gz
+
+    def test_asset_url_and_immutable_precompressed_responses(self):
+        app = self.make_app()
+        with app.test_request_context():
+            self.assertEqual(render_template_string("{{ asset_url('js/script.js') }}"), "/static/js/script.js")
+        build_assets(self.static_dir)
+        hashed = load_asset_manifest(self.static_dir)["js/script.js"]
+        with app.test_request_context():
+            self.assertEqual(render_template_string("{{ asset_url('js/script.js') }}"), f"/static/dist/{hashed}")
+
+        client = app.test_client()
+        response = client.get(f"/static/dist/{hashed}", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.headers["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertIn("javascript", response.mimetype)
+        self.assertEqual(gzip.decompress(response.data), b"console.log('kiosk');\n" * 40)
+
+        plain = client.get(f"/static/dist/{hashed}")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertEqual(plain.data, b"console.log('kiosk');\n" * 40)
+        # Unhashed originals keep the default caching
+        self.assertNotEqual(client.get("/static/js/script.js").headers.get("Cache-Control"), IMMUTABLE_CACHE_CONTROL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.utils.limiter import ThreadLimiter, AsyncLimiter, LimiterSaturated
+
+
+class TestThreadLimiter(unittest.TestCase):
+
+    def test_bounds_in_flight_and_rejects_when_queue_is_full(self):
+        limiter = ThreadLimiter(max_in_flight=2, max_waiting=1, max_wait=2)
+        release = threading.Event()
+        results = []
+
+        def worker():
+            try:
+                with limiter.slot():
+                    results.append(limiter.in_flight)
+                    release.wait(2)
+            except LimiterSaturated as e:
+                results.append(("busy", e.retry_after))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        # 2 run, 1 waits for a slot, the 4th finds the queue full
+        self.assertEqual(results.count(("busy", 2)), 1)
+        self.assertTrue(all(count <= 2 for count in results if isinstance(count, int)))
+        self.assertEqual((limiter.in_flight, limiter.waiting), (0, 0))
+
+    def test_waiting_times_out(self):
+        limiter = ThreadLimiter(max_in_flight=1, max_waiting=5, max_wait=0.05)
+        errors = []
+
+        def blocked():
+            try:
+                with limiter.slot():
+                    pass
+            except LimiterSaturated as e:
+                errors.append(e)
+
+        with limiter.slot():
+            thread = threading.Thread(target=blocked)
+            thread.start()
+            thread.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(limiter.waiting, 0)
+
+
+class TestAsyncLimiter(unittest.TestCase):
+
+    def test_many_tasks_share_few_slots(self):
+        limiter = AsyncLimiter(max_in_flight=8, max_waiting=500, max_wait=5)
+        peak = 0
+
+        async def chat():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        async def main():
+            await asyncio.gather(*(chat() for _ in range(300)))
+
+        asyncio.run(main())
+        self.assertEqual(peak, 8)
+        self.assertEqual((limiter.in_flight, limiter.waiting), (0, 0))
+
+    def test_saturation_raises(self):
+        limiter = AsyncLimiter(max_in_flight=1, max_waiting=1, max_wait=0.05)
+
+        async def hold():
+            async with limiter.slot():
+                await asyncio.sleep(0.2)
+
+        async def main():
+            return await asyncio.gather(hold(), hold(), hold(), return_exceptions=True)
+
+        results = asyncio.run(main())
+        # 1 runs, 1 waits and times out, 1 is rejected at once
+        self.assertEqual(sum(isinstance(r, LimiterSaturated) for r in results), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import subprocess
+import sys
+import tempfile
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from prometheus_client import REGISTRY
+
+from app import create_app
+from app.services import chatbot_service
+from app.services.certificate_service import get_prescription_data_for_pdf
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_requests_are_timed_per_endpoint_and_exported(self):
+        client = create_app().test_client()
+        labels = dict(blueprint="chatbot", endpoint="chatbot.chatbot_router_stats", method="GET", status="200")
+        before = sample("kiosk_http_request_duration_seconds_count", **labels)
+        self.assertEqual(client.get("/api/chatbot/router-stats").status_code, 200)
+        self.assertEqual(sample("kiosk_http_request_duration_seconds_count", **labels), before + 1)
+
+        response = client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        self.assertIn(b'kiosk_http_request_duration_seconds_bucket{blueprint="chatbot"', response.data)
+        self.assertNotIn(b'endpoint="metrics"', response.data)
+
+    def test_prescription_data_status_is_counted(self):
+        before = sample("kiosk_prescription_data_total", status="NOT_FOUND")
+        storage = MagicMock()
+        storage.get_reservation.return_value = None
+        with patch('app.services.certificate_service.get_storage', return_value=storage):
+            status, _ = get_prescription_data_for_pdf("000000-0000000", "내과")
+        self.assertEqual(status, "NOT_FOUND")
+        self.assertEqual(sample("kiosk_prescription_data_total", status="NOT_FOUND"), before + 1)
+
+    def test_gemini_tokens_and_general_intent_are_counted(self):
+        response = MagicMock()
+        response.usage_metadata.prompt_token_count = 120
+        response.usage_metadata.candidates_token_count = 30
+        response.candidates[0].content.parts[0].text = '{"intent": "general", "reply": "2층입니다."}'
+        before = [sample("kiosk_gemini_tokens_total", kind=kind) for kind in ("prompt", "completion")]
+        before_general = sample("kiosk_chatbot_intents_total", intent="general")
+
+        self.assertEqual(chatbot_service.process_gemini_response(response, "약국 어디예요?"), {"reply": "2층입니다."})
+
+        after = [sample("kiosk_gemini_tokens_total", kind=kind) for kind in ("prompt", "completion")]
+        self.assertEqual(after, [before[0] + 120, before[1] + 30])
+        self.assertEqual(sample("kiosk_chatbot_intents_total", intent="general"), before_general + 1)
+
+    def test_gemini_latency_records_errors(self):
+        before = sample("kiosk_gemini_request_duration_seconds_count", mode="sync", outcome="error")
+        with self.assertRaises(TimeoutError):
+            with chatbot_service._timed_gemini_call("sync"):
+                raise TimeoutError()
+        self.assertEqual(sample("kiosk_gemini_request_duration_seconds_count", mode="sync", outcome="error"), before + 1)
+
+    def test_gemini_latency_records_aborted_streams(self):
+        before = sample("kiosk_gemini_request_duration_seconds_count", mode="stream", outcome="aborted")
+
+        def stream():
+            with chatbot_service._timed_gemini_call("stream"):
+                yield "token"
+                yield "token"
+
+        tokens = stream()
+        next(tokens)
+        tokens.close()  # client went away mid-stream
+        self.assertEqual(sample("kiosk_gemini_request_duration_seconds_count", mode="stream", outcome="aborted"), before + 1)
+
+    def test_gunicorn_child_exit_drops_dead_worker_gauges(self):
+        import runpy
+        from types import SimpleNamespace
+        config = runpy.run_path(os.path.join(ROOT, "gunicorn.conf.py"))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            live_gauge = os.path.join(tmp_dir, "gauge_livesum_4242.db")
+            open(live_gauge, "wb").close()
+            with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": tmp_dir}):
+                config["child_exit"](None, SimpleNamespace(pid=4242))
+            self.assertFalse(os.path.exists(live_gauge))
+
+    def test_multiprocess_mode_sums_every_worker(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=tmp_dir, PYTHONPATH=ROOT)
+            record = "from app.utils.metrics import CHATBOT_INTENTS; CHATBOT_INTENTS.labels(intent='payment').inc()"
+            for _ in range(2):  # two "workers"
+                subprocess.run([sys.executable, "-c", record], env=env, check=True)
+            scrape = "from app.utils.metrics import render_metrics; print(render_metrics()[0].decode())"
+            output = subprocess.run([sys.executable, "-c", scrape], env=env, check=True,
+                                    capture_output=True, text=True).stdout
+        self.assertIn('kiosk_chatbot_intents_total{intent="payment"} 2.0', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
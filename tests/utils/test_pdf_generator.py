@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import zlib
+import re
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.utils import pdf_generator
+from app.utils.pdf_generator import (
+    create_prescription_pdf_bytes,
+    create_confirmation_pdf_bytes,
+    KOREAN_FONT_PATH,
+)
+
+
+def _unicode_map(pdf_bytes):
+    """Returns every stream, decompressed; the ToUnicode CMap lists the embedded glyphs."""
+    text = ""
+    for match in re.finditer(rb"stream\r?\n(.*?)\r?\nendstream", pdf_bytes, re.S):
+        try:
+            text += zlib.decompress(match.group(1)).decode("latin-1")
+        except zlib.error:
+            text += match.group(1).decode("latin-1")
+    return text
+
+
+def _hex(char):
+    return char.encode("utf-16-be").hex().upper()
+
+
+@unittest.skipUnless(os.path.exists(KOREAN_FONT_PATH), "Korean font not available")
+class TestPdfGenerator(unittest.TestCase):
+
+    def _prescription(self, patient_name):
+        return create_prescription_pdf_bytes(
+            patient_name, "900101-1234567", "내과",
+            [{"name": "감기약 처방", "fee": 5000}], 5000, "김의사", "2025-06-19",
+        )
+
+    def test_font_is_parsed_once(self):
+        pdf_generator.warm_up()
+        with patch.object(pdf_generator.FPDF, "add_font", wraps=pdf_generator.FPDF.add_font) as mock_add_font:
+            self._prescription("홍길동")
+            create_confirmation_pdf_bytes("홍길동", "900101-1234567", "감기", "2025-06-18", "2025-06-19")
+            mock_add_font.assert_not_called()
+
+    def test_documents_do_not_share_state(self):
+        first = self._prescription("홍길동")
+        second = self._prescription("박민수")
+        self.assertTrue(first.startswith(b"%PDF"))
+        # Each document embeds the glyphs of its own patient only
+        self.assertIn(_hex("홍"), _unicode_map(first))
+        self.assertNotIn(_hex("박"), _unicode_map(first))
+        self.assertIn(_hex("박"), _unicode_map(second))
+        self.assertNotIn(_hex("홍"), _unicode_map(second))
+        # Static skeleton text is present in both
+        self.assertIn(_hex("처"), _unicode_map(second))
+
+
+if __name__ == '__main__':
+    unittest.main()
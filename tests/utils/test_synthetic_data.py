@@ -0,0 +1,96 @@
+import unittest
+import csv
+import io
+import os
+import sys
+import tempfile
+from collections import Counter
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import create_app
+from app.services.certificate_service import get_prescription_data_for_pdf
+from app.storage import set_storage
+from app.storage.csv_storage import CsvStorage
+from app.utils.synthetic_data import (
+    SyntheticDataset, RESERVATION_COLUMNS, is_valid_rrn, parse_weights,
+)
+
+BASE_FEES = {
+    "내과": [("감기약 처방", 5000), ("소화제 처방", 6000), ("해열제 처방", 4000)],
+    "외과": [("소독 처치", 8000), ("봉합 처치", 20000)],
+}
+
+
+def read_rows(text):
+    return list(csv.reader(io.StringIO(text)))
+
+
+class TestSyntheticData(unittest.TestCase):
+
+    def test_same_seed_same_rows_and_random_access(self):
+        out_a, out_b = io.StringIO(), io.StringIO()
+        SyntheticDataset(seed=5, base_fees=BASE_FEES).write_reservations(out_a, 500)
+        SyntheticDataset(seed=5, base_fees=BASE_FEES).write_reservations(out_b, 500)
+        self.assertEqual(out_a.getvalue(), out_b.getvalue())
+        rows = read_rows(out_a.getvalue())
+        self.assertEqual(rows[0], RESERVATION_COLUMNS)
+        self.assertEqual(rows[301], SyntheticDataset(seed=5, base_fees=BASE_FEES).reservation_row(300))
+        other = io.StringIO()
+        SyntheticDataset(seed=6, base_fees=BASE_FEES).write_reservations(other, 500)
+        self.assertNotEqual(other.getvalue(), out_a.getvalue())
+
+    def test_rrns_are_valid_and_unique(self):
+        rows = list(SyntheticDataset(seed=1, base_fees=BASE_FEES).iter_reservations(20_000))
+        rrns = [row[1] for row in rows]
+        self.assertEqual(len(set(rrns)), len(rrns))
+        self.assertTrue(all(is_valid_rrn(rrn) for rrn in rrns))
+        self.assertFalse(is_valid_rrn("900101-1234567"))  # wrong check digit
+        self.assertTrue(all(len(row[0]) == 3 for row in rows))
+
+    def test_department_and_status_mix(self):
+        dataset = SyntheticDataset(seed=2, departments=parse_weights("내과=3,외과=1"),
+                                   status_mix=parse_weights("Pending=1,Paid=1"), base_fees=BASE_FEES)
+        rows = list(dataset.iter_reservations(8000))
+        departments = Counter(row[3] for row in rows)
+        statuses = Counter(row[6] for row in rows)
+        self.assertAlmostEqual(departments["내과"] / len(rows), 0.75, delta=0.03)
+        self.assertAlmostEqual(statuses["Paid"] / len(rows), 0.5, delta=0.03)
+        self.assertEqual(set(statuses), {"Pending", "Paid"})
+        for row in rows:
+            if row[6] == "Paid":
+                names = row[7].split(",")
+                fees = dict(BASE_FEES[row[3]])
+                self.assertEqual(int(row[8]), sum(fees[name] for name in names))
+            else:
+                self.assertEqual((row[7], row[8]), ("", "0"))
+        with self.assertRaises(ValueError):
+            parse_weights("내과=많이")
+
+    def test_fee_file_starts_with_base_prescriptions(self):
+        out = io.StringIO()
+        self.assertEqual(SyntheticDataset(seed=0, base_fees=BASE_FEES).write_fees(out, 50), 50)
+        rows = read_rows(out.getvalue())
+        self.assertEqual(rows[1], ["내과", "감기약 처방", "5000"])
+        self.assertEqual(len(rows), 51)
+        self.assertEqual(len({row[1] for row in rows[1:]}), 50)
+
+    def test_generated_files_work_with_the_kiosk(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = create_app().test_cli_runner().invoke(args=[
+                "generate-data", "--output-dir", tmp_dir, "--reservations", "300", "--fees", "200",
+                "--status-mix", "Paid=1", "--seed", "4",
+            ])
+            self.assertEqual(result.exit_code, 0, result.output)
+            storage = CsvStorage(os.path.join(tmp_dir, "reservations.csv"), os.path.join(tmp_dir, "treatment_fees.csv"))
+            set_storage(storage)
+            self.addCleanup(set_storage, None)
+            reservation = storage.list_reservations()[10]
+            status, payload = get_prescription_data_for_pdf(reservation["rrn"], reservation["department"])
+            self.assertEqual(status, "OK")
+            self.assertTrue(all(item["fee"] > 0 for item in payload["prescriptions"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
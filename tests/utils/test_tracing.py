@@ -0,0 +1,91 @@
+import unittest
+import asyncio
+import json
+import logging
+import os
+import sys
+
+# Ensure the app package is importable during test collection
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.utils import tracing
+from app.utils.tracing import traced, redact, flush_traces
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+def lookup(name, rrn, department="내과"):
+    return department
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = ListHandler()
+        tracing.logger.addHandler(self.handler)
+        tracing.logger.setLevel(logging.INFO)
+        self.addCleanup(tracing.logger.removeHandler, self.handler)
+
+    def _records(self):
+        flush_traces()
+        return self.handler.records
+
+    def test_disabled_returns_the_function_itself(self):
+        self.assertIs(traced(lookup, enabled=False), lookup)
+
+    def test_enabled_records_redacted_calls(self):
+        wrapped = traced(lookup, enabled=True)
+        self.assertEqual(wrapped.__name__, "lookup")
+        self.assertEqual(wrapped("홍길동", "900101-1234567"), "내과")
+        with self.assertRaises(TypeError):
+            traced(lambda: 1 / "x", enabled=True)()
+        first, second = self._records()
+        self.assertEqual(first["fn"], f"{__name__}.lookup")
+        self.assertEqual(first["args"], {"name": "***", "rrn": "***"})
+        self.assertNotIn("error", first)
+        self.assertEqual(second["error"], "TypeError")
+
+    def test_sampling_zero_records_nothing(self):
+        wrapped = traced(lookup, enabled=True, sample_rate=0.0)
+        for _ in range(10):
+            wrapped("홍길동", "900101-1234567")
+        self.assertEqual(self._records(), [])
+
+    def test_async_and_generator_functions(self):
+        async def answer(message):
+            return "ok"
+
+        def tokens(message):
+            yield from ("a", "b")
+
+        self.assertEqual(asyncio.run(traced(answer, enabled=True)("900101-1234567")), "ok")
+        self.assertEqual(list(traced(tokens, enabled=True)("안녕")), ["a", "b"])
+        records = self._records()
+        self.assertEqual([record["args"] for record in records], [{"message": "***"}, {"message": "***"}])
+
+    def test_chatbot_handler_conversation_is_not_logged(self):
+        from app.services import chatbot_service
+        from app.services.conversation_store import new_conversation_state, append_history
+        conversation = new_conversation_state()
+        conversation["patient"] = {"name": "임현연", "rrn": "700806-1863748"}
+        append_history(conversation, "bot", "임현연님의 처방 내역입니다.")
+        handler = traced(chatbot_service.handle_certificate_request, enabled=True)
+        handler({}, "증명서 주세요", conversation=conversation)
+        record = self._records()[0]
+        self.assertEqual(record["args"]["conversation"], "***")
+        self.assertNotIn("임현연", json.dumps(record, ensure_ascii=False))
+
+    def test_redact_masks_nested_pii_and_rrn_patterns(self):
+        value = {"parameters": {"rrn": "900101-1234567"}, "note": "번호 9001011234567", "pdf": b"%PDF"}
+        self.assertEqual(redact(value), {"parameters": "***", "note": "번호 ******-*******", "pdf": "<4 bytes>"})
+
+
+if __name__ == '__main__':
+    unittest.main()